@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
+from sqlalchemy import func, insert
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from app import db, login_manager
@@ -223,7 +224,7 @@ class ViewLog(db.Model):
     chapter_id = db.Column(db.Integer, db.ForeignKey('chapter.id'), nullable=True)
     ip_address = db.Column(db.String(45))
     user_agent = db.Column(db.Text)
-    viewed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    viewed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     dwell_time = db.Column(db.Integer, default=0)  # Time spent in seconds
     
     # Relationships
@@ -231,9 +232,72 @@ class ViewLog(db.Model):
     comic = db.relationship('Comic', backref='view_logs')
     chapter = db.relationship('Chapter', backref='view_logs')
 
+    @classmethod
+    def record(cls, comic, user=None, chapter=None, ip_address=None, user_agent=None):
+        """Log a view and bump the comic's running and daily view counters"""
+        log = cls(comic_id=comic.id, user_id=user.id if user else None,
+                  chapter_id=chapter.id if chapter else None,
+                  ip_address=ip_address, user_agent=user_agent,
+                  viewed_at=datetime.utcnow())
+        db.session.add(log)
+        Comic.query.filter_by(id=comic.id).update(
+            {Comic.total_views: func.coalesce(Comic.total_views, 0) + 1}, synchronize_session=False
+        )
+        ComicDailyView.increment(comic.id, log.viewed_at.date())
+        return log
+
     def __repr__(self):
         return f'<ViewLog User {self.user_id} -> Comic {self.comic_id}>'
 
+class ComicDailyView(db.Model):
+    """Views per comic per UTC day, kept in step with ViewLog so trending never scans raw logs"""
+    __tablename__ = 'comic_daily_views'
+    comic_id = db.Column(db.Integer, db.ForeignKey('comic.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True, index=True)
+    views = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def window_start(days):
+        """First day of a window of `days` calendar days ending today"""
+        return datetime.utcnow().date() - timedelta(days=days - 1)
+
+    @classmethod
+    def increment(cls, comic_id, day, count=1):
+        """Add `count` views to the (comic, day) row, creating it if needed"""
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            if dialect == 'postgresql':
+                from sqlalchemy.dialects.postgresql import insert as upsert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as upsert
+            stmt = upsert(cls).values(comic_id=comic_id, day=day, views=count)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=[cls.comic_id, cls.day],
+                set_={'views': cls.views + count}
+            ))
+            return
+        updated = cls.query.filter_by(comic_id=comic_id, day=day).update(
+            {cls.views: cls.views + count}, synchronize_session=False
+        )
+        if not updated:
+            db.session.add(cls(comic_id=comic_id, day=day, views=count))
+
+    @classmethod
+    def rebuild(cls, since=None):
+        """Recompute rollup rows from ViewLog, for every day or only days on/after `since`"""
+        stale = cls.query
+        day = func.date(ViewLog.viewed_at)
+        counts = db.session.query(ViewLog.comic_id, day, func.count(ViewLog.id)).group_by(ViewLog.comic_id, day)
+        if since is not None:
+            stale = stale.filter(cls.day >= since)
+            counts = counts.filter(ViewLog.viewed_at >= datetime.combine(since, time.min))
+        stale.delete(synchronize_session=False)
+        db.session.execute(insert(cls).from_select(['comic_id', 'day', 'views'], counts))
+        return db.session.query(func.count()).select_from(cls).scalar()
+
+    def __repr__(self):
+        return f'<ComicDailyView Comic {self.comic_id} on {self.day}: {self.views}>'
+
 @login_manager.user_loader
 def load_user(id):
     return User.query.get(int(id)) 
\ No newline at end of file
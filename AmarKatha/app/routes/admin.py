@@ -1,6 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
-from app.models import Comic, Chapter, User, Comment, ViewLog, Rating
+from app.models import Comic, Chapter, User, Comment, ViewLog, Rating, ComicDailyView
 from app import db
 from datetime import datetime, timedelta
 from sqlalchemy import func
@@ -34,12 +34,11 @@ def dashboard():
     recent_users = User.query.order_by(User.created_at.desc()).limit(5).all()
     
     # Get trending comics (last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    trending_comics = Comic.query.join(ViewLog).filter(
-        ViewLog.viewed_at >= week_ago,
+    trending_comics = Comic.query.join(ComicDailyView).filter(
+        ComicDailyView.day >= ComicDailyView.window_start(7),
         Comic.is_published == True
     ).group_by(Comic.id).order_by(
-        func.count(ViewLog.id).desc()
+        func.sum(ComicDailyView.views).desc()
     ).limit(10).all()
     
     # Get top rated comics
@@ -199,25 +198,26 @@ def analytics():
     days = request.args.get('days', 30, type=int)
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
+    start_day = ComicDailyView.window_start(days)
     
     # Views over time
     daily_views = db.session.query(
-        func.date(ViewLog.viewed_at).label('date'),
-        func.count(ViewLog.id).label('views')
+        ComicDailyView.day.label('date'),
+        func.sum(ComicDailyView.views).label('views')
     ).filter(
-        ViewLog.viewed_at >= start_date
+        ComicDailyView.day >= start_day
     ).group_by(
-        func.date(ViewLog.viewed_at)
+        ComicDailyView.day
     ).order_by(
-        func.date(ViewLog.viewed_at)
+        ComicDailyView.day
     ).all()
     
     # Top comics by views
-    top_comics_views = Comic.query.join(ViewLog).filter(
-        ViewLog.viewed_at >= start_date,
+    top_comics_views = Comic.query.join(ComicDailyView).filter(
+        ComicDailyView.day >= start_day,
         Comic.is_published == True
     ).group_by(Comic.id).order_by(
-        func.count(ViewLog.id).desc()
+        func.sum(ComicDailyView.views).desc()
     ).limit(10).all()
     
     # Top comics by rating
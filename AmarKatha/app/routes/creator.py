@@ -1,9 +1,10 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, jsonify
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
-from app.models import Comic, Chapter, ChapterPage, User, Series, ViewLog, Rating, Comment
+from app.models import Comic, Chapter, ChapterPage, User, Series, Rating, Comment, ComicDailyView
 from app import db
 from datetime import datetime, timedelta
+from sqlalchemy import func
 import os
 import uuid
 from collections import Counter
@@ -33,11 +34,10 @@ def calculate_creator_stats(user_id):
         avg_rating = 0
     
     # Get recent activity (last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    recent_views = ViewLog.query.join(Comic).filter(
+    recent_views = db.session.query(func.sum(ComicDailyView.views)).join(Comic).filter(
         Comic.author_id == user_id,
-        ViewLog.viewed_at >= week_ago
-    ).count()
+        ComicDailyView.day >= ComicDailyView.window_start(7)
+    ).scalar() or 0
     
     # Get total comments
     total_comments = Comment.query.join(Chapter).join(Comic).filter(
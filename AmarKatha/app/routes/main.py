@@ -1,5 +1,5 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app
-from app.models import Comic, Chapter, User, Rating, Comment, Follow, ComicFollow, ViewLog
+from app.models import Comic, Chapter, User, Rating, Comment, Follow, ComicFollow, ViewLog, ComicDailyView
 from flask_login import login_required, current_user
 from app import db
 from datetime import datetime, timedelta
@@ -11,11 +11,11 @@ bp = Blueprint('main', __name__)
 @bp.route('/')
 def index():
     """Home page with trending, new, and editor picks"""
-    # Get trending comics (based on views in last 7 days)
-    trending_comics = Comic.query.join(ViewLog).filter(
-        ViewLog.viewed_at >= datetime.utcnow() - timedelta(days=7)
+    # Get trending comics (based on views in last 7 days, from the daily rollup)
+    trending_comics = Comic.query.join(ComicDailyView).filter(
+        ComicDailyView.day >= ComicDailyView.window_start(7)
     ).group_by(Comic.id).order_by(
-        func.count(ViewLog.id).desc()
+        func.sum(ComicDailyView.views).desc()
     ).limit(10).all()
     
     # Get new comics (created in last 30 days)
@@ -48,6 +48,11 @@ def redirect_to_https():
 def comic_detail(comic_id):
     comic = Comic.query.get_or_404(comic_id)
     chapters = Chapter.query.filter_by(comic_id=comic_id, is_published=True).order_by(Chapter.chapter_number).all()
+    ViewLog.record(comic,
+                   user=current_user if current_user.is_authenticated else None,
+                   ip_address=request.remote_addr,
+                   user_agent=request.headers.get('User-Agent'))
+    db.session.commit()
     return render_template('comic/detail.html', comic=comic, chapters=chapters)
 
 @bp.route('/search')
@@ -0,0 +1,32 @@
+"""add comic daily views rollup
+
+Revision ID: bbbaddcomicdailyviews
+Revises: aaaaddscheduletoseries
+Create Date: 2025-07-08
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'bbbaddcomicdailyviews'
+down_revision = 'aaaaddscheduletoseries'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('comic_daily_views',
+        sa.Column('comic_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['comic_id'], ['comic.id'], ),
+        sa.PrimaryKeyConstraint('comic_id', 'day')
+    )
+    op.create_index('ix_comic_daily_views_day', 'comic_daily_views', ['day'])
+    op.create_index('ix_view_log_viewed_at', 'view_log', ['viewed_at'])
+    # Existing ViewLog history is backfilled with `flask rebuild-daily-views`
+    # so a large log table doesn't hold the migration open.
+
+def downgrade():
+    op.drop_index('ix_view_log_viewed_at', table_name='view_log')
+    op.drop_index('ix_comic_daily_views_day', table_name='comic_daily_views')
+    op.drop_table('comic_daily_views')
@@ -1,5 +1,6 @@
 from app import create_app, db
-from app.models import User, Comic, Chapter, ChapterPage, Comment, Rating, ChapterRating, Follow, ComicFollow, ViewLog
+from app.models import User, Comic, Chapter, ChapterPage, Comment, Rating, ChapterRating, Follow, ComicFollow, ViewLog, ComicDailyView
+import click
 import os
 import argparse
 import ssl
@@ -24,7 +25,8 @@ def make_shell_context():
         'ChapterRating': ChapterRating,
         'Follow': Follow,
         'ComicFollow': ComicFollow,
-        'ViewLog': ViewLog
+        'ViewLog': ViewLog,
+        'ComicDailyView': ComicDailyView
     }
 
 @app.cli.command()
@@ -33,6 +35,16 @@ def init_db():
     db.create_all()
     print('Database initialized!')
 
+@app.cli.command()
+@click.option('--days', type=int, default=None, help='Only rebuild the last N days (default: all history).')
+def rebuild_daily_views(days):
+    """Rebuild the comic_daily_views rollup from ViewLog."""
+    since = ComicDailyView.window_start(days) if days else None
+    rows = ComicDailyView.rebuild(since)
+    db.session.commit()
+    scope = f'since {since}' if since else 'for all history'
+    print(f'Daily view rollup rebuilt {scope} ({rows} rows)')
+
 @app.cli.command()
 def create_admin():
     """Create an admin user."""
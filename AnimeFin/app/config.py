@@ -4,6 +4,8 @@ import os
 from dataclasses import dataclass
 from pathlib import Path
 
+from app.services.schedule import parse_rate
+
 
 @dataclass(frozen=True)
 class AppConfig:
@@ -17,6 +19,64 @@ class AppConfig:
     host: str
     port: int
     debug: bool
+    upstream_timeout: float = 20.0
+    upstream_hedge: bool = False
+    upstream_breaker_reset: float = 30.0
+    watch_workers: int = 2
+    watch_tick_seconds: float = 30.0
+    watch_base_interval: float = 3600.0
+    media_reconcile_seconds: float = 300.0
+    media_probe_workers: int = 2
+    trash_grace_seconds: float = 86400.0
+    reclaim_bytes_per_second: float = 64 * 1024 * 1024
+    reclaim_files_per_second: float = 200.0
+    eviction_enabled: bool = False
+    storage_quota_bytes: int = 0
+    eviction_high_water: float = 0.9
+    eviction_low_water: float = 0.8
+    eviction_interval_seconds: float = 300.0
+    pinned_shows: tuple[str, ...] = ()
+    web_workers: int = 2
+    web_threads: int = 4
+    shutdown_grace_seconds: float = 30.0
+    queue_poll_seconds: float = 1.0
+    worker_metrics_port: int = 9101
+    event_keep_lines_done: int = 20
+    event_keep_lines_failed: int = 200
+    event_keep_lines_cancelled: int = 20
+    event_retention_after_seconds: float = 86400.0
+    event_retention_interval_seconds: float = 3600.0
+    vacuum_pages_per_run: int = 2000
+    job_archive_after_days: float = 30.0
+    job_archive_interval_seconds: float = 3600.0
+    job_log_retention_days: float = 180.0
+    download_concurrency: int = 1
+    download_bytes_per_second: int = 0
+    download_windows: str = ""
+    ani_cli_batch_size: int = 12
+    stream_resolve_lookahead: int = 4
+    stream_resolve_workers: int = 2
+    stream_resolve_ttl_seconds: float = 1800.0
+    postprocess_enabled: bool = True
+    postprocess_workers: int = 0
+    postprocess_normalize_audio: bool = False
+    postprocess_ffmpeg: str = "ffmpeg"
+    media_server_url: str = ""
+    media_server_api_key: str = ""
+    media_server_library_root: str = ""
+    media_server_debounce_seconds: float = 60.0
+    media_server_scoped_refresh: bool = True
+    search_cache_seconds: float = 300.0
+    compress_min_bytes: int = 1024
+    backup_dir: Path | None = None
+    backup_interval_seconds: float = 86400.0
+    backup_keep: int = 7
+    backup_pages_per_step: int = 256
+    profile_requests: bool = False
+    profile_slow_ms: float = 500.0
+    profile_sample_rate: float = 0.1
+    profile_dir: Path | None = None
+    profile_keep: int = 50
 
 
 def load_config() -> AppConfig:
@@ -42,4 +102,62 @@ def load_config() -> AppConfig:
         host=os.getenv("FLASK_HOST", "0.0.0.0"),
         port=int(os.getenv("FLASK_PORT", "5001")),
         debug=os.getenv("FLASK_DEBUG", "0") == "1",
+        upstream_timeout=float(os.getenv("UPSTREAM_TIMEOUT", "20")),
+        upstream_hedge=os.getenv("UPSTREAM_HEDGE", "0") == "1",
+        upstream_breaker_reset=float(os.getenv("UPSTREAM_BREAKER_RESET", "30")),
+        watch_workers=int(os.getenv("WATCH_WORKERS", "2")),
+        watch_tick_seconds=float(os.getenv("WATCH_TICK_SECONDS", "30")),
+        watch_base_interval=float(os.getenv("WATCH_BASE_INTERVAL", "3600")),
+        media_reconcile_seconds=float(os.getenv("MEDIA_RECONCILE_SECONDS", "300")),
+        media_probe_workers=int(os.getenv("MEDIA_PROBE_WORKERS", "2")),
+        trash_grace_seconds=float(os.getenv("TRASH_GRACE_SECONDS", "86400")),
+        reclaim_bytes_per_second=float(os.getenv("RECLAIM_BYTES_PER_SECOND", str(64 * 1024 * 1024))),
+        reclaim_files_per_second=float(os.getenv("RECLAIM_FILES_PER_SECOND", "200")),
+        eviction_enabled=os.getenv("EVICTION_ENABLED", "0") == "1",
+        storage_quota_bytes=int(os.getenv("STORAGE_QUOTA_BYTES", "0")),
+        eviction_high_water=float(os.getenv("EVICTION_HIGH_WATER", "0.9")),
+        eviction_low_water=float(os.getenv("EVICTION_LOW_WATER", "0.8")),
+        eviction_interval_seconds=float(os.getenv("EVICTION_INTERVAL_SECONDS", "300")),
+        pinned_shows=tuple(s.strip() for s in os.getenv("PINNED_SHOWS", "").split(",") if s.strip()),
+        web_workers=int(os.getenv("WEB_WORKERS", "2")),
+        web_threads=int(os.getenv("WEB_THREADS", "4")),
+        shutdown_grace_seconds=float(os.getenv("SHUTDOWN_GRACE_SECONDS", "30")),
+        queue_poll_seconds=float(os.getenv("QUEUE_POLL_SECONDS", "1")),
+        worker_metrics_port=int(os.getenv("WORKER_METRICS_PORT", "9101")),
+        event_keep_lines_done=int(os.getenv("EVENT_KEEP_LINES_DONE", "20")),
+        event_keep_lines_failed=int(os.getenv("EVENT_KEEP_LINES_FAILED", "200")),
+        event_keep_lines_cancelled=int(os.getenv("EVENT_KEEP_LINES_CANCELLED", "20")),
+        event_retention_after_seconds=float(os.getenv("EVENT_RETENTION_AFTER_SECONDS", "86400")),
+        event_retention_interval_seconds=float(os.getenv("EVENT_RETENTION_INTERVAL_SECONDS", "3600")),
+        vacuum_pages_per_run=int(os.getenv("VACUUM_PAGES_PER_RUN", "2000")),
+        job_archive_after_days=float(os.getenv("JOB_ARCHIVE_AFTER_DAYS", "30")),
+        job_archive_interval_seconds=float(os.getenv("JOB_ARCHIVE_INTERVAL_SECONDS", "3600")),
+        job_log_retention_days=float(os.getenv("JOB_LOG_RETENTION_DAYS", "180")),
+        download_concurrency=int(os.getenv("DOWNLOAD_CONCURRENCY", "1")),
+        download_bytes_per_second=parse_rate(os.getenv("DOWNLOAD_BYTES_PER_SECOND", "0")),
+        download_windows=os.getenv("DOWNLOAD_WINDOWS", ""),
+        ani_cli_batch_size=int(os.getenv("ANI_CLI_BATCH_SIZE", "12")),
+        stream_resolve_lookahead=int(os.getenv("STREAM_RESOLVE_LOOKAHEAD", "4")),
+        stream_resolve_workers=int(os.getenv("STREAM_RESOLVE_WORKERS", "2")),
+        stream_resolve_ttl_seconds=float(os.getenv("STREAM_RESOLVE_TTL_SECONDS", "1800")),
+        postprocess_enabled=os.getenv("POSTPROCESS_ENABLED", "1") == "1",
+        postprocess_workers=int(os.getenv("POSTPROCESS_WORKERS", "0")),
+        postprocess_normalize_audio=os.getenv("POSTPROCESS_NORMALIZE_AUDIO", "0") == "1",
+        postprocess_ffmpeg=os.getenv("POSTPROCESS_FFMPEG", "ffmpeg"),
+        media_server_url=os.getenv("MEDIA_SERVER_URL", ""),
+        media_server_api_key=os.getenv("MEDIA_SERVER_API_KEY", ""),
+        media_server_library_root=os.getenv("MEDIA_SERVER_LIBRARY_ROOT", ""),
+        media_server_debounce_seconds=float(os.getenv("MEDIA_SERVER_DEBOUNCE_SECONDS", "60")),
+        media_server_scoped_refresh=os.getenv("MEDIA_SERVER_SCOPED_REFRESH", "1") == "1",
+        search_cache_seconds=float(os.getenv("SEARCH_CACHE_SECONDS", "300")),
+        compress_min_bytes=int(os.getenv("COMPRESS_MIN_BYTES", "1024")),
+        backup_dir=Path(os.getenv("BACKUP_DIR") or database_path.parent / "backups").resolve(),
+        backup_interval_seconds=float(os.getenv("BACKUP_INTERVAL_SECONDS", "86400")),
+        backup_keep=int(os.getenv("BACKUP_KEEP", "7")),
+        backup_pages_per_step=int(os.getenv("BACKUP_PAGES_PER_STEP", "256")),
+        profile_requests=os.getenv("PROFILE_REQUESTS", "0") == "1",
+        profile_slow_ms=float(os.getenv("PROFILE_SLOW_MS", "500")),
+        profile_sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0.1")),
+        profile_dir=Path(os.getenv("PROFILE_DIR") or database_path.parent / "profiles").resolve(),
+        profile_keep=int(os.getenv("PROFILE_KEEP", "50")),
     )
@@ -1,17 +1,215 @@
 from __future__ import annotations
 
+import functools
+import sys
+import threading
+from typing import Any
+
 from flask import Flask
 
 from app.config import AppConfig, load_config
+from app.maintenance import database_backup, run_backup, run_restore, run_vacuum
+from app.metrics import REGISTRY
 from app.routes.api import api_bp
+from app.routes.http_cache import install_compression
+from app.routes.metrics import install_http_metrics, metrics_bp
+from app.routes.profiling import SlowRequestCapture, install_request_profiling
+from app.routes.stream import stream_bp
 from app.routes.ui import ui_bp
 from app.services.anime_source import AnimeSourceService
-from app.services.downloads import DownloadService
+from app.services.dedup import DedupService
+from app.services.downloads import DownloadService, queue_depth_metrics
+from app.services.eviction import EvictionEngine
+from app.services.job_archiver import JobArchiver
+from app.services.library_notifier import LibraryRefreshNotifier
+from app.services.postprocess import PostProcessOptions, PostProcessor, postprocess_metrics
+from app.services.reclaimer import TrashReclaimer
+from app.services.resilience import CircuitBreaker
+from app.services.retention import EventRetention, RetentionPolicy
+from app.services.schedule import DownloadSchedule, parse_windows
+from app.services.stream_resolver import StreamResolver
+from app.services.watcher import EpisodeWatcher, WatchPolicy
+from app.storage.deletions import DeletionStore
+from app.storage.hash_index import HashIndex
+from app.storage.job_archive import JobArchive
 from app.storage.jobs import JobsStore
 from app.storage.media import MediaStore
+from app.storage.media_index import MediaIndex
+from app.storage.media_metadata import MediaMetadataCache
+from app.storage.media_usage import MediaUsageStore
+from app.storage.traces import TraceStore
+from app.storage.watchlist import WatchlistStore
+
+
+def build_services(cfg: AppConfig) -> dict[str, Any]:
+    jobs_store = JobsStore(cfg.database_path)
+    REGISTRY.set_collector("queue_depth", functools.partial(queue_depth_metrics, jobs_store))
+    REGISTRY.set_collector("postprocess", functools.partial(postprocess_metrics, jobs_store))
+    anime_source = AnimeSourceService(
+        cfg.allanime_api,
+        cfg.allanime_referer,
+        cfg.user_agent,
+        timeout=cfg.upstream_timeout,
+        breaker=CircuitBreaker(reset_timeout=cfg.upstream_breaker_reset),
+        hedge=cfg.upstream_hedge,
+        search_cache_seconds=cfg.search_cache_seconds,
+    )
+    deletions = DeletionStore(cfg.database_path)
+    media_store = MediaStore(
+        cfg.downloads_dir,
+        MediaIndex(cfg.database_path),
+        MediaMetadataCache(cfg.database_path),
+        probe_workers=cfg.media_probe_workers,
+        deletions=deletions,
+        trash_grace_seconds=cfg.trash_grace_seconds,
+        usage=MediaUsageStore(cfg.database_path),
+    )
+    reclaimer = TrashReclaimer(
+        deletions,
+        bytes_per_second=cfg.reclaim_bytes_per_second,
+        files_per_second=cfg.reclaim_files_per_second,
+    )
+    media_store.usage.seed_pins(cfg.pinned_shows)
+    eviction = EvictionEngine(
+        media_store,
+        quota_bytes=cfg.storage_quota_bytes,
+        high_water=cfg.eviction_high_water,
+        low_water=cfg.eviction_low_water,
+        interval_seconds=cfg.eviction_interval_seconds,
+        on_evicted=reclaimer.wake,
+        enabled=cfg.eviction_enabled,
+    )
+    resolver = StreamResolver(
+        jobs_store,
+        anime_source,
+        lookahead=cfg.stream_resolve_lookahead,
+        workers=cfg.stream_resolve_workers,
+        ttl_seconds=cfg.stream_resolve_ttl_seconds,
+        poll_seconds=cfg.queue_poll_seconds,
+    )
+    downloads = DownloadService(
+        jobs_store,
+        cfg.downloads_dir,
+        cfg.ani_cli_path,
+        poll_seconds=cfg.queue_poll_seconds,
+        traces=TraceStore(cfg.database_path),
+        schedule=DownloadSchedule(
+            parse_windows(cfg.download_windows),
+            concurrency=cfg.download_concurrency,
+            bytes_per_second=cfg.download_bytes_per_second,
+        ),
+        max_batch=cfg.ani_cli_batch_size,
+        resolver=resolver if resolver.enabled else None,
+    )
+    downloads.add_completion_listener(media_store.record_job)
+    postprocess = PostProcessor(
+        jobs_store,
+        cfg.database_path,
+        options=PostProcessOptions(cfg.postprocess_ffmpeg, cfg.postprocess_normalize_audio),
+        workers=cfg.postprocess_workers,
+        poll_seconds=cfg.queue_poll_seconds,
+    )
+    postprocess.add_completion_listener(media_store.record_job)
+    if cfg.postprocess_enabled:
+        downloads.add_completion_listener(postprocess.enqueue_job)
+    library_notifier = LibraryRefreshNotifier(
+        cfg.media_server_url,
+        cfg.media_server_api_key,
+        cfg.downloads_dir,
+        library_root=cfg.media_server_library_root,
+        debounce_seconds=cfg.media_server_debounce_seconds,
+        scoped=cfg.media_server_scoped_refresh,
+    )
+    if library_notifier.enabled:
+        downloads.add_completion_listener(library_notifier.notify_job)
+        postprocess.add_completion_listener(library_notifier.notify_job)
+    if cfg.eviction_enabled:
+        downloads.add_completion_listener(lambda job: eviction.wake())
+    watchlist = WatchlistStore(cfg.database_path)
+    watcher = EpisodeWatcher(
+        watchlist,
+        anime_source,
+        jobs_store,
+        downloads,
+        policy=WatchPolicy(base_interval=cfg.watch_base_interval),
+        max_workers=cfg.watch_workers,
+        tick_seconds=cfg.watch_tick_seconds,
+    )
+    retention = EventRetention(
+        jobs_store,
+        cfg.database_path.parent / "event-archives",
+        {
+            "done": RetentionPolicy(cfg.event_keep_lines_done, cfg.event_retention_after_seconds),
+            "failed": RetentionPolicy(cfg.event_keep_lines_failed, cfg.event_retention_after_seconds),
+            "cancelled": RetentionPolicy(cfg.event_keep_lines_cancelled, cfg.event_retention_after_seconds),
+        },
+        interval_seconds=cfg.event_retention_interval_seconds,
+        vacuum_pages=cfg.vacuum_pages_per_run,
+    )
+    job_archive = JobArchive(cfg.database_path)
+    return {
+        "config": cfg,
+        "jobs_store": jobs_store,
+        "anime_source": anime_source,
+        "media": media_store,
+        "downloads": downloads,
+        "resolver": resolver,
+        "postprocess": postprocess,
+        "library_notifier": library_notifier,
+        "backup": database_backup(cfg),
+        "watchlist": watchlist,
+        "watcher": watcher,
+        "deletions": deletions,
+        "reclaimer": reclaimer,
+        "eviction": eviction,
+        "dedup": DedupService(media_store, HashIndex(cfg.database_path)),
+        "retention": retention,
+        "traces": downloads.traces,
+        "job_archive": job_archive,
+        "job_archiver": JobArchiver(
+            job_archive,
+            retention,
+            downloads.traces,
+            after_days=cfg.job_archive_after_days,
+            log_retention_days=cfg.job_log_retention_days,
+            interval_seconds=cfg.job_archive_interval_seconds,
+        ),
+    }
+
+
+def start_workers(services: dict[str, Any]) -> None:
+    cfg: AppConfig = services["config"]
+    services["reclaimer"].start()
+    services["media"].start_reconciler(cfg.media_reconcile_seconds)
+    services["resolver"].start()
+    services["downloads"].start()
+    if cfg.postprocess_enabled:
+        services["postprocess"].start()
+    if cfg.eviction_enabled:
+        services["eviction"].start()
+    services["watcher"].start()
+    services["library_notifier"].start()
+    services["retention"].start()
+    services["job_archiver"].start()
+    services["backup"].start()
+
 
+def stop_workers(services: dict[str, Any], timeout: float) -> bool:
+    services["watcher"].stop()
+    services["library_notifier"].stop()
+    services["eviction"].stop()
+    services["retention"].stop()
+    services["job_archiver"].stop()
+    services["backup"].stop()
+    services["resolver"].stop()
+    drained = services["downloads"].shutdown(timeout)
+    services["postprocess"].stop(timeout)
+    services["reclaimer"].stop()
+    services["media"].shutdown()
+    return drained
 
-def create_app(config: AppConfig | None = None) -> Flask:
+
+def create_app(config: AppConfig | None = None, *, workers: bool = True) -> Flask:
     cfg = config or load_config()
     app = Flask(
         __name__,
@@ -21,26 +219,54 @@ def create_app(config: AppConfig | None = None) -> Flask:
     )
     app.config["APP_CONFIG"] = cfg
 
-    jobs_store = JobsStore(cfg.database_path)
-    anime_source = AnimeSourceService(cfg.allanime_api, cfg.allanime_referer, cfg.user_agent)
-    media_store = MediaStore(cfg.downloads_dir)
-    downloads = DownloadService(jobs_store, cfg.downloads_dir, cfg.ani_cli_path)
-    downloads.start()
-
-    app.extensions["jobs_store"] = jobs_store
-    app.extensions["anime_source"] = anime_source
-    app.extensions["media"] = media_store
-    app.extensions["downloads"] = downloads
+    services = build_services(cfg)
+    if workers:
+        start_workers(services)
+    for name, service in services.items():
+        if name != "config":
+            app.extensions[name] = service
+    # Long-polls hold a gthread slot each; leave at least half of WEB_THREADS for everything else.
+    app.extensions["long_polls"] = threading.BoundedSemaphore(max(1, cfg.web_threads // 2))
 
     app.register_blueprint(api_bp)
+    app.register_blueprint(stream_bp)
     app.register_blueprint(ui_bp)
+    app.register_blueprint(metrics_bp)
+    install_http_metrics(app)
+    if cfg.profile_requests:
+        install_request_profiling(
+            app,
+            SlowRequestCapture(cfg.profile_dir or cfg.database_path.parent / "profiles", keep=cfg.profile_keep),
+            slow_ms=cfg.profile_slow_ms,
+            sample_rate=cfg.profile_sample_rate,
+        )
+    install_compression(app, cfg.compress_min_bytes)
     return app
 
 
-def main() -> None:
-    cfg = load_config()
-    app = create_app(cfg)
-    app.run(host=cfg.host, port=cfg.port, debug=cfg.debug, threaded=True)
+def main(argv: list[str] | None = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    role = args[0] if args else "all"
+    if role == "web":
+        from app.web import run_web
+
+        run_web()
+    elif role == "worker":
+        from app.worker import run_worker
+
+        run_worker()
+    elif role == "backup":
+        run_backup()
+    elif role == "restore":
+        run_restore(args[1:])
+    elif role == "vacuum":
+        run_vacuum()
+    elif role == "all":
+        cfg = load_config()
+        app = create_app(cfg)
+        app.run(host=cfg.host, port=cfg.port, debug=cfg.debug, threaded=True)
+    else:
+        raise SystemExit(f"Unknown role {role!r}; expected one of: all, web, worker, backup, restore, vacuum")
 
 
 if __name__ == "__main__":
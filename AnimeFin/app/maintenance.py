@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from app.config import AppConfig, load_config
+from app.services.db_backup import DatabaseBackup
+from app.storage.jobs import JobsStore
+
+
+def database_backup(cfg: AppConfig) -> DatabaseBackup:
+    return DatabaseBackup(
+        cfg.database_path,
+        cfg.backup_dir or cfg.database_path.parent / "backups",
+        interval_seconds=cfg.backup_interval_seconds,
+        keep=cfg.backup_keep,
+        pages_per_step=cfg.backup_pages_per_step,
+    )
+
+
+def run_backup() -> None:
+    print(json.dumps(database_backup(load_config()).run_once(), indent=2))
+
+
+def run_restore(args: list[str]) -> None:
+    backup = database_backup(load_config())
+    if not args:
+        for path in backup.list_backups():
+            print(path)
+        raise SystemExit("Usage: python -m app.main restore <backup file | latest>  (stop the app first)")
+    if args[0] == "latest":
+        backups = backup.list_backups()
+        if not backups:
+            raise SystemExit(f"No backups found in {backup.backup_dir}")
+        source = backups[-1]
+    else:
+        source = Path(args[0]).resolve()
+    print(json.dumps(backup.restore(source), indent=2))
+
+
+def run_vacuum() -> None:
+    print(json.dumps(JobsStore(load_config().database_path).convert_to_incremental_vacuum(), indent=2))
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
-from flask import Blueprint, current_app, jsonify, request
+import math
+from datetime import datetime, timedelta, timezone
 
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+
+from app.routes.http_cache import not_modified, tagged
+from app.services.postprocess import media_file
+from app.services.resilience import UpstreamDegradedError
+from app.services.schedule import SCHEDULES
+from app.services.tracing import to_chrome, to_otlp
+from app.storage.watchlist import NewWatch
 
 api_bp = Blueprint("api", __name__, url_prefix="/api")
 
+EVENTS_MAX_WAIT = 10.0
+
 
 def _services():
     anime_source = current_app.extensions["anime_source"]
@@ -13,6 +24,13 @@ def _services():
     return anime_source, downloads, media
 
 
+def _upstream_degraded(exc: UpstreamDegradedError):
+    response = jsonify({"error": "upstream degraded", "detail": str(exc), "retry_after": exc.retry_after})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(max(1, math.ceil(exc.retry_after)))
+    return response
+
+
 @api_bp.get("/health")
 def health() -> tuple[dict, int]:
     return {"ok": True}, 200
@@ -27,7 +45,15 @@ def search_shows():
         return jsonify({"error": "Missing required query parameter: q"}), 400
     if mode not in {"sub", "dub"}:
         return jsonify({"error": "mode must be sub or dub"}), 400
-    return jsonify({"query": query, "mode": mode, "results": anime_source.search_shows(query, mode)})
+    version = anime_source.search_version(query, mode)
+    if version and (cached := not_modified(f"search-{version}")):
+        return cached
+    try:
+        version, results = anime_source.search_shows_versioned(query, mode)
+    except UpstreamDegradedError as exc:
+        return _upstream_degraded(exc)
+    tag = f"search-{version}"
+    return not_modified(tag) or tagged(jsonify({"query": query, "mode": mode, "results": results}), tag)
 
 
 @api_bp.get("/shows/<show_id>/episodes")
@@ -36,7 +62,11 @@ def show_episodes(show_id: str):
     mode = (request.args.get("mode") or "dub").strip().lower()
     if mode not in {"sub", "dub"}:
         return jsonify({"error": "mode must be sub or dub"}), 400
-    return jsonify({"show_id": show_id, "mode": mode, "episodes": anime_source.list_episodes(show_id, mode)})
+    try:
+        episodes = anime_source.list_episodes(show_id, mode)
+    except UpstreamDegradedError as exc:
+        return _upstream_degraded(exc)
+    return jsonify({"show_id": show_id, "mode": mode, "episodes": episodes})
 
 
 @api_bp.post("/downloads")
@@ -50,6 +80,7 @@ def create_downloads():
     source_url = (body.get("source_url") or "").strip()
     source_type = (body.get("source_type") or "").strip().lower()
     referer = (body.get("referer") or "").strip()
+    schedule = (body.get("schedule") or "immediate").strip().lower()
     episodes = body.get("episodes") or []
 
     if not show_id or not show_title:
@@ -58,6 +89,8 @@ def create_downloads():
         return jsonify({"error": "mode must be sub or dub"}), 400
     if not isinstance(episodes, list) or not episodes:
         return jsonify({"error": "episodes must be a non-empty array"}), 400
+    if schedule not in SCHEDULES:
+        return jsonify({"error": f"schedule must be one of: {', '.join(SCHEDULES)}"}), 400
 
     from app.services.downloads import DownloadRequest
 
@@ -71,6 +104,7 @@ def create_downloads():
             source_url=source_url,
             source_type=source_type,
             referer=referer,
+            schedule=schedule,
         )
     )
     return jsonify({"job_ids": job_ids}), 202
@@ -79,12 +113,15 @@ def create_downloads():
 @api_bp.get("/downloads")
 def list_downloads():
     _, downloads, _ = _services()
+    tag = f"jobs-{current_app.extensions['jobs_store'].revision()}"
+    if cached := not_modified(tag):
+        return cached
     jobs = downloads.list_jobs()
-    grouped = {"queued": [], "running": [], "done": [], "failed": [], "cancelled": [], "other": []}
+    grouped = {"scheduled": [], "queued": [], "running": [], "done": [], "failed": [], "cancelled": [], "other": []}
     for job in jobs:
         key = job["status"] if job["status"] in grouped else "other"
         grouped[key].append(job)
-    return jsonify({"jobs": jobs, "groups": grouped})
+    return tagged(jsonify({"jobs": jobs, "groups": grouped}), tag)
 
 
 @api_bp.get("/downloads/<job_id>")
@@ -92,8 +129,138 @@ def get_download(job_id: str):
     _, downloads, _ = _services()
     job = downloads.get_job(job_id)
     if not job:
+        archived = current_app.extensions["job_archive"].get(job_id)
+        if archived:
+            return jsonify({**archived, "archived": True})
         return jsonify({"error": "Job not found"}), 404
-    return jsonify(job)
+    return jsonify({**job, "postprocess": current_app.extensions["jobs_store"].get_postprocess(job_id)})
+
+
+@api_bp.post("/downloads/<job_id>/postprocess")
+def requeue_postprocess(job_id: str):
+    _, downloads, _ = _services()
+    job = downloads.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] != "done":
+        return jsonify({"error": "Only finished downloads can be post-processed"}), 409
+    body = request.get_json(silent=True) or {}
+    try:
+        priority = int(body.get("priority", 0))
+    except (TypeError, ValueError):
+        return jsonify({"error": "priority must be an integer"}), 400
+    path = media_file(job)
+    if path is None:
+        return jsonify({"error": "Downloaded file not found"}), 409
+    jobs_store = current_app.extensions["jobs_store"]
+    jobs_store.enqueue_postprocess(job_id, priority, renormalize=bool(body.get("renormalize")), media_path=str(path))
+    current_app.extensions["postprocess"].wake()
+    return jsonify(jobs_store.get_postprocess(job_id)), 202
+
+
+@api_bp.get("/downloads/<job_id>/events")
+def get_download_events(job_id: str):
+    _, downloads, _ = _services()
+    job = downloads.get_job(job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    try:
+        after = int(request.args.get("after", "0"))
+        limit = int(request.args.get("limit", "200"))
+        tail = int(request.args["tail"]) if "tail" in request.args else None
+        wait = float(request.args.get("wait", "0"))
+    except ValueError:
+        return jsonify({"error": "after, limit, tail and wait must be numbers"}), 400
+    if after < 0 or not 1 <= limit <= 1000 or (tail is not None and not 1 <= tail <= 1000) or wait < 0:
+        return jsonify({"error": "Expected after >= 0, 1 <= limit/tail <= 1000, wait >= 0"}), 400
+
+    status = job["status"]
+    if tail is not None:
+        events = downloads.tail_events(job_id, tail)
+    elif wait > 0 and current_app.extensions["long_polls"].acquire(blocking=False):
+        try:
+            events = downloads.wait_for_events(job_id, after=after, limit=limit, timeout=min(wait, EVENTS_MAX_WAIT))
+        finally:
+            current_app.extensions["long_polls"].release()
+        status = (downloads.get_job(job_id) or job)["status"]
+    else:
+        events = downloads.list_events(job_id, after=after, limit=limit)
+    next_after = events[-1]["id"] if events else after
+    return jsonify(
+        {
+            "job_id": job_id,
+            "status": status,
+            "events": events,
+            "next_after": next_after,
+            "has_more": tail is None and len(events) == limit,
+        }
+    )
+
+
+@api_bp.get("/downloads/<job_id>/log")
+def get_download_log(job_id: str):
+    _, downloads, _ = _services()
+    events = current_app.extensions["retention"].read_archive(job_id)
+    if not downloads.get_job(job_id):
+        # Archived jobs have no rows left in download_events; only the gzip log can answer.
+        if not current_app.extensions["job_archive"].get(job_id):
+            return jsonify({"error": "Job not found"}), 404
+        if events is None:
+            return jsonify({"error": "Job log is no longer retained"}), 404
+    if events is None:
+        events = _iter_events(downloads, job_id)
+
+    def render():
+        for event in events:
+            yield f"[{event['timestamp']}] {event['level']}: {event['message']}\n"
+
+    return Response(stream_with_context(render()), mimetype="text/plain")
+
+
+def _iter_events(downloads, job_id: str):
+    after = 0
+    while True:
+        page = downloads.list_events(job_id, after=after, limit=1000)
+        yield from page
+        if len(page) < 1000:
+            return
+        after = page[-1]["id"]
+
+
+TRACE_FORMATS = {"chrome": to_chrome, "otlp": to_otlp, "raw": lambda traces: {"traces": traces}}
+
+
+def _trace_export(traces: list[dict], name: str):
+    export_format = (request.args.get("format") or "chrome").lower()
+    if export_format not in TRACE_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(TRACE_FORMATS)}"}), 400
+    response = jsonify(TRACE_FORMATS[export_format](traces))
+    response.headers["Content-Disposition"] = f'attachment; filename="{name}.{export_format}.json"'
+    return response
+
+
+@api_bp.get("/downloads/<job_id>/trace")
+def get_download_trace(job_id: str):
+    traces = current_app.extensions["traces"].list_traces(job_id=job_id)
+    if not traces:
+        return jsonify({"error": "No trace recorded for this job"}), 404
+    return _trace_export(traces, f"job-{job_id}")
+
+
+@api_bp.get("/traces")
+def export_traces():
+    try:
+        limit = int(request.args.get("limit", "1000"))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 1 <= limit <= 10000:
+        return jsonify({"error": "limit must be between 1 and 10000"}), 400
+    traces = current_app.extensions["traces"].list_traces(
+        executor=request.args.get("executor") or None,
+        since=request.args.get("since") or "",
+        limit=limit,
+    )
+    return _trace_export(traces, "animefin-traces")
 
 
 @api_bp.delete("/downloads/<job_id>")
@@ -104,10 +271,57 @@ def cancel_download(job_id: str):
     return jsonify({"ok": True, "job_id": job_id})
 
 
+@api_bp.get("/stats")
+def get_stats():
+    try:
+        days = int(request.args.get("days", "30"))
+    except ValueError:
+        return jsonify({"error": "days must be an integer"}), 400
+    if days < 0:
+        return jsonify({"error": "days must be >= 0"}), 400
+    since_day = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat() if days else ""
+    stats = current_app.extensions["job_archive"].stats(
+        since_day=since_day,
+        show_id=request.args.get("show_id") or None,
+    )
+    # History comes from the archive rollup; the hot table contributes only its per-status counts.
+    return jsonify({"days_window": days, **stats, "current": current_app.extensions["jobs_store"].count_by_status()})
+
+
 @api_bp.get("/media")
 def list_media():
     _, _, media = _services()
-    return jsonify({"items": media.list_media()})
+    show = request.args.get("show") or None
+    try:
+        offset = int(request.args.get("offset", "0"))
+        limit = int(request.args["limit"]) if "limit" in request.args else None
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+    if offset < 0 or (limit is not None and limit < 0):
+        return jsonify({"error": "offset and limit must be non-negative"}), 400
+    revision = media.revision()
+    tag = f"media-{revision}"
+    if revision is not None and (cached := not_modified(tag)):
+        return cached
+    items, total = media.query_media(show=show, offset=offset, limit=limit)
+    response = jsonify({"items": items, "total": total, "offset": offset, "limit": limit})
+    return tagged(response, tag) if revision is not None else response
+
+
+@api_bp.post("/media/watched")
+def mark_watched():
+    _, _, media = _services()
+    body = request.get_json(force=True)
+    media_id = (body.get("media_id") or "").strip()
+    if not media_id:
+        return jsonify({"error": "media_id is required"}), 400
+    try:
+        record = media.set_watched(media_id, bool(body.get("watched", True)))
+    except FileNotFoundError:
+        return jsonify({"error": "Media item not found"}), 404
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(record)
 
 
 @api_bp.delete("/media/<path:media_id>")
@@ -119,4 +333,126 @@ def delete_media(media_id: str):
         return jsonify({"error": "Media item not found"}), 404
     except ValueError:
         return jsonify({"error": "Invalid media path"}), 400
+    reclaimer = current_app.extensions.get("reclaimer")
+    if "deletion_id" in result and reclaimer is not None:
+        reclaimer.wake()
     return jsonify(result)
+
+
+@api_bp.get("/deletions")
+def list_deletions():
+    deletions = current_app.extensions["deletions"]
+    return jsonify({"items": deletions.list_deletions()})
+
+
+@api_bp.get("/deletions/<deletion_id>")
+def get_deletion(deletion_id: str):
+    deletions = current_app.extensions["deletions"]
+    record = deletions.get(deletion_id)
+    if not record:
+        return jsonify({"error": "Deletion not found"}), 404
+    return jsonify(record)
+
+
+@api_bp.post("/deletions/<deletion_id>/restore")
+def restore_deletion(deletion_id: str):
+    _, _, media = _services()
+    try:
+        record = media.restore_deletion(deletion_id)
+    except FileNotFoundError:
+        return jsonify({"error": "Deletion not found"}), 404
+    except FileExistsError:
+        return jsonify({"error": "A media item already exists at the original path"}), 409
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 409
+    return jsonify(record)
+
+
+@api_bp.get("/watchlist")
+def list_watchlist():
+    watchlist = current_app.extensions["watchlist"]
+    return jsonify({"items": watchlist.list_watches()})
+
+
+@api_bp.post("/watchlist")
+def add_watch():
+    watchlist = current_app.extensions["watchlist"]
+    body = request.get_json(force=True)
+    show_id = (body.get("show_id") or "").strip()
+    show_title = (body.get("show_title") or "").strip()
+    mode = (body.get("mode") or "dub").strip().lower()
+    quality = (body.get("quality") or "best").strip().lower()
+    backfill = bool(body.get("backfill", False))
+
+    if not show_id or not show_title:
+        return jsonify({"error": "show_id and show_title are required"}), 400
+    if mode not in {"sub", "dub"}:
+        return jsonify({"error": "mode must be sub or dub"}), 400
+
+    item = watchlist.add(
+        NewWatch(show_id=show_id, show_title=show_title, mode=mode, quality=quality, backfill=backfill)
+    )
+    return jsonify(item), 201
+
+
+@api_bp.patch("/watchlist/<watch_id>")
+def update_watch(watch_id: str):
+    watchlist = current_app.extensions["watchlist"]
+    body = request.get_json(force=True)
+    if "finished" not in body:
+        return jsonify({"error": "finished is required"}), 400
+    if not watchlist.set_finished(watch_id, bool(body["finished"])):
+        return jsonify({"error": "Watch not found"}), 404
+    return jsonify(watchlist.get(watch_id))
+
+
+@api_bp.delete("/watchlist/<watch_id>")
+def remove_watch(watch_id: str):
+    watchlist = current_app.extensions["watchlist"]
+    if not watchlist.remove(watch_id):
+        return jsonify({"error": "Watch not found"}), 404
+    return jsonify({"ok": True, "watch_id": watch_id})
+
+
+@api_bp.get("/storage")
+def storage_usage():
+    eviction = current_app.extensions["eviction"]
+    return jsonify(eviction.usage())
+
+
+@api_bp.post("/storage/evict")
+def run_eviction():
+    eviction = current_app.extensions["eviction"]
+    if not eviction.enabled:
+        return jsonify({"error": "Eviction is disabled (EVICTION_ENABLED=0)"}), 409
+    return jsonify({"evicted": eviction.run_once()})
+
+
+@api_bp.put("/storage/pins/<show>")
+def pin_show(show: str):
+    _, _, media = _services()
+    media.usage.pin_show(show)
+    return jsonify({"pinned_shows": media.usage.pinned_shows()})
+
+
+@api_bp.delete("/storage/pins/<show>")
+def unpin_show(show: str):
+    _, _, media = _services()
+    if not media.usage.unpin_show(show):
+        return jsonify({"error": "Show is not pinned"}), 404
+    return jsonify({"pinned_shows": media.usage.pinned_shows()})
+
+
+@api_bp.get("/dedup")
+def dedup_status():
+    dedup = current_app.extensions["dedup"]
+    return jsonify(dedup.status())
+
+
+@api_bp.post("/dedup")
+def start_dedup():
+    dedup = current_app.extensions["dedup"]
+    body = request.get_json(silent=True) or {}
+    if not dedup.start(dry_run=bool(body.get("dry_run", True))):
+        return jsonify({"error": "A dedup pass is already running"}), 409
+    return jsonify(dedup.status()), 202
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import gzip
+
+from flask import Flask, Response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {"application/json", "text/plain", "text/html", "text/css", "text/javascript"}
+
+
+def not_modified(tag: str) -> Response | None:
+    if not request.if_none_match.contains_weak(tag):
+        return None
+    response = Response(status=304)
+    return tagged(response, tag)
+
+
+def tagged(response: Response, tag: str) -> Response:
+    response.set_etag(tag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def install_compression(app: Flask, min_bytes: int = 1024) -> None:
+    if min_bytes <= 0:
+        return
+
+    @app.after_request
+    def compress(response: Response) -> Response:
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        if len(body) < min_bytes:
+            return response
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            response.set_data(brotli.compress(body, quality=4))
+            response.headers["Content-Encoding"] = "br"
+        elif accepted["gzip"]:
+            response.set_data(gzip.compress(body, compresslevel=5))
+            response.headers["Content-Encoding"] = "gzip"
+        return response
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import time
+
+from flask import Blueprint, Flask, Response, g, request
+
+from app.metrics import CONTENT_TYPE, REGISTRY
+
+HTTP_LATENCY = REGISTRY.histogram(
+    "animefin_http_request_seconds",
+    "Time to produce an HTTP response, by route template.",
+    ("method", "route", "status"),
+)
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.get("/metrics")
+def metrics() -> Response:
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+def install_http_metrics(app: Flask) -> None:
+    @app.before_request
+    def start_timer() -> None:
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def observe(response: Response) -> Response:
+        started = g.pop("metrics_started", None)
+        if started is not None and request.endpoint != "metrics.metrics":
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            HTTP_LATENCY.observe(
+                time.perf_counter() - started,
+                method=request.method,
+                route=route,
+                status=str(response.status_code),
+            )
+        return response
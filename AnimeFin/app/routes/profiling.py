@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import cProfile
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, Response, g, request
+from flask.json.provider import DefaultJSONProvider
+
+from app.metrics import REGISTRY
+from app.profiling import RequestProfile, activate, current_profile, deactivate, profiled
+
+SLOW_REQUESTS = REGISTRY.counter(
+    "animefin_slow_requests_total",
+    "Requests slower than PROFILE_SLOW_MS, by route and whether a cProfile dump was kept.",
+    ("route", "captured"),
+)
+TIMING_PHASES = ("sqlite", "upstream", "serialize")
+
+
+class ProfiledJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        with profiled("serialize"):
+            return super().dumps(obj, **kwargs)
+
+
+def server_timing(profile: RequestProfile, total: float) -> str:
+    parts = []
+    for name in TIMING_PHASES:
+        if name in profile.seconds:
+            count = profile.counts[name]
+            unit = "statement" if name == "sqlite" else "call"
+            desc = f"{count} {unit}{'' if count == 1 else 's'}"
+            parts.append(f'{name};dur={profile.seconds[name] * 1000:.2f};desc="{desc}"')
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class SlowRequestCapture:
+    def __init__(self, directory: Path, *, keep: int = 50) -> None:
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def save(self, profiler: cProfile.Profile, route: str, method: str, elapsed: float) -> Path:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / f"{stamp}-{method}-{slug}-{elapsed * 1000:.0f}ms.prof"
+            profiler.dump_stats(path)
+            captures = sorted(self.directory.glob("*.prof"))
+            for expired in captures[: max(0, len(captures) - self.keep)]:
+                expired.unlink(missing_ok=True)
+        return path
+
+
+def install_request_profiling(
+    app: Flask,
+    capture: SlowRequestCapture,
+    *,
+    slow_ms: float = 500,
+    sample_rate: float = 0.1,
+) -> None:
+    app.json = ProfiledJSONProvider(app)
+    profiler_lock = threading.Lock()
+
+    @app.before_request
+    def start_profile() -> None:
+        g.profile_started = time.perf_counter()
+        g.profile_token = activate(RequestProfile())
+        if sample_rate > 0 and random.random() < sample_rate and profiler_lock.acquire(blocking=False):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def report_profile(response: Response) -> Response:
+        profile = current_profile()
+        started = g.pop("profile_started", None)
+        if profile is None or started is None:
+            return response
+        profiler = _stop_profiler()
+        elapsed = time.perf_counter() - started
+        response.headers["Server-Timing"] = server_timing(profile, elapsed)
+        if elapsed * 1000 >= slow_ms:
+            route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            if profiler is not None:
+                capture.save(profiler, route, request.method, elapsed)
+            SLOW_REQUESTS.inc(route=route, captured="yes" if profiler is not None else "no")
+        return response
+
+    @app.teardown_request
+    def end_profile(exc: BaseException | None = None) -> None:  # noqa: ARG001
+        _stop_profiler()
+        token = g.pop("profile_token", None)
+        if token is not None:
+            deactivate(token)
+
+    def _stop_profiler() -> cProfile.Profile | None:
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            profiler_lock.release()
+        return profiler
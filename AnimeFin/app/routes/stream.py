@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from werkzeug.http import http_date, parse_date, parse_etags, parse_range_header, quote_etag
+from werkzeug.wsgi import wrap_file
+
+
+stream_bp = Blueprint("stream", __name__)
+
+CHUNK_SIZE = 64 * 1024
+MAX_RANGES = 16
+
+
+class _RangeFile:
+    # Keeps fileno() so WSGI servers with a sendfile-capable file_wrapper can skip Python reads.
+    def __init__(self, handle: BinaryIO, start: int, length: int) -> None:
+        self._handle = handle
+        self._remaining = length
+        handle.seek(start)
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b""
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._handle.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self) -> int:
+        return self._handle.fileno()
+
+    def tell(self) -> int:
+        return self._handle.tell()
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+def _etag_for(stat: os.stat_result) -> str:
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def _if_range_matches(etag: str, mtime: int) -> bool:
+    header = (request.headers.get("If-Range") or "").strip()
+    if not header:
+        return True
+    if header.startswith(('"', "W/")):
+        return header == quote_etag(etag)
+    parsed = parse_date(header)
+    return parsed is not None and int(parsed.timestamp()) == mtime
+
+
+def _satisfiable_ranges(size: int) -> list[tuple[int, int]] | None:
+    parsed = parse_range_header(request.headers.get("Range"))
+    if parsed is None or parsed.units != "bytes":
+        return None
+    ranges: list[tuple[int, int]] = []
+    for begin, end in parsed.ranges[:MAX_RANGES]:
+        if begin < 0:
+            start, stop = max(0, size + begin), size
+        else:
+            start, stop = begin, size if end is None else min(end, size)
+        if start < stop:
+            ranges.append((start, stop))
+    ranges.sort()
+    merged: list[tuple[int, int]] = []
+    for start, stop in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(stop, merged[-1][1]))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def _multipart_body(
+    path: Path, ranges: list[tuple[int, int]], size: int, content_type: str, boundary: str
+) -> Iterator[bytes]:
+    with path.open("rb") as handle:
+        for start, stop in ranges:
+            yield (
+                f"\r\n--{boundary}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Range: bytes {start}-{stop - 1}/{size}\r\n\r\n"
+            ).encode("latin-1")
+            handle.seek(start)
+            remaining = stop - start
+            while remaining > 0:
+                data = handle.read(min(CHUNK_SIZE, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+        yield f"\r\n--{boundary}--\r\n".encode("latin-1")
+
+
+def _multipart_length(ranges: list[tuple[int, int]], size: int, content_type: str, boundary: str) -> int:
+    total = len(f"\r\n--{boundary}--\r\n")
+    for start, stop in ranges:
+        header = (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{stop - 1}/{size}\r\n\r\n"
+        )
+        total += len(header) + (stop - start)
+    return total
+
+
+@stream_bp.get("/media/<path:media_id>")
+def stream_media(media_id: str):
+    media = current_app.extensions["media"]
+    try:
+        path = media._safe_path(media_id)
+    except ValueError:
+        return jsonify({"error": "Invalid media path"}), 400
+    if not path.is_file():
+        return jsonify({"error": "Media item not found"}), 404
+
+    stat = path.stat()
+    size = stat.st_size
+    mtime = int(stat.st_mtime)
+    etag = _etag_for(stat)
+    content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    headers = {
+        "ETag": quote_etag(etag),
+        "Last-Modified": http_date(mtime),
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        if parse_etags(if_none_match).contains_weak(etag):
+            return Response(status=304, headers=headers)
+    else:
+        since = parse_date(request.headers.get("If-Modified-Since"))
+        if since is not None and mtime <= int(since.timestamp()):
+            return Response(status=304, headers=headers)
+
+    ranges = None
+    if "Range" in request.headers and _if_range_matches(etag, mtime):
+        ranges = _satisfiable_ranges(size)
+        if ranges is not None and not ranges:
+            headers["Content-Range"] = f"bytes */{size}"
+            return Response(status=416, headers=headers)
+
+    media.record_access(path.relative_to(media.downloads_root).as_posix())
+
+    if ranges and len(ranges) > 1:
+        boundary = uuid.uuid4().hex
+        headers["Content-Length"] = str(_multipart_length(ranges, size, content_type, boundary))
+        return Response(
+            _multipart_body(path, ranges, size, content_type, boundary),
+            status=206,
+            headers=headers,
+            content_type=f"multipart/byteranges; boundary={boundary}",
+            direct_passthrough=True,
+        )
+
+    start, stop = ranges[0] if ranges else (0, size)
+    status = 206 if ranges else 200
+    if ranges:
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    headers["Content-Length"] = str(stop - start)
+    body = wrap_file(request.environ, _RangeFile(path.open("rb"), start, stop - start), CHUNK_SIZE)
+    return Response(body, status=status, headers=headers, content_type=content_type, direct_passthrough=True)
@@ -1,18 +1,97 @@
 from __future__ import annotations
 
+import hashlib
+import http.client
 import json
-import urllib.error
+import re
+import threading
+import time
+import urllib.parse
 import urllib.request
+from collections import OrderedDict
 from typing import Any
 
+from app.metrics import REGISTRY
+from app.profiling import profiled
+from app.services.resilience import CircuitBreaker, HedgedCaller, LatencyTracker, UpstreamDegradedError
+
+
+# OSError covers URLError, timeouts and dropped connections; HTTPException covers IncompleteRead and friends;
+# ValueError covers malformed JSON and undecodable bodies.
+UPSTREAM_ERRORS = (OSError, http.client.HTTPException, ValueError)
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "animefin_upstream_request_seconds",
+    "Latency of AnimeSourceService upstream calls.",
+    ("outcome",),
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "animefin_upstream_requests_total",
+    "AnimeSourceService upstream calls by outcome (ok, error, rejected by the circuit breaker).",
+    ("outcome",),
+)
+SOURCE_PROVIDERS = ("Default", "Yt-mp4", "S-mp4", "Luf-Mp4")
+
+
+def decode_source_id(encoded: str) -> str:
+    return bytes(b ^ 0x38 for b in bytes.fromhex(encoded)).decode("latin-1").replace("/clock", "/clock.json", 1)
+
+
+def _resolution(label: str) -> int:
+    match = re.match(r"\d+", label or "")
+    return int(match.group()) if match else 0
+
 
 class AnimeSourceService:
-    def __init__(self, api_url: str, referer: str, user_agent: str) -> None:
+    SEARCH_CACHE_ENTRIES = 256
+
+    def __init__(
+        self,
+        api_url: str,
+        referer: str,
+        user_agent: str,
+        *,
+        timeout: float = 20,
+        breaker: CircuitBreaker | None = None,
+        hedge: bool = False,
+        search_cache_seconds: float = 0,
+    ) -> None:
         self.api_url = api_url
+        host = urllib.parse.urlsplit(api_url).netloc
+        self.media_base = f"https://{host.removeprefix('api.')}"
         self.referer = referer
         self.user_agent = user_agent
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._hedger = HedgedCaller(LatencyTracker()) if hedge else None
+        self.search_cache_seconds = search_cache_seconds
+        self._search_cache: OrderedDict[tuple[str, str], tuple[float, str, list[dict[str, Any]]]] = OrderedDict()
+        self._search_lock = threading.Lock()
 
-    def _post_graphql(self, payload: dict[str, Any], timeout: int = 20) -> dict[str, Any]:
+    def _call_upstream(self, payload: dict[str, Any]) -> dict[str, Any]:
+        if not self.breaker.allow_request():
+            UPSTREAM_REQUESTS.inc(outcome="rejected")
+            raise UpstreamDegradedError("Upstream source API is degraded", self.breaker.retry_after())
+        started = time.perf_counter()
+        try:
+            with profiled("upstream"):
+                if self._hedger:
+                    data = self._hedger.call(lambda: self._post_graphql(payload, self.timeout))
+                else:
+                    data = self._post_graphql(payload, self.timeout)
+        except UPSTREAM_ERRORS as exc:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, outcome="error")
+            UPSTREAM_REQUESTS.inc(outcome="error")
+            self.breaker.record_failure()
+            raise UpstreamDegradedError(f"Upstream source API request failed: {exc}", self.breaker.retry_after()) from exc
+        except BaseException:
+            self.breaker.release()
+            raise
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started, outcome="ok")
+        UPSTREAM_REQUESTS.inc(outcome="ok")
+        self.breaker.record_success()
+        return data
+
+    def _post_graphql(self, payload: dict[str, Any], timeout: float = 20) -> dict[str, Any]:
         request = urllib.request.Request(
             self.api_url,
             data=json.dumps(payload).encode("utf-8"),
@@ -44,10 +123,7 @@ class AnimeSourceService:
             },
             "query": gql,
         }
-        try:
-            data = self._post_graphql(payload)
-        except (urllib.error.URLError, TimeoutError, json.JSONDecodeError):
-            return []
+        data = self._call_upstream(payload)
 
         edges = (((data or {}).get("data") or {}).get("shows") or {}).get("edges") or []
         results: list[dict[str, Any]] = []
@@ -67,15 +143,100 @@ class AnimeSourceService:
             )
         return results
 
+    def search_version(self, query: str, mode: str = "sub") -> str | None:
+        cached = self._cached_search((query.casefold(), mode))
+        return cached[0] if cached else None
+
+    def search_shows_versioned(self, query: str, mode: str = "sub") -> tuple[str, list[dict[str, Any]]]:
+        key = (query.casefold(), mode)
+        cached = self._cached_search(key)
+        if cached:
+            return cached
+        results = self.search_shows(query, mode)
+        version = hashlib.blake2b(json.dumps(results, sort_keys=True).encode(), digest_size=8).hexdigest()
+        if self.search_cache_seconds > 0:
+            with self._search_lock:
+                self._search_cache[key] = (time.monotonic() + self.search_cache_seconds, version, results)
+                self._search_cache.move_to_end(key)
+                while len(self._search_cache) > self.SEARCH_CACHE_ENTRIES:
+                    self._search_cache.popitem(last=False)
+        return version, results
+
+    def _cached_search(self, key: tuple[str, str]) -> tuple[str, list[dict[str, Any]]] | None:
+        with self._search_lock:
+            entry = self._search_cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._search_cache[key]
+                return None
+            return entry[1], entry[2]
+
     def list_episodes(self, show_id: str, mode: str = "sub") -> list[str]:
         gql = "query ($showId: String!) { show( _id: $showId ) { _id availableEpisodesDetail }}"
         payload: dict[str, Any] = {"variables": {"showId": show_id}, "query": gql}
-        try:
-            data = self._post_graphql(payload)
-        except (urllib.error.URLError, TimeoutError, json.JSONDecodeError):
-            return []
+        data = self._call_upstream(payload)
 
         details = (((data or {}).get("data") or {}).get("show") or {}).get("availableEpisodesDetail") or {}
         episodes = details.get(mode) or []
         numeric = sorted({str(e) for e in episodes}, key=lambda x: float(x))
         return numeric
+
+    def resolve_episode_source(
+        self, show_id: str, mode: str, episode: str, quality: str = "best"
+    ) -> dict[str, str] | None:
+        gql = (
+            "query ($showId: String!, $translationType: VaildTranslationTypeEnumType!, $episodeString: String!) { "
+            "episode( showId: $showId translationType: $translationType episodeString: $episodeString ) { "
+            "episodeString sourceUrls }}"
+        )
+        payload: dict[str, Any] = {
+            "variables": {"showId": show_id, "translationType": mode, "episodeString": str(episode)},
+            "query": gql,
+        }
+        data = self._call_upstream(payload)
+        episode_data = ((data or {}).get("data") or {}).get("episode") or {}
+        sources = {
+            item.get("sourceName"): item["sourceUrl"][2:]
+            for item in episode_data.get("sourceUrls") or []
+            if str(item.get("sourceUrl") or "").startswith("--")
+        }
+        candidates: list[tuple[int, str, str, str]] = []
+        for provider in SOURCE_PROVIDERS:
+            if provider in sources:
+                candidates.extend(self._provider_links(decode_source_id(sources[provider])))
+        if not candidates:
+            return None
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        chosen = candidates[0]
+        if quality == "worst":
+            chosen = candidates[-1]
+        elif quality not in {"", "best"}:
+            chosen = next((c for c in candidates if str(c[0]) == quality.rstrip("p")), chosen)
+        _, url, source_type, referer = chosen
+        return {"url": url, "type": source_type, "referer": referer}
+
+    def _provider_links(self, path: str) -> list[tuple[int, str, str, str]]:
+        request = urllib.request.Request(
+            self.media_base + path, headers={"Referer": self.referer, "User-Agent": self.user_agent}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read().decode("utf-8"))
+        except UPSTREAM_ERRORS:
+            return []
+        links: list[tuple[int, str, str, str]] = []
+        for item in (data or {}).get("links") or []:
+            link = str(item.get("link") or "")
+            if not link:
+                continue
+            referer = str((item.get("headers") or {}).get("Referer") or self.referer)
+            if "repackager.wixmp.com" in link:
+                base = re.sub(r"\.urlset.*", "", link.replace("repackager.wixmp.com/", ""))
+                listed = re.search(r"/,([^/]*),/mp4", link)
+                for label in listed.group(1).split(",") if listed else []:
+                    links.append((_resolution(label), re.sub(r",[^/]*", lambda _: label, base), "mp4_aria2", referer))
+                continue
+            source_type = "m3u8_ffmpeg" if item.get("hls") or ".m3u8" in link else "mp4_aria2"
+            links.append((_resolution(str(item.get("resolutionStr") or "")), link, source_type, referer))
+        return links
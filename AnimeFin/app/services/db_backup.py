@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from app.metrics import REGISTRY
+
+BACKUPS = REGISTRY.counter("animefin_db_backups_total", "Database backups by outcome.", ("outcome",))
+BACKUP_SECONDS = REGISTRY.histogram("animefin_db_backup_seconds", "Wall time of database backups.")
+BACKUP_SUFFIX = ".sqlite3"
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+class DatabaseBackup:
+    def __init__(
+        self,
+        db_path: Path,
+        backup_dir: Path,
+        *,
+        interval_seconds: float = 86400,
+        keep: int = 7,
+        pages_per_step: int = 256,
+        step_sleep: float = 0.01,
+        max_restarts: int = 5,
+    ) -> None:
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.interval_seconds = interval_seconds
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread_started = False
+
+    def start(self) -> None:
+        if self.interval_seconds > 0 and not self._thread_started:
+            self._thread.start()
+            self._thread_started = True
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def list_backups(self) -> list[Path]:
+        if not self.backup_dir.exists():
+            return []
+        return sorted(p for p in self.backup_dir.glob(f"{self.db_path.stem}-*{BACKUP_SUFFIX}") if p.is_file())
+
+    def run_once(self, now: datetime | None = None) -> dict[str, Any]:
+        moment = now or datetime.now(timezone.utc)
+        with self._run_lock:
+            self.backup_dir.mkdir(parents=True, exist_ok=True)
+            target = self.backup_dir / f"{self.db_path.stem}-{moment.strftime('%Y%m%dT%H%M%S%fZ')}{BACKUP_SUFFIX}"
+            partial = target.with_name(target.name + ".partial")
+            started = time.monotonic()
+            try:
+                stats = self._copy(self.db_path, partial, self.pages_per_step)
+                self._verify(partial)
+                os.replace(partial, target)
+            except (OSError, sqlite3.Error):
+                BACKUPS.inc(outcome="error")
+                partial.unlink(missing_ok=True)
+                raise
+            elapsed = time.monotonic() - started
+            BACKUPS.inc(outcome="ok")
+            BACKUP_SECONDS.observe(elapsed)
+            removed = self._rotate()
+        return {
+            "path": str(target),
+            "bytes": target.stat().st_size,
+            "seconds": round(elapsed, 3),
+            "removed": [str(p) for p in removed],
+            **stats,
+        }
+
+    def restore(self, source: Path) -> dict[str, Any]:
+        self._verify(source)
+        with self._run_lock:
+            safety = None
+            if self.db_path.exists():
+                self.backup_dir.mkdir(parents=True, exist_ok=True)
+                stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+                safety = self.backup_dir / f"pre-restore-{self.db_path.stem}-{stamp}{BACKUP_SUFFIX}"
+                self._copy(self.db_path, safety, -1)
+            stats = self._copy(source, self.db_path, -1)
+        return {"restored_from": str(source), "safety_copy": str(safety) if safety else None, **stats}
+
+    def _copy(self, source: Path, target: Path, pages: int) -> dict[str, int]:
+        progress = {"steps": 0, "restarts": 0, "pages": 0, "remaining": None}
+
+        def on_step(status: int, remaining: int, total: int) -> None:
+            if progress["remaining"] is not None and remaining > progress["remaining"]:
+                progress["restarts"] += 1
+                if progress["restarts"] > self.max_restarts:
+                    raise _TooManyRestarts
+            progress["steps"] += 1
+            progress["pages"] = total
+            progress["remaining"] = remaining
+            if remaining and self.step_sleep > 0:
+                time.sleep(self.step_sleep)
+
+        with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(target)) as dst:
+            try:
+                src.backup(dst, pages=pages, progress=on_step)
+                single_pass = 0
+            except _TooManyRestarts:
+                src.backup(dst, pages=-1)
+                single_pass = 1
+            if dst.execute("PRAGMA journal_mode").fetchone()[0] == "wal" and target != self.db_path:
+                dst.execute("PRAGMA journal_mode = DELETE")
+        return {
+            "pages": progress["pages"],
+            "steps": progress["steps"],
+            "restarts": progress["restarts"],
+            "single_pass": single_pass,
+        }
+
+    @staticmethod
+    def _verify(path: Path) -> None:
+        if not path.is_file():
+            raise FileNotFoundError(path)
+        with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+            result = conn.execute("PRAGMA quick_check").fetchone()[0]
+        if result != "ok":
+            raise sqlite3.DatabaseError(f"Backup {path} failed integrity check: {result}")
+
+    def _rotate(self) -> list[Path]:
+        backups = self.list_backups()
+        expired = backups[: max(0, len(backups) - self.keep)] if self.keep > 0 else []
+        for path in expired:
+            path.unlink(missing_ok=True)
+        return expired
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            backups = self.list_backups()
+            age = time.time() - backups[-1].stat().st_mtime if backups else None
+            if age is None or age >= self.interval_seconds:
+                try:
+                    self.run_once()
+                except (OSError, sqlite3.Error):
+                    pass
+                delay = self.interval_seconds
+            else:
+                delay = self.interval_seconds - age
+            self._wake.wait(delay)
+            self._wake.clear()
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from app.storage.hash_index import HashIndex
+from app.storage.jobs import utc_now_iso
+from app.storage.media import TRASH_DIR_NAME, MediaStore
+
+
+PARTIAL_BYTES = 1024 * 1024
+READ_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class _File:
+    path: Path
+    size: int
+    mtime_ns: int
+    dev: int
+    ino: int
+
+
+def _blake2(path: Path, limit: int | None = None) -> str:
+    digest = hashlib.blake2b(digest_size=32)
+    remaining = limit
+    with path.open("rb") as handle:
+        while remaining is None or remaining > 0:
+            chunk = handle.read(READ_CHUNK if remaining is None else min(READ_CHUNK, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+class DedupService:
+    def __init__(self, media: MediaStore, hashes: HashIndex, *, partial_bytes: int = PARTIAL_BYTES) -> None:
+        self.media = media
+        self.hashes = hashes
+        self.partial_bytes = partial_bytes
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._last_report: dict[str, Any] | None = None
+
+    def status(self) -> dict[str, Any]:
+        running = self._thread is not None and self._thread.is_alive()
+        return {"running": running, "last_report": self._last_report}
+
+    def start(self, dry_run: bool = True) -> bool:
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._thread = threading.Thread(target=self.run, kwargs={"dry_run": dry_run}, daemon=True)
+        self._thread.start()
+        return True
+
+    def run(self, dry_run: bool = True) -> dict[str, Any]:
+        with self._lock:
+            started_at = utc_now_iso()
+            files = self._scan()
+            cache = self.hashes.lookup()
+            by_size: dict[int, list[_File]] = defaultdict(list)
+            for item in files:
+                by_size[item.size].append(item)
+
+            hashed_partial = hashed_full = 0
+            groups: list[list[_File]] = []
+            for size, same_size in by_size.items():
+                if size == 0 or len({(f.dev, f.ino) for f in same_size}) < 2:
+                    continue
+                by_partial: dict[str, list[_File]] = defaultdict(list)
+                for item in same_size:
+                    digest, fresh = self._digest(item, cache, full=False)
+                    hashed_partial += fresh
+                    by_partial[digest].append(item)
+                for candidates in by_partial.values():
+                    if len({(f.dev, f.ino) for f in candidates}) < 2:
+                        continue
+                    by_full: dict[str, list[_File]] = defaultdict(list)
+                    for item in candidates:
+                        if size <= self.partial_bytes:
+                            digest, fresh = self._digest(item, cache, full=False)
+                        else:
+                            digest, fresh = self._digest(item, cache, full=True)
+                            hashed_full += fresh
+                        by_full[digest].append(item)
+                    groups.extend(g for g in by_full.values() if len({(f.dev, f.ino) for f in g}) > 1)
+
+            report_groups = []
+            reclaimable = linked = skipped = failed = 0
+            for group in groups:
+                keeper = min(group, key=lambda f: (f.mtime_ns, str(f.path)))
+                duplicates = [f for f in group if (f.dev, f.ino) != (keeper.dev, keeper.ino)]
+                linkable = {(f.dev, f.ino) for f in duplicates if f.dev == keeper.dev}
+                reclaimable += keeper.size * len(linkable)
+                if not dry_run:
+                    for item in duplicates:
+                        if item.dev != keeper.dev:
+                            continue
+                        try:
+                            done = self._hardlink(keeper, item, cache.get(str(keeper.path)) or {})
+                        except OSError:
+                            failed += 1
+                            continue
+                        if done:
+                            linked += 1
+                        else:
+                            skipped += 1
+                report_groups.append(
+                    {
+                        "size": keeper.size,
+                        "keep": self._media_id(keeper.path),
+                        "duplicates": [self._media_id(f.path) for f in duplicates],
+                    }
+                )
+
+            self.hashes.prune({str(f.path) for f in files})
+            report = {
+                "dry_run": dry_run,
+                "started_at": started_at,
+                "finished_at": utc_now_iso(),
+                "files_scanned": len(files),
+                "partial_hashes_computed": hashed_partial,
+                "full_hashes_computed": hashed_full,
+                "duplicate_groups": report_groups,
+                "reclaimable_bytes": reclaimable,
+                "files_linked": linked,
+                "files_skipped_changed": skipped,
+                "files_skipped_error": failed,
+            }
+            self._last_report = report
+            return report
+
+    def _scan(self) -> list[_File]:
+        root = self.media.downloads_root
+        files: list[_File] = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            if Path(dirpath) == root and TRASH_DIR_NAME in dirnames:
+                dirnames.remove(TRASH_DIR_NAME)
+            for name in filenames:
+                path = Path(dirpath) / name
+                try:
+                    stat = path.lstat()
+                except FileNotFoundError:
+                    continue
+                if not path.is_symlink():
+                    files.append(_File(path, stat.st_size, stat.st_mtime_ns, stat.st_dev, stat.st_ino))
+        return files
+
+    def _digest(self, item: _File, cache: dict[str, dict[str, Any]], *, full: bool) -> tuple[str, int]:
+        key = str(item.path)
+        column = "full_hash" if full else "partial_hash"
+        cached = cache.get(key)
+        if cached and cached["size"] == item.size and cached["mtime_ns"] == item.mtime_ns and cached.get(column):
+            return cached[column], 0
+        digest = _blake2(item.path, None if full else self.partial_bytes)
+        self.hashes.save(key, item.size, item.mtime_ns, **{column: digest})
+        entry = cache.setdefault(key, {"size": item.size, "mtime_ns": item.mtime_ns})
+        if entry["size"] != item.size or entry["mtime_ns"] != item.mtime_ns:
+            entry.clear()
+            entry.update({"size": item.size, "mtime_ns": item.mtime_ns})
+        entry[column] = digest
+        return digest, 1
+
+    @staticmethod
+    def _unchanged(item: _File) -> bool:
+        try:
+            stat = item.path.lstat()
+        except FileNotFoundError:
+            return False
+        return (stat.st_size, stat.st_mtime_ns, stat.st_dev, stat.st_ino) == (
+            item.size,
+            item.mtime_ns,
+            item.dev,
+            item.ino,
+        )
+
+    def _hardlink(self, keeper: _File, duplicate: _File, hashes: dict[str, Any]) -> bool:
+        # Files can be rewritten in place (post-processing) between hashing and linking;
+        # only link when both sides still match what was hashed.
+        if not self._unchanged(keeper):
+            return False
+        target = duplicate.path
+        temp = target.with_name(f".{target.name}.dedup-tmp")
+        try:
+            # A crash between link and replace leaves the temp behind; clear it or os.link fails forever.
+            temp.unlink(missing_ok=True)
+            os.link(keeper.path, temp)
+            if not self._unchanged(duplicate):
+                return False
+            os.replace(temp, target)
+        finally:
+            temp.unlink(missing_ok=True)
+        stat = target.stat()
+        self.hashes.save(
+            str(target),
+            stat.st_size,
+            stat.st_mtime_ns,
+            partial_hash=hashes.get("partial_hash"),
+            full_hash=hashes.get("full_hash"),
+        )
+        return True
+
+    def _media_id(self, path: Path) -> str:
+        return path.relative_to(self.media.downloads_root).as_posix()
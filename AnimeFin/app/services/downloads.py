@@ -1,15 +1,52 @@
 from __future__ import annotations
 
-import queue
+import os
 import re
+import sqlite3
 import subprocess
 import threading
-import os
+import time
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable
 
+from app.metrics import DURATION_BUCKETS, REGISTRY, Gauge
+from app.services.schedule import DownloadLimits, DownloadSchedule
+from app.services.stream_resolver import StreamResolver, source_expired
 from app.services.executors import Aria2Executor, BaseExecutor, FfmpegExecutor, YtDlpExecutor
+from app.services.tracing import JobTrace
 from app.storage.jobs import JobsStore, NewJob, utc_now_iso
+from app.storage.traces import TraceStore
+
+JOB_DURATION = REGISTRY.histogram(
+    "animefin_job_duration_seconds",
+    "Wall-clock duration of download jobs by final status.",
+    ("status", "executor"),
+    DURATION_BUCKETS,
+)
+ACTIVE_WORKERS = REGISTRY.gauge("animefin_download_workers_active", "Download workers currently running a job.")
+DOWNLOADED_BYTES = REGISTRY.counter(
+    "animefin_downloaded_bytes_total",
+    "Bytes written by downloaders; use rate() for bytes per second.",
+    ("executor",),
+)
+ANI_CLI_BATCH_EPISODES = REGISTRY.histogram(
+    "animefin_ani_cli_batch_episodes",
+    "Episodes coalesced into a single ani-cli invocation.",
+    buckets=(1.0, 2.0, 4.0, 8.0, 12.0, 24.0),
+)
+
+JOB_STATUSES = ("scheduled", "queued", "running", "done", "failed", "failed_recoverable", "cancelled")
+TERMINAL_STATUSES = frozenset({"done", "failed", "cancelled"})
+
+
+def queue_depth_metrics(jobs_store: JobsStore) -> list[Gauge]:
+    gauge = Gauge("animefin_jobs", "Download jobs by status.", ("status",))
+    counts = jobs_store.count_by_status()
+    for status in sorted(set(JOB_STATUSES) | set(counts)):
+        gauge.set(counts.get(status, 0), status=status)
+    return [gauge]
 
 
 @dataclass(frozen=True)
@@ -22,6 +59,7 @@ class DownloadRequest:
     source_url: str = ""
     source_type: str = ""
     referer: str = ""
+    schedule: str = "immediate"
 
 
 class DownloadService:
@@ -29,25 +67,77 @@ class DownloadService:
         re.compile(r"(?P<pct>\d+(?:\.\d+)?)%"),
     ]
 
-    def __init__(self, jobs_store: JobsStore, downloads_root: Path, ani_cli_path: Path) -> None:
+    CANCEL_CHECK_SECONDS = 1.0
+    BYTES_SAMPLE_SECONDS = 1.0
+    FOLLOW_POLL_MAX_SECONDS = 0.5
+    SCHEDULE_CHECK_SECONDS = 5.0
+    BATCH_EPISODE_PATTERN = re.compile(r"Playing episode (?P<episode>\S+?)\.\.\.")
+
+    def __init__(
+        self,
+        jobs_store: JobsStore,
+        downloads_root: Path,
+        ani_cli_path: Path,
+        *,
+        poll_seconds: float = 1.0,
+        traces: TraceStore | None = None,
+        schedule: DownloadSchedule | None = None,
+        max_batch: int = 1,
+        resolver: StreamResolver | None = None,
+    ) -> None:
         self.jobs_store = jobs_store
         self.downloads_root = downloads_root
         self.ani_cli_path = ani_cli_path
-        self._queue: queue.Queue[str] = queue.Queue()
+        self.poll_seconds = poll_seconds
+        self.traces = traces
+        self.schedule = schedule or DownloadSchedule()
+        self.max_batch = max_batch
+        self.resolver = resolver
+        self._wake = threading.Event()
+        self._intake_stopped = threading.Event()
+        self._abort = threading.Event()
         self._cancelled: set[str] = set()
+        self._cancel_checked: dict[str, float] = {}
         self._lock = threading.Lock()
-        self._worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+        self._running: dict[str, str] = {}
+        self._reserved = 0
+        self._preempted: set[str] = set()
+        self._schedule_checked = 0.0
+        self._off_peak_open: bool | None = None
+        self._worker_threads = [
+            threading.Thread(target=self._worker_loop, daemon=True) for _ in range(self.schedule.max_concurrency)
+        ]
         self._worker_thread_started = False
         self._yt_dlp = YtDlpExecutor()
         self._ffmpeg = FfmpegExecutor()
         self._aria2 = Aria2Executor()
+        self._completion_listeners: list[Callable[[dict], None]] = []
 
     def start(self) -> None:
         self.jobs_store.mark_running_jobs_recoverable()
         if not self._worker_thread_started:
-            self._worker_thread.start()
+            for thread in self._worker_threads:
+                thread.start()
             self._worker_thread_started = True
 
+    def shutdown(self, timeout: float = 30) -> bool:
+        self._intake_stopped.set()
+        self._wake.set()
+        if not self._worker_thread_started:
+            return True
+        deadline = time.monotonic() + timeout
+        for thread in self._worker_threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        if any(thread.is_alive() for thread in self._worker_threads):
+            self._abort.set()
+            deadline = time.monotonic() + max(5.0, timeout / 2)
+            for thread in self._worker_threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+        return not any(thread.is_alive() for thread in self._worker_threads)
+
+    def add_completion_listener(self, listener: Callable[[dict], None]) -> None:
+        self._completion_listeners.append(listener)
+
     def enqueue(self, req: DownloadRequest) -> list[str]:
         safe_show = self._safe_show_name(req.show_title)
         created = self.jobs_store.create_jobs(
@@ -62,12 +152,14 @@ class DownloadService:
                     source_url=req.source_url,
                     source_type=req.source_type,
                     referer=req.referer,
+                    schedule=req.schedule,
                 )
                 for ep in req.episodes
             ]
         )
-        for job_id in created:
-            self._queue.put(job_id)
+        self._wake.set()
+        if self.resolver is not None:
+            self.resolver.wake()
         return created
 
     def list_jobs(self) -> list[dict]:
@@ -76,11 +168,28 @@ class DownloadService:
     def get_job(self, job_id: str) -> dict | None:
         return self.jobs_store.get_job(job_id)
 
+    def list_events(self, job_id: str, *, after: int = 0, limit: int = 200) -> list[dict]:
+        return self.jobs_store.list_events(job_id, after=after, limit=limit)
+
+    def tail_events(self, job_id: str, count: int) -> list[dict]:
+        return self.jobs_store.tail_events(job_id, count)
+
+    def wait_for_events(self, job_id: str, *, after: int, limit: int, timeout: float) -> list[dict]:
+        deadline = time.monotonic() + timeout
+        delay = 0.1
+        while True:
+            events = self.jobs_store.list_events(job_id, after=after, limit=limit)
+            remaining = deadline - time.monotonic()
+            if events or remaining <= 0 or self.jobs_store.get_status(job_id) in TERMINAL_STATUSES:
+                return events
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, self.FOLLOW_POLL_MAX_SECONDS)
+
     def cancel(self, job_id: str) -> bool:
         job = self.jobs_store.get_job(job_id)
         if not job:
             return False
-        if job["status"] in {"done", "failed", "cancelled"}:
+        if job["status"] in TERMINAL_STATUSES:
             return False
         with self._lock:
             self._cancelled.add(job_id)
@@ -89,62 +198,330 @@ class DownloadService:
         return True
 
     def _worker_loop(self) -> None:
-        while True:
-            job_id = self._queue.get()
+        while not self._intake_stopped.is_set():
+            limits = self.apply_schedule()
+            with self._lock:
+                has_slot = self._reserved < limits.concurrency
+                if has_slot:
+                    self._reserved += 1
+            job_id = self.jobs_store.claim_next_queued() if has_slot else None
+            if job_id is None:
+                if has_slot:
+                    with self._lock:
+                        self._reserved -= 1
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            batch = [job_id]
+            if self.max_batch > 1 and self.ani_cli_path.exists():
+                batch = self.jobs_store.claim_batch(job_id, self.max_batch)
+            ACTIVE_WORKERS.inc()
             try:
-                self._process_job(job_id)
+                if len(batch) > 1:
+                    self._process_batch(batch)
+                else:
+                    self._process_job(job_id, limits)
             finally:
-                self._queue.task_done()
+                ACTIVE_WORKERS.dec()
+                with self._lock:
+                    self._reserved -= 1
+                    for claimed in batch:
+                        self._running.pop(claimed, None)
+                        self._preempted.discard(claimed)
+                        self._cancel_checked.pop(claimed, None)
+                self._wake.set()
 
-    def _process_job(self, job_id: str) -> None:
+    def apply_schedule(self, now: datetime | None = None) -> DownloadLimits:
+        moment = now or datetime.now().astimezone()
+        limits = self.schedule.limits(moment)
+        with self._lock:
+            due = now is not None or time.monotonic() - self._schedule_checked >= self.SCHEDULE_CHECK_SECONDS
+            changed = limits.off_peak_open != self._off_peak_open
+            if not (due or changed):
+                return limits
+            self._schedule_checked = time.monotonic()
+            self._off_peak_open = limits.off_peak_open
+            if not limits.off_peak_open:
+                self._preempted.update(j for j, schedule in self._running.items() if schedule == "off_peak")
+        if limits.off_peak_open:
+            if self.jobs_store.release_scheduled():
+                self._wake.set()
+        else:
+            self.jobs_store.hold_off_peak()
+        return limits
+
+    def _process_job(self, job_id: str, limits: DownloadLimits | None = None) -> None:
         job = self.jobs_store.get_job(job_id)
+        with self._lock:
+            self._running[job_id] = (job or {}).get("schedule") or "immediate"
         if not job:
             return
         if self._is_cancelled(job_id):
             return
+        if source_expired(job):
+            job = self._refresh_source(job)
+        rate_limit = limits.bytes_per_second // max(1, limits.concurrency) if limits else 0
+
+        trace = JobTrace(job_id, self.traces.next_attempt(job_id) if self.traces else 1)
+        outcome = {"status": "failed", "executor": "none"}
+        if trace.attempt == 1:
+            self._trace_queue_wait(trace, job)
+        with trace.span("job", episode=job["episode"], mode=job["mode"]) as root:
+            try:
+                self._run_job(job, trace, outcome, rate_limit)
+            finally:
+                root.attrs.update(outcome)
+        if self.traces is not None:
+            try:
+                self.traces.save(trace.encode(), executor=outcome["executor"], status=outcome["status"])
+            except sqlite3.Error:
+                pass
 
-        self.jobs_store.update_job_status(job_id, status="running", started_at=utc_now_iso(), error_message="")
-        self.jobs_store.append_event(job_id, "info", "Download started")
+    def _run_job(self, job: dict, trace: JobTrace, outcome: dict, rate_limit: int = 0) -> None:
+        job_id = job["id"]
+        with trace.span("prepare"):
+            self.jobs_store.update_job_status(job_id, status="running", started_at=utc_now_iso(), error_message="")
+            self.jobs_store.append_event(job_id, "info", "Download started")
 
-        if not job["source_url"] and not self.ani_cli_path.exists():
-            self.jobs_store.update_job_status(
-                job_id,
-                status="failed",
-                error_message=f"ani-cli not found: {self.ani_cli_path}",
-                finished_at=utc_now_iso(),
-            )
-            self.jobs_store.append_event(job_id, "error", "ani-cli executable is missing")
-            return
+            if not job["source_url"] and not self.ani_cli_path.exists():
+                self.jobs_store.update_job_status(
+                    job_id,
+                    status="failed",
+                    error_message=f"ani-cli not found: {self.ani_cli_path}",
+                    finished_at=utc_now_iso(),
+                )
+                self.jobs_store.append_event(job_id, "error", "ani-cli executable is missing")
+                return
 
-        show_dir = self.downloads_root / self._safe_show_name(job["show_title"])
-        show_dir.mkdir(parents=True, exist_ok=True)
+            show_dir = self.downloads_root / self._safe_show_name(job["show_title"])
+            show_dir.mkdir(parents=True, exist_ok=True)
 
-        env = {**os.environ, "ANI_CLI_DOWNLOAD_DIR": str(show_dir)}
-        command, executor = self._resolve_command_and_executor(job, show_dir)
+        with trace.span("resolve") as resolve_span:
+            env = {**os.environ, "ANI_CLI_DOWNLOAD_DIR": str(show_dir)}
+            command, executor = self._resolve_command_and_executor(job, show_dir, rate_limit)
+            resolve_span.attrs.update(
+                executor=executor.name, source_type=job.get("source_type") or "", rate_limit=rate_limit
+            )
+            outcome["executor"] = executor.name
         self.jobs_store.append_event(job_id, "info", f"Executing: {' '.join(command)}")
+        started = time.monotonic()
+        baseline = self._job_bytes(job, show_dir)
+        sampled = {"at": started, "bytes": 0}
+
+        def sample_bytes(force: bool = False) -> None:
+            now = time.monotonic()
+            if not force and now - sampled["at"] < self.BYTES_SAMPLE_SECONDS:
+                return
+            written = self._job_bytes(job, show_dir) - baseline
+            if written > sampled["bytes"]:
+                DOWNLOADED_BYTES.inc(written - sampled["bytes"], executor=executor.name)
+                self.jobs_store.update_progress(job_id, bytes_downloaded=written)
+            sampled["at"], sampled["bytes"] = now, max(written, sampled["bytes"])
 
         def on_line(clean: str) -> None:
+            sample_bytes()
             if not clean:
                 return
-            self.jobs_store.append_event(job_id, "info", clean)
+            self.jobs_store.append_event(job_id, "info", clean, kind="output")
             self._update_progress_from_line(job_id, clean)
 
-        code = executor.run(command, on_line, env=env, should_stop=lambda: self._is_cancelled(job_id))
+        with trace.span("download", executor=executor.name) as download_span:
+            code = executor.run(
+                command,
+                on_line,
+                env=env,
+                should_stop=lambda: self._abort.is_set() or self._is_preempted(job_id) or self._is_cancelled(job_id),
+            )
+            sample_bytes(force=True)
+            download_span.attrs.update(exit_code=code, bytes=sampled["bytes"])
+        with trace.span("finalize"):
+            status = self._finish_job(job_id, code, trace)
+        outcome["status"] = status
+        JOB_DURATION.observe(time.monotonic() - started, status=status, executor=executor.name)
+
+    def _refresh_source(self, job: dict) -> dict:
+        self.jobs_store.clear_resolution(job["id"], "Resolved stream URL expired; resolving again")
+        if self.resolver is not None:
+            try:
+                self.resolver.resolve_job(job["id"])
+            except Exception as exc:  # noqa: BLE001
+                self.jobs_store.clear_resolution(job["id"], f"Stream resolution failed ({exc}); falling back to ani-cli")
+        return self.jobs_store.get_job(job["id"]) or job
+
+    def _process_batch(self, job_ids: list[str]) -> None:
+        jobs = [job for job in map(self.jobs_store.get_job, job_ids) if job]
+        with self._lock:
+            for job in jobs:
+                self._running[job["id"]] = job.get("schedule") or "immediate"
+        if not jobs:
+            return
+        by_episode = {job["episode"]: job for job in jobs}
+        span = f"{jobs[0]['episode']}-{jobs[-1]['episode']}"
+        show_dir = self.downloads_root / self._safe_show_name(jobs[0]["show_title"])
+        show_dir.mkdir(parents=True, exist_ok=True)
+        ANI_CLI_BATCH_EPISODES.observe(len(jobs))
+
+        started_ns = time.monotonic_ns()
+        started = time.monotonic()
+        traces: dict[str, JobTrace] = {}
+        for job in jobs:
+            trace = JobTrace(job["id"], self.traces.next_attempt(job["id"]) if self.traces else 1)
+            if trace.attempt == 1:
+                self._trace_queue_wait(trace, job)
+            traces[job["id"]] = trace
+            self.jobs_store.update_job_status(job["id"], status="running", started_at=utc_now_iso(), error_message="")
+            self.jobs_store.append_event(
+                job["id"], "info", f"Download started (batch of {len(jobs)}: episodes {span})"
+            )
+
+        command = self._ani_cli_command(jobs[0], span)
+        env = {**os.environ, "ANI_CLI_DOWNLOAD_DIR": str(show_dir)}
+        before = self._episode_files(show_dir)
+        state: dict = {"current": None, "settled": {}}
+
+        def settle(job: dict, code: int) -> None:
+            # A file only proves success once ani-cli has moved past the episode or exited cleanly;
+            # the episode in progress when it crashed or was stopped may be truncated.
+            path = self._fresh_episode_file(show_dir, job["episode"], before) if code == 0 else None
+            status = self._settle_batch_job(job, path, code)
+            state["settled"][job["id"]] = status
+            elapsed = time.monotonic() - started
+            JOB_DURATION.observe(elapsed, status=status, executor="ani-cli")
+            self._save_batch_trace(traces[job["id"]], started_ns, status, batch=len(jobs), episodes=span, exit_code=code)
+
+        def on_line(clean: str) -> None:
+            match = self.BATCH_EPISODE_PATTERN.search(clean)
+            if match and match.group("episode") in by_episode:
+                previous = state["current"]
+                if previous is not None and previous["id"] not in state["settled"]:
+                    settle(previous, 0)
+                state["current"] = current = by_episode[match.group("episode")]
+                self.jobs_store.append_event(current["id"], "info", f"Batch reached episode {current['episode']}")
+                return
+            if clean and state["current"] is not None:
+                self.jobs_store.append_event(state["current"]["id"], "info", clean, kind="output")
+                self._update_progress_from_line(state["current"]["id"], clean)
+
+        def should_stop() -> bool:
+            current = state["current"]
+            return (
+                self._abort.is_set()
+                or self._is_preempted(jobs[0]["id"])
+                or (current is not None and self._is_cancelled(current["id"]))
+            )
+
+        for job in jobs:
+            self.jobs_store.append_event(job["id"], "info", f"Executing: {' '.join(command)}")
+        code = BaseExecutor().run(command, on_line, env=env, should_stop=should_stop)
+        for job in jobs:
+            if job["id"] not in state["settled"]:
+                settle(job, code)
+
+    def _settle_batch_job(self, job: dict, path: Path | None, code: int) -> str:
+        job_id = job["id"]
+        if self._is_cancelled(job_id):
+            return self._finish_job(job_id, code)
+        if path is not None:
+            size = path.stat().st_size
+            DOWNLOADED_BYTES.inc(size, executor="ani-cli")
+            self.jobs_store.update_progress(job_id, bytes_downloaded=size, bytes_total=size)
+            return self._complete_job(job_id)
+        if self._abort.is_set() or self._is_preempted(job_id):
+            return self._finish_job(job_id, code)
+        self.jobs_store.split_from_batch(
+            job_id,
+            f"Batch download ended before episode {job['episode']} was written (exit code {code}); "
+            "retrying it on its own",
+        )
+        self._wake.set()
+        return "split"
+
+    def _save_batch_trace(self, trace: JobTrace, started_ns: int, status: str, **attrs) -> None:
+        ended_ns = time.monotonic_ns()
+        root = trace.add_span("job", started_ns, ended_ns, status=status, executor="ani-cli")
+        trace.add_span("download", started_ns, ended_ns, executor="ani-cli", **attrs).parent = trace.spans.index(root)
+        if self.traces is not None:
+            try:
+                self.traces.save(trace.encode(), executor="ani-cli", status=status)
+            except sqlite3.Error:
+                pass
+
+    @staticmethod
+    def _episode_files(show_dir: Path) -> dict[str, int]:
+        files = {}
+        for path in show_dir.glob("*Episode *.mp4"):
+            try:
+                files[path.name] = path.stat().st_mtime_ns
+            except OSError:
+                continue
+        return files
+
+    @staticmethod
+    def _fresh_episode_file(show_dir: Path, episode: str, before: dict[str, int]) -> Path | None:
+        for path in show_dir.glob(f"*Episode {episode}.mp4"):
+            try:
+                modified = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            if before.get(path.name) != modified:
+                return path
+        return None
+
+    @staticmethod
+    def _trace_queue_wait(trace: JobTrace, job: dict) -> None:
+        try:
+            created = datetime.fromisoformat(job["created_at"])
+        except (KeyError, TypeError, ValueError):
+            return
+        waited_ns = int((datetime.now(timezone.utc) - created).total_seconds() * 1e9)
+        now_ns = time.monotonic_ns()
+        if waited_ns > 0:
+            trace.add_span("queue_wait", now_ns - waited_ns, now_ns)
+
+    def _finish_job(self, job_id: str, code: int, trace: JobTrace | None = None) -> str:
+        if self._abort.is_set() and not self._is_cancelled(job_id):
+            self.jobs_store.requeue_job(job_id, "Interrupted by shutdown; partial download kept for resume")
+            return "requeued"
+        if self._is_preempted(job_id) and not self._is_cancelled(job_id):
+            self.jobs_store.requeue_job(
+                job_id, "Paused: off-peak window closed; partial download kept", status="scheduled"
+            )
+            return "scheduled"
         if self._is_cancelled(job_id):
             self.jobs_store.update_job_status(job_id, status="cancelled", finished_at=utc_now_iso())
             self.jobs_store.append_event(job_id, "warn", "Download cancelled")
-        elif code == 0:
-            self.jobs_store.update_job_status(job_id, status="done", finished_at=utc_now_iso())
-            self.jobs_store.update_progress(job_id, progress_pct=100.0)
-            self.jobs_store.append_event(job_id, "info", "Download completed")
+            return "cancelled"
+        if code == 0:
+            return self._complete_job(job_id, trace)
+        self.jobs_store.update_job_status(
+            job_id,
+            status="failed",
+            error_message=f"Downloader exited with code {code}",
+            finished_at=utc_now_iso(),
+        )
+        self.jobs_store.append_event(job_id, "error", f"Downloader exited with code {code}")
+        return "failed"
+
+    def _complete_job(self, job_id: str, trace: JobTrace | None = None) -> str:
+        self.jobs_store.update_job_status(job_id, status="done", finished_at=utc_now_iso())
+        self.jobs_store.update_progress(job_id, progress_pct=100.0)
+        self.jobs_store.append_event(job_id, "info", "Download completed")
+        if trace is not None:
+            with trace.span("completion_hooks", listeners=len(self._completion_listeners)):
+                self._notify_completed(job_id)
         else:
-            self.jobs_store.update_job_status(
-                job_id,
-                status="failed",
-                error_message=f"Downloader exited with code {code}",
-                finished_at=utc_now_iso(),
-            )
-            self.jobs_store.append_event(job_id, "error", f"Downloader exited with code {code}")
+            self._notify_completed(job_id)
+        return "done"
+
+    def _notify_completed(self, job_id: str) -> None:
+        job = self.jobs_store.get_job(job_id)
+        if not job:
+            return
+        for listener in self._completion_listeners:
+            try:
+                listener(job)
+            except Exception as exc:  # noqa: BLE001
+                self.jobs_store.append_event(job_id, "warn", f"Completion hook failed: {exc}")
 
     def _update_progress_from_line(self, job_id: str, line: str) -> None:
         for pattern in self.PROGRESS_PATTERNS:
@@ -155,7 +532,9 @@ class DownloadService:
                     self.jobs_store.update_progress(job_id, progress_pct=pct)
                 return
 
-    def _resolve_command_and_executor(self, job: dict, show_dir: Path) -> tuple[list[str], BaseExecutor]:
+    def _resolve_command_and_executor(
+        self, job: dict, show_dir: Path, rate_limit: int = 0
+    ) -> tuple[list[str], BaseExecutor]:
         output_path = Path(job["output_path"])
         source_url = str(job.get("source_url") or "").strip()
         source_type = str(job.get("source_type") or "").strip().lower()
@@ -165,27 +544,63 @@ class DownloadService:
             if source_type == "m3u8_ffmpeg":
                 return self._ffmpeg.build_command(source_url, output_path, referer), self._ffmpeg
             if source_type == "mp4_aria2":
-                return self._aria2.build_command(source_url, output_path, referer), self._aria2
-            return self._yt_dlp.build_command(source_url, output_path, referer), self._yt_dlp
+                return self._aria2.build_command(source_url, output_path, referer, rate_limit), self._aria2
+            return self._yt_dlp.build_command(source_url, output_path, referer, rate_limit), self._yt_dlp
 
+        return self._ani_cli_command(job, str(job["episode"])), BaseExecutor()
+
+    def _ani_cli_command(self, job: dict, episodes: str) -> list[str]:
         command = [
             str(self.ani_cli_path),
             "-d",
             "-S",
             "1",
             "-e",
-            str(job["episode"]),
+            episodes,
             str(job["show_title"]),
         ]
         if job["mode"] == "dub":
             command.insert(1, "--dub")
         if job["quality"] not in {"", "best"}:
             command[1:1] = ["-q", str(job["quality"])]
-        return command, BaseExecutor()
+        return command
+
+    def _is_preempted(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._preempted
 
     def _is_cancelled(self, job_id: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if job_id in self._cancelled:
+                return True
+            if now - self._cancel_checked.get(job_id, 0.0) < self.CANCEL_CHECK_SECONDS:
+                return False
+            self._cancel_checked[job_id] = now
+        if self.jobs_store.get_status(job_id) != "cancelled":
+            return False
         with self._lock:
-            return job_id in self._cancelled
+            self._cancelled.add(job_id)
+        return True
+
+    @staticmethod
+    def _job_bytes(job: dict, show_dir: Path) -> int:
+        if job.get("source_url"):
+            output = Path(job["output_path"])
+            paths = [output, output.with_name(f"{output.name}.part")]
+        else:
+            marker = f" Episode {job['episode']}."
+            try:
+                paths = [Path(entry.path) for entry in os.scandir(show_dir) if marker in entry.name]
+            except OSError:
+                return 0
+        total = 0
+        for path in paths:
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue
+        return total
 
     @staticmethod
     def _safe_show_name(show_title: str) -> str:
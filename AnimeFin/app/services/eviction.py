@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import shutil
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from app.storage.media import MediaStore
+
+
+class EvictionEngine:
+    def __init__(
+        self,
+        media: MediaStore,
+        *,
+        quota_bytes: int = 0,
+        high_water: float = 0.9,
+        low_water: float = 0.8,
+        interval_seconds: float = 300,
+        on_evicted: Callable[[], None] | None = None,
+        enabled: bool = True,
+    ) -> None:
+        if not 0 < low_water < high_water <= 1:
+            raise ValueError("Expected 0 < low_water < high_water <= 1")
+        self.media = media
+        self.quota_bytes = quota_bytes
+        self.high_water = high_water
+        self.low_water = low_water
+        self.interval_seconds = interval_seconds
+        self.on_evicted = on_evicted
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread_started = False
+
+    def start(self) -> None:
+        if not self._thread_started:
+            self._thread.start()
+            self._thread_started = True
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def usage(self) -> dict[str, Any]:
+        pending = 0
+        if self.media.deletions is not None:
+            pending = self.media.deletions.pending_bytes(datetime.now(timezone.utc).isoformat())
+        if self.quota_bytes > 0:
+            capacity = self.quota_bytes
+            if self.media.index is not None:
+                used = self.media.index.total_bytes()
+            else:
+                used = sum(item["size_bytes"] for item in self.media.list_media())
+        else:
+            disk = shutil.disk_usage(self.media.downloads_root)
+            capacity = disk.total
+            used = max(0, disk.used - pending)
+        return {
+            "capacity_bytes": capacity,
+            "used_bytes": used,
+            "high_water_bytes": int(capacity * self.high_water),
+            "low_water_bytes": int(capacity * self.low_water),
+            "quota_bytes": self.quota_bytes,
+            "pinned_shows": self.media.usage.pinned_shows() if self.media.usage else [],
+        }
+
+    def run_once(self) -> list[dict[str, Any]]:
+        if self.media.usage is None:
+            return []
+        with self._lock:
+            usage = self.usage()
+            if usage["used_bytes"] < usage["high_water_bytes"]:
+                return []
+            to_free = usage["used_bytes"] - usage["low_water_bytes"]
+            candidates = self.media.usage.eviction_candidates()
+            sizes = self.media.index.sizes([c["media_id"] for c in candidates]) if self.media.index else {}
+
+            evicted: list[dict[str, Any]] = []
+            freed = 0
+            for candidate in candidates:
+                if freed >= to_free:
+                    break
+                media_id = candidate["media_id"]
+                try:
+                    size = sizes.get(media_id)
+                    if size is None:
+                        size = self.media._safe_path(media_id).stat().st_size
+                    self.media.delete_media(media_id, grace_seconds=0)
+                except (FileNotFoundError, ValueError):
+                    self.media.usage.forget(media_id)
+                    continue
+                freed += size
+                evicted.append({"media_id": media_id, "bytes": size, "last_access_at": candidate["last_access_at"]})
+
+        if evicted and self.on_evicted is not None:
+            self.on_evicted()
+        return evicted
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except OSError:
+                pass
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
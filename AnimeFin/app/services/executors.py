@@ -10,6 +10,8 @@ LineHandler = Callable[[str], None]
 
 
 class BaseExecutor:
+    name = "ani-cli"
+
     def run(
         self,
         command: list[str],
@@ -35,7 +37,9 @@ class BaseExecutor:
 
 
 class YtDlpExecutor(BaseExecutor):
-    def build_command(self, url: str, output_path: Path, referer: str = "") -> list[str]:
+    name = "yt-dlp"
+
+    def build_command(self, url: str, output_path: Path, referer: str = "", rate_limit: int = 0) -> list[str]:
         command = [
             "yt-dlp",
             "--newline",
@@ -50,10 +54,14 @@ class YtDlpExecutor(BaseExecutor):
         ]
         if referer:
             command[1:1] = ["--referer", referer]
+        if rate_limit > 0:
+            command[1:1] = ["--limit-rate", str(rate_limit)]
         return command
 
 
 class FfmpegExecutor(BaseExecutor):
+    name = "ffmpeg"
+
     def build_command(self, url: str, output_path: Path, referer: str = "") -> list[str]:
         command = [
             "ffmpeg",
@@ -74,10 +82,13 @@ class FfmpegExecutor(BaseExecutor):
 
 
 class Aria2Executor(BaseExecutor):
-    def build_command(self, url: str, output_path: Path, referer: str = "") -> list[str]:
+    name = "aria2"
+
+    def build_command(self, url: str, output_path: Path, referer: str = "", rate_limit: int = 0) -> list[str]:
         command = [
             "aria2c",
             "--enable-rpc=false",
+            "--continue=true",
             "--check-certificate=false",
             "--summary-interval=0",
             "-x",
@@ -93,4 +104,6 @@ class Aria2Executor(BaseExecutor):
         ]
         if referer:
             command[1:1] = [f"--referer={referer}"]
+        if rate_limit > 0:
+            command[1:1] = [f"--max-overall-download-limit={rate_limit}"]
         return command
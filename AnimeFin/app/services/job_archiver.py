@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from app.services.retention import EventRetention
+from app.storage.job_archive import ARCHIVABLE_STATUSES, JobArchive
+from app.storage.traces import TraceStore
+
+
+class JobArchiver:
+    def __init__(
+        self,
+        archive: JobArchive,
+        retention: EventRetention | None = None,
+        traces: TraceStore | None = None,
+        *,
+        after_days: float = 30,
+        log_retention_days: float = 0,
+        interval_seconds: float = 3600,
+        batch_size: int = 500,
+    ) -> None:
+        self.archive = archive
+        self.retention = retention
+        self.traces = traces
+        self.after_days = after_days
+        self.log_retention_days = log_retention_days
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread_started = False
+
+    def start(self) -> None:
+        if not self._thread_started:
+            self._thread.start()
+            self._thread_started = True
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def run_once(self, now: datetime | None = None) -> int:
+        moment = now or datetime.now(timezone.utc)
+        cutoff = (moment - timedelta(days=self.after_days)).isoformat()
+        if self.retention is not None:
+            for status in ARCHIVABLE_STATUSES:
+                keep = self.retention.policies.get(status)
+                for job_id in self.retention.jobs_store.compaction_candidates(status, cutoff, self.batch_size):
+                    self.retention.compact(job_id, max(0, keep.keep_output_lines) if keep else 0)
+        moved = 0
+        while not self._stop.is_set():
+            batch = self.archive.archive_finished(cutoff, self.batch_size)
+            if self.traces is not None:
+                self.traces.delete_jobs(batch)
+            moved += len(batch)
+            if len(batch) < self.batch_size:
+                break
+        if self.retention is not None and self.log_retention_days > 0:
+            logs_before = (moment - timedelta(days=self.log_retention_days)).isoformat()
+            while not self._stop.is_set():
+                if self.retention.prune_archives(logs_before, self.batch_size) < self.batch_size:
+                    break
+        return moved
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except (OSError, sqlite3.Error):
+                pass
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
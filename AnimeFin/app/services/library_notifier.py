@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+from app.metrics import REGISTRY
+
+LIBRARY_REFRESHES = REGISTRY.counter(
+    "animefin_library_refreshes_total",
+    "Media server library refresh requests.",
+    ("scope", "outcome"),
+)
+
+
+class LibraryRefreshNotifier:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        downloads_root: Path,
+        *,
+        library_root: str = "",
+        debounce_seconds: float = 60,
+        scoped: bool = True,
+        max_paths: int = 50,
+        timeout: float = 10,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.downloads_root = downloads_root.resolve()
+        self.library_root = library_root or str(self.downloads_root)
+        self.debounce_seconds = debounce_seconds
+        self.scoped = scoped
+        self.max_paths = max_paths
+        self.timeout = timeout
+        self._pending: set[str] = set()
+        self._last_sent = float("-inf")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread_started = False
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.base_url and self.api_key)
+
+    def notify_job(self, job: dict[str, Any]) -> None:
+        output = Path(job["output_path"])
+        self.notify_path(output.parent if output.suffix else output)
+
+    def notify_path(self, path: Path) -> None:
+        try:
+            relative = path.resolve().relative_to(self.downloads_root)
+        except ValueError:
+            return
+        with self._lock:
+            self._pending.add(str(PurePosixPath(self.library_root, *relative.parts)))
+        self._wake.set()
+
+    def pending(self) -> list[str]:
+        with self._lock:
+            return sorted(self._pending)
+
+    def start(self) -> None:
+        if self.enabled and not self._thread_started:
+            self._thread.start()
+            self._thread_started = True
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run_once(self, now: float | None = None) -> dict[str, Any] | None:
+        moment = time.monotonic() if now is None else now
+        with self._lock:
+            if not self._pending or moment - self._last_sent < self.debounce_seconds:
+                return None
+            paths = sorted(self._pending)
+            self._pending.clear()
+            self._last_sent = moment
+        scope = "folders" if self.scoped and len(paths) <= self.max_paths else "library"
+        try:
+            if scope == "folders":
+                self._post(
+                    "/Library/Media/Updated",
+                    {"Updates": [{"Path": path, "UpdateType": "Modified"} for path in paths]},
+                )
+            else:
+                self._post("/Library/Refresh")
+        except (urllib.error.URLError, TimeoutError, OSError) as exc:
+            LIBRARY_REFRESHES.inc(scope=scope, outcome="error")
+            with self._lock:
+                self._pending.update(paths)
+            return {"scope": scope, "paths": paths, "ok": False, "error": str(exc)}
+        LIBRARY_REFRESHES.inc(scope=scope, outcome="ok")
+        return {"scope": scope, "paths": paths, "ok": True}
+
+    def _post(self, route: str, payload: dict[str, Any] | None = None) -> None:
+        request = urllib.request.Request(
+            self.base_url + route,
+            data=json.dumps(payload or {}).encode("utf-8"),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f'MediaBrowser Token="{self.api_key}"',
+            },
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def _next_delay(self) -> float | None:
+        with self._lock:
+            if not self._pending:
+                return None
+            return max(0.0, self._last_sent + self.debounce_seconds - time.monotonic())
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self.run_once()
+            self._wake.wait(self._next_delay())
+            self._wake.clear()
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator
+
+
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+MAX_MOOV_BYTES = 64 * 1024 * 1024
+TS_PACKET = 188
+
+CODEC_NAMES = {
+    "avc1": "h264",
+    "avc3": "h264",
+    "hvc1": "hevc",
+    "hev1": "hevc",
+    "av01": "av1",
+    "vp09": "vp9",
+    "mp4v": "mpeg4",
+    "mp4a": "aac",
+    "ac-3": "ac3",
+    "ec-3": "eac3",
+    "Opus": "opus",
+    "fLaC": "flac",
+}
+
+
+def _iter_boxes(data: bytes, start: int = 0, end: int | None = None) -> Iterator[tuple[bytes, int, int]]:
+    pos = start
+    limit = len(data) if end is None else end
+    while pos + 8 <= limit:
+        size, box_type = struct.unpack_from(">I4s", data, pos)
+        header = 8
+        if size == 1:
+            if pos + 16 > limit:
+                return
+            size = struct.unpack_from(">Q", data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = limit - pos
+        if size < header or pos + size > limit:
+            return
+        yield box_type, pos + header, pos + size
+        pos += size
+
+
+def _read_top_level(handle: BinaryIO, file_size: int) -> tuple[bytes | None, bool]:
+    pos = 0
+    seen_mdat = False
+    while pos + 8 <= file_size:
+        handle.seek(pos)
+        header = handle.read(16)
+        if len(header) < 8:
+            break
+        size, box_type = struct.unpack_from(">I4s", header, 0)
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                break
+            size = struct.unpack_from(">Q", header, 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - pos
+        if size < header_size:
+            break
+        if box_type == b"mdat":
+            seen_mdat = True
+        elif box_type == b"moov":
+            payload = size - header_size
+            if payload > MAX_MOOV_BYTES:
+                return None, not seen_mdat
+            handle.seek(pos + header_size)
+            return handle.read(payload), not seen_mdat
+        pos += size
+    return None, False
+
+
+def _parse_moov(moov: bytes) -> dict[str, Any]:
+    info: dict[str, Any] = {"duration_seconds": None, "video_codec": None, "audio_codec": None}
+
+    def walk(start: int, end: int, handler: list[str]) -> None:
+        for box_type, body, box_end in _iter_boxes(moov, start, end):
+            if box_type == b"mvhd" and body + 4 <= box_end:
+                version = moov[body]
+                if version == 1 and body + 32 <= box_end:
+                    timescale, duration = struct.unpack_from(">IQ", moov, body + 20)
+                elif body + 20 <= box_end:
+                    timescale, duration = struct.unpack_from(">II", moov, body + 12)
+                else:
+                    continue
+                if timescale:
+                    info["duration_seconds"] = round(duration / timescale, 3)
+            elif box_type == b"trak":
+                walk(body, box_end, [])
+            elif box_type == b"hdlr" and body + 12 <= box_end:
+                handler.append(moov[body + 8 : body + 12].decode("latin-1"))
+            elif box_type == b"stsd" and body + 16 <= box_end:
+                fourcc = moov[body + 12 : body + 16].decode("latin-1")
+                codec = CODEC_NAMES.get(fourcc, fourcc.strip())
+                kind = handler[-1] if handler else ""
+                if kind == "vide" and not info["video_codec"]:
+                    info["video_codec"] = codec
+                elif kind == "soun" and not info["audio_codec"]:
+                    info["audio_codec"] = codec
+            elif box_type in CONTAINER_BOXES:
+                walk(body, box_end, handler)
+
+    walk(0, len(moov), [])
+    return info
+
+
+def probe_media(path: str) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "container": "unknown",
+        "duration_seconds": None,
+        "video_codec": None,
+        "audio_codec": None,
+        "faststart": False,
+    }
+    file_path = Path(path)
+    file_size = file_path.stat().st_size
+    with file_path.open("rb") as handle:
+        head = handle.read(TS_PACKET * 2 + 1)
+        if len(head) > TS_PACKET and head[0] == 0x47 and head[TS_PACKET] == 0x47:
+            result["container"] = "mpegts"
+            return result
+        if len(head) < 8 or head[4:8] not in {b"ftyp", b"moov", b"free", b"mdat", b"wide", b"skip"}:
+            return result
+        moov, faststart = _read_top_level(handle, file_size)
+    result["container"] = "mp4"
+    if moov is None:
+        return result
+    result.update(_parse_moov(moov))
+    result["faststart"] = faststart
+    return result
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import functools
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from app.metrics import REGISTRY, Gauge
+from app.services.media_probe import probe_media
+from app.storage.jobs import JobsStore, utc_now_iso
+
+POSTPROCESS_STATUSES = ("pending", "running", "done", "skipped", "failed")
+PRIORITIES = {"immediate": 10, "off_peak": 0}
+NORMALIZE_FILTER = "loudnorm=I=-16:TP=-1.5:LRA=11"
+PROGRESS_EVENT_STEP = 10.0
+
+POSTPROCESS_DURATION = REGISTRY.histogram(
+    "animefin_postprocess_seconds",
+    "Wall time of post-processing tasks.",
+    ("status",),
+)
+
+
+@dataclass(frozen=True)
+class PostProcessOptions:
+    ffmpeg_path: str = "ffmpeg"
+    normalize_audio: bool = False
+
+
+def postprocess_metrics(jobs_store: JobsStore) -> list[Gauge]:
+    gauge = Gauge("animefin_postprocess_tasks", "Post-processing tasks by status.", ("status",))
+    counts = jobs_store.count_postprocess_by_status()
+    for status in sorted(set(POSTPROCESS_STATUSES) | set(counts)):
+        gauge.set(counts.get(status, 0), status=status)
+    return [gauge]
+
+
+def media_file(job: dict[str, Any]) -> Path | None:
+    output = Path(job["output_path"])
+    if output.is_file():
+        return output
+    if job.get("source_url"):
+        return None
+    # ani-cli ignores our episode-N.mp4 name and writes "<title> Episode N.mp4" into the show directory.
+    matches = []
+    for path in output.parent.glob(f"* Episode {job['episode']}.mp4"):
+        try:
+            matches.append((path.stat().st_mtime_ns, path))
+        except OSError:
+            continue
+    return max(matches)[1] if matches else None
+
+
+def plan_steps(path: Path, normalize_audio: bool = False) -> list[str]:
+    info = probe_media(str(path))
+    steps = []
+    if info["container"] == "mpegts":
+        steps.append("remux")
+    elif info["container"] == "mp4" and not info["faststart"]:
+        steps.append("faststart")
+    elif info["container"] != "mp4":
+        return []
+    if normalize_audio:
+        steps.append("normalize")
+    return steps
+
+
+def build_command(ffmpeg_path: str, source: Path, target: Path, steps: list[str]) -> list[str]:
+    command = [
+        ffmpeg_path,
+        "-y",
+        "-nostdin",
+        "-loglevel",
+        "error",
+        "-progress",
+        "pipe:1",
+        "-i",
+        str(source),
+        "-map",
+        "0",
+        "-c",
+        "copy",
+        # MP4 only carries text subtitles as mov_text; converting keeps them rather than dropping them.
+        "-c:s",
+        "mov_text",
+    ]
+    if "normalize" in steps:
+        command += ["-af", NORMALIZE_FILTER, "-c:a", "aac", "-b:a", "192k"]
+    return command + ["-movflags", "+faststart", "-f", "mp4", str(target)]
+
+
+@functools.lru_cache(maxsize=None)
+def _pool_store(db_path: str) -> JobsStore:
+    # One store per pool process, so schema setup runs once per worker rather than once per task.
+    return JobsStore(Path(db_path))
+
+
+def run_postprocess(
+    db_path: str, job_id: str, output_path: str, options: PostProcessOptions, normalized: bool = False
+) -> dict[str, Any]:
+    store = _pool_store(db_path)
+    path = Path(output_path)
+    steps = plan_steps(path, options.normalize_audio and not normalized)
+    if not steps:
+        return {"status": "skipped", "steps": [], "reason": "already streamable"}
+    if shutil.which(options.ffmpeg_path) is None:
+        return {"status": "skipped", "steps": steps, "reason": f"ffmpeg not found: {options.ffmpeg_path}"}
+
+    store.update_postprocess(job_id, steps=",".join(steps))
+    store.append_event(job_id, "info", f"Post-processing: {', '.join(steps)}")
+    duration_us = (probe_media(str(path))["duration_seconds"] or 0) * 1_000_000
+    source_size = path.stat().st_size
+    temp = path.with_name(f".{path.name}.post.mp4")
+    errors: list[str] = []
+    reported = 0.0
+    process = subprocess.Popen(
+        build_command(options.ffmpeg_path, path, temp, steps),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+    )
+    assert process.stdout is not None
+    for raw in process.stdout:
+        key, sep, value = raw.strip().partition("=")
+        if not sep or " " in key:
+            errors.append(raw.strip())
+            continue
+        if key == "out_time_us" and duration_us and value.isdigit():
+            pct = int(value) / duration_us * 100
+        elif key == "total_size" and not duration_us and value.isdigit() and source_size:
+            pct = int(value) / source_size * 100
+        else:
+            continue
+        pct = min(99.0, pct)
+        if pct - reported >= PROGRESS_EVENT_STEP:
+            reported = pct
+            store.update_postprocess(job_id, progress_pct=round(pct, 1))
+            store.append_event(job_id, "info", f"Post-processing {pct:.0f}%", kind="output")
+    code = process.wait()
+    if code != 0 or not temp.exists():
+        temp.unlink(missing_ok=True)
+        detail = errors[-1] if errors else f"exit code {code}"
+        return {"status": "failed", "steps": steps, "reason": f"ffmpeg failed: {detail}"}
+    os.replace(temp, path)
+    return {"status": "done", "steps": steps, "bytes_before": source_size, "bytes_after": path.stat().st_size}
+
+
+class PostProcessor:
+    def __init__(
+        self,
+        jobs_store: JobsStore,
+        db_path: Path,
+        *,
+        options: PostProcessOptions | None = None,
+        workers: int = 0,
+        poll_seconds: float = 1.0,
+    ) -> None:
+        self.jobs_store = jobs_store
+        self.db_path = db_path
+        self.options = options or PostProcessOptions()
+        self.workers = workers or os.cpu_count() or 1
+        self.poll_seconds = poll_seconds
+        self._completion_listeners: list[Callable[[dict[str, Any]], None]] = []
+        self._pool: ProcessPoolExecutor | None = None
+        self._inflight: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread_started = False
+
+    def add_completion_listener(self, listener: Callable[[dict[str, Any]], None]) -> None:
+        self._completion_listeners.append(listener)
+
+    def enqueue_job(self, job: dict[str, Any]) -> bool:
+        path = media_file(job)
+        if path is None:
+            return False
+        self.jobs_store.enqueue_postprocess(
+            job["id"], PRIORITIES.get(job.get("schedule") or "", 0), media_path=str(path)
+        )
+        self._wake.set()
+        return True
+
+    def start(self) -> None:
+        if self._thread_started:
+            return
+        self.jobs_store.requeue_running_postprocess()
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        self._thread.start()
+        self._thread_started = True
+
+    def stop(self, timeout: float = 30) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread_started:
+            self._thread.join(timeout)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run_once(self) -> int:
+        processed = 0
+        while (task := self.jobs_store.claim_next_postprocess()) is not None:
+            started = time.monotonic()
+            try:
+                result = run_postprocess(
+                    str(self.db_path), task["job_id"], task["output_path"], self.options, bool(task["normalized"])
+                )
+            except (OSError, sqlite3.Error) as exc:
+                result = {"status": "failed", "steps": [], "reason": str(exc)}
+            self._finish(task["job_id"], result, started)
+            processed += 1
+        return processed
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            while self._pool is not None and not self._stop.is_set():
+                with self._lock:
+                    if len(self._inflight) >= self.workers:
+                        break
+                try:
+                    task = self.jobs_store.claim_next_postprocess()
+                except sqlite3.Error:
+                    break
+                if task is None:
+                    break
+                with self._lock:
+                    self._inflight[task["job_id"]] = time.monotonic()
+                future = self._pool.submit(
+                    run_postprocess,
+                    str(self.db_path),
+                    task["job_id"],
+                    task["output_path"],
+                    self.options,
+                    bool(task["normalized"]),
+                )
+                future.add_done_callback(lambda f, job_id=task["job_id"]: self._on_done(job_id, f))
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def _on_done(self, job_id: str, future: Future) -> None:
+        with self._lock:
+            started = self._inflight.pop(job_id, time.monotonic())
+        if future.cancelled():
+            return
+        try:
+            result = future.result()
+        except Exception as exc:  # noqa: BLE001
+            result = {"status": "failed", "steps": [], "reason": f"{type(exc).__name__}: {exc}"}
+        self._finish(job_id, result, started)
+        self._wake.set()
+
+    def _finish(self, job_id: str, result: dict[str, Any], started: float) -> None:
+        status = result["status"]
+        POSTPROCESS_DURATION.observe(time.monotonic() - started, status=status)
+        reason = result.get("reason", "")
+        self.jobs_store.update_postprocess(
+            job_id,
+            status=status,
+            progress_pct=100.0 if status == "done" else None,
+            error_message=reason if status == "failed" else "",
+            finished_at=utc_now_iso(),
+            normalized=True if status == "done" and "normalize" in result["steps"] else None,
+        )
+        if status == "done":
+            self.jobs_store.append_event(
+                job_id, "info", f"Post-processing completed ({result['bytes_before']} -> {result['bytes_after']} bytes)"
+            )
+            job = self.jobs_store.get_job(job_id)
+            for listener in self._completion_listeners if job else []:
+                try:
+                    listener(job)
+                except Exception as exc:  # noqa: BLE001
+                    self.jobs_store.append_event(job_id, "warn", f"Post-processing hook failed: {exc}")
+        elif status == "skipped":
+            self.jobs_store.append_event(job_id, "info", f"Post-processing skipped: {reason}")
+        else:
+            self.jobs_store.append_event(job_id, "error", f"Post-processing failed: {reason}")
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.storage.jobs import JobsStore
+
+ARCHIVE_PAGE = 5000
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    keep_output_lines: int
+    after_seconds: float
+
+
+class EventRetention:
+    def __init__(
+        self,
+        jobs_store: JobsStore,
+        archive_dir: Path,
+        policies: dict[str, RetentionPolicy],
+        *,
+        interval_seconds: float = 3600,
+        vacuum_pages: int = 2000,
+        batch_size: int = 100,
+    ) -> None:
+        self.jobs_store = jobs_store
+        self.archive_dir = archive_dir
+        self.policies = policies
+        self.interval_seconds = interval_seconds
+        self.vacuum_pages = vacuum_pages
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread_started = False
+
+    def start(self) -> None:
+        if not self._thread_started:
+            self._thread.start()
+            self._thread_started = True
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run_once(self, now: datetime | None = None) -> dict[str, Any]:
+        moment = now or datetime.now(timezone.utc)
+        compacted = removed = 0
+        for status, policy in self.policies.items():
+            if policy.keep_output_lines < 0:
+                continue
+            cutoff = (moment - timedelta(seconds=policy.after_seconds)).isoformat()
+            for job_id in self.jobs_store.compaction_candidates(status, cutoff, self.batch_size):
+                if self._stop.is_set():
+                    break
+                removed += self.compact(job_id, policy.keep_output_lines)
+                compacted += 1
+        vacuum = self.jobs_store.incremental_vacuum(self.vacuum_pages) if self.vacuum_pages > 0 else {}
+        return {"jobs_compacted": compacted, "events_removed": removed, "vacuum": vacuum}
+
+    def compact(self, job_id: str, keep_output_lines: int) -> int:
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        target = self.archive_path(job_id)
+        temp = target.with_name(target.name + ".tmp")
+        count = 0
+        with gzip.open(temp, "wt", encoding="utf-8") as handle:
+            for event in self._all_events(job_id):
+                handle.write(json.dumps(event, separators=(",", ":")) + "\n")
+                count += 1
+        os.replace(temp, target)
+        return self.jobs_store.compact_events(
+            job_id,
+            keep_output=keep_output_lines,
+            archive_path=str(target),
+            events=count,
+            size=target.stat().st_size,
+        )
+
+    def prune_archives(self, archived_before: str, limit: int = 500) -> int:
+        records = self.jobs_store.expired_event_archives(archived_before, limit)
+        for record in records:
+            Path(record["path"]).unlink(missing_ok=True)
+        return self.jobs_store.delete_event_archives([r["job_id"] for r in records])
+
+    def archive_path(self, job_id: str) -> Path:
+        return self.archive_dir / f"{job_id}.jsonl.gz"
+
+    def read_archive(self, job_id: str) -> Iterator[dict[str, Any]] | None:
+        record = self.jobs_store.event_archive(job_id)
+        if record is None or not Path(record["path"]).exists():
+            return None
+
+        def lines() -> Iterator[dict[str, Any]]:
+            with gzip.open(record["path"], "rt", encoding="utf-8") as handle:
+                for line in handle:
+                    yield json.loads(line)
+
+        return lines()
+
+    def _all_events(self, job_id: str) -> Iterator[dict[str, Any]]:
+        after = 0
+        while True:
+            page = self.jobs_store.list_events(job_id, after=after, limit=ARCHIVE_PAGE)
+            yield from page
+            if len(page) < ARCHIVE_PAGE:
+                return
+            after = page[-1]["id"]
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except (OSError, sqlite3.Error):
+                pass
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
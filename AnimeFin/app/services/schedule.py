@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+RATE_SUFFIXES = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+SCHEDULES = ("immediate", "off_peak")
+
+
+@dataclass(frozen=True)
+class DownloadWindow:
+    days: frozenset[int]
+    start_minute: int
+    end_minute: int
+    concurrency: int = 1
+    bytes_per_second: int = 0
+
+    def contains(self, moment: datetime) -> bool:
+        minute = moment.hour * 60 + moment.minute
+        day = moment.weekday()
+        if self.start_minute < self.end_minute:
+            return day in self.days and self.start_minute <= minute < self.end_minute
+        return (day in self.days and minute >= self.start_minute) or (
+            (day - 1) % 7 in self.days and minute < self.end_minute
+        )
+
+
+@dataclass(frozen=True)
+class DownloadLimits:
+    concurrency: int
+    bytes_per_second: int
+    off_peak_open: bool
+
+
+class DownloadSchedule:
+    def __init__(
+        self,
+        windows: tuple[DownloadWindow, ...] = (),
+        *,
+        concurrency: int = 1,
+        bytes_per_second: int = 0,
+    ) -> None:
+        self.windows = windows
+        self.concurrency = max(1, concurrency)
+        self.bytes_per_second = bytes_per_second
+
+    @property
+    def max_concurrency(self) -> int:
+        return max([self.concurrency, *(w.concurrency for w in self.windows)])
+
+    def active_window(self, moment: datetime) -> DownloadWindow | None:
+        return next((w for w in self.windows if w.contains(moment)), None)
+
+    def limits(self, moment: datetime) -> DownloadLimits:
+        window = self.active_window(moment)
+        if window is None:
+            return DownloadLimits(self.concurrency, self.bytes_per_second, off_peak_open=not self.windows)
+        return DownloadLimits(window.concurrency, window.bytes_per_second, off_peak_open=True)
+
+
+def parse_rate(value: str) -> int:
+    text = value.strip().lower().removesuffix("/s").removesuffix("b")
+    if not text:
+        # An empty setting (e.g. a blank DOWNLOAD_BYTES_PER_SECOND= in .env) means unlimited.
+        return 0
+    suffix = text[-1] if text and text[-1] in RATE_SUFFIXES else ""
+    number = text[: -1] if suffix else text
+    return int(float(number) * RATE_SUFFIXES[suffix])
+
+
+def _parse_days(spec: str) -> frozenset[int]:
+    if spec in {"*", "daily"}:
+        return frozenset(range(7))
+    days: set[int] = set()
+    for part in spec.split(","):
+        if "-" in part:
+            first, last = (DAY_NAMES.index(p) for p in part.split("-", 1))
+            days.update(range(first, last + 1) if first <= last else [*range(first, 7), *range(0, last + 1)])
+        else:
+            days.add(DAY_NAMES.index(part))
+    return frozenset(days)
+
+
+def _parse_minute(spec: str) -> int:
+    hours, _, minutes = spec.partition(":")
+    value = int(hours) * 60 + int(minutes or 0)
+    if not 0 <= value <= 24 * 60:
+        raise ValueError(f"Invalid time of day: {spec}")
+    return value % (24 * 60)
+
+
+def parse_windows(spec: str) -> tuple[DownloadWindow, ...]:
+    windows = []
+    for entry in filter(None, (e.strip().lower() for e in spec.split(";"))):
+        parts = entry.split()
+        if len(parts) < 2:
+            raise ValueError(f"Expected '<days> <HH:MM>-<HH:MM> [concurrency=N] [bandwidth=RATE]', got {entry!r}")
+        try:
+            days = _parse_days(parts[0])
+            start, _, end = parts[1].partition("-")
+            options = dict(p.split("=", 1) for p in parts[2:])
+            windows.append(
+                DownloadWindow(
+                    days=days,
+                    start_minute=_parse_minute(start),
+                    end_minute=_parse_minute(end),
+                    concurrency=max(1, int(options.get("concurrency", 1))),
+                    bytes_per_second=parse_rate(options.get("bandwidth", "0")),
+                )
+            )
+        except ValueError as exc:
+            raise ValueError(f"Invalid download window {entry!r}: {exc}") from exc
+    return tuple(windows)
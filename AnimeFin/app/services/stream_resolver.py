@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.metrics import REGISTRY
+from app.storage.jobs import JobsStore
+
+STREAM_RESOLUTIONS = REGISTRY.counter(
+    "animefin_stream_resolutions_total",
+    "Ahead-of-time stream URL resolutions by outcome.",
+    ("outcome",),
+)
+STREAM_RESOLVE_SECONDS = REGISTRY.histogram(
+    "animefin_stream_resolve_seconds",
+    "Time spent resolving one episode's stream URL.",
+)
+EXPIRY_PARAMS = ("expires", "expire", "exp")
+
+
+def source_expiry(url: str, now: datetime, ttl_seconds: float) -> datetime:
+    expiry = now + timedelta(seconds=ttl_seconds)
+    query = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query)
+    for name in EXPIRY_PARAMS:
+        for value in query.get(name, []):
+            if value.isdigit():
+                expiry = min(expiry, datetime.fromtimestamp(int(value), timezone.utc))
+    return expiry
+
+
+def source_expired(job: dict[str, Any], now: datetime | None = None) -> bool:
+    if job.get("resolve_state") != "resolved" or not job.get("source_expires_at"):
+        return False
+    try:
+        expires = datetime.fromisoformat(job["source_expires_at"])
+    except ValueError:
+        return True
+    return expires <= (now or datetime.now(timezone.utc))
+
+
+class StreamResolver:
+    def __init__(
+        self,
+        jobs_store: JobsStore,
+        anime_source: Any,
+        *,
+        lookahead: int = 4,
+        workers: int = 2,
+        ttl_seconds: float = 1800,
+        refresh_margin_seconds: float = 120,
+        poll_seconds: float = 1.0,
+        retry_seconds: float = 60,
+        max_failures: int = 3,
+    ) -> None:
+        self.jobs_store = jobs_store
+        self.anime_source = anime_source
+        self.lookahead = lookahead
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.poll_seconds = poll_seconds
+        self.retry_seconds = retry_seconds
+        self.max_failures = max_failures
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="resolver")
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread_started = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.lookahead > 0
+
+    def start(self) -> None:
+        if self.enabled and not self._thread_started:
+            self._thread.start()
+            self._thread_started = True
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run_once(self, now: datetime | None = None) -> dict[str, str]:
+        moment = now or datetime.now(timezone.utc)
+        refresh_before = moment + timedelta(seconds=self.refresh_margin_seconds)
+        candidates = self.jobs_store.resolution_candidates(
+            self.lookahead, refresh_before.isoformat(), moment.isoformat()
+        )
+        futures = {job["id"]: self._pool.submit(self._resolve, job, moment) for job in candidates}
+        return {job_id: future.result() for job_id, future in futures.items()}
+
+    def resolve_job(self, job_id: str) -> str:
+        job = self.jobs_store.get_job(job_id)
+        if not job:
+            return "missing"
+        return self._resolve(job, datetime.now(timezone.utc))
+
+    def _resolve(self, job: dict[str, Any], now: datetime) -> str:
+        started = time.perf_counter()
+        try:
+            outcome = self._store(job, now)
+        except Exception as exc:  # noqa: BLE001
+            outcome = "error"
+            # Back off before the loop picks this job again, so one broken episode can't hammer upstream.
+            self.jobs_store.record_resolve_failure(
+                job["id"],
+                f"Stream resolution failed ({exc})",
+                retry_at=(now + timedelta(seconds=self.retry_seconds)).isoformat(),
+                max_failures=self.max_failures,
+            )
+        STREAM_RESOLUTIONS.inc(outcome=outcome)
+        STREAM_RESOLVE_SECONDS.observe(time.perf_counter() - started)
+        return outcome
+
+    def _store(self, job: dict[str, Any], now: datetime) -> str:
+        source = self.anime_source.resolve_episode_source(job["show_id"], job["mode"], job["episode"], job["quality"])
+        if source is None:
+            self.jobs_store.mark_unresolvable(job["id"], "No direct stream found; ani-cli will resolve it")
+            return "unavailable"
+        stored = self.jobs_store.store_resolution(
+            job["id"],
+            source_url=source["url"],
+            source_type=source["type"],
+            referer=source["referer"],
+            expires_at=source_expiry(source["url"], now, self.ttl_seconds).isoformat(),
+            status=job["status"],
+        )
+        return "resolved" if stored else "skipped"
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:  # noqa: BLE001
+                STREAM_RESOLUTIONS.inc(outcome="error")
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
+
+
+@dataclass
+class Span:
+    name: str
+    start_ns: int
+    end_ns: int = 0
+    parent: int = -1
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+
+class JobTrace:
+    def __init__(self, job_id: str, attempt: int = 1) -> None:
+        self.job_id = job_id
+        self.attempt = attempt
+        self.epoch_ns = time.time_ns() - time.monotonic_ns()
+        self.spans: list[Span] = []
+        self._stack: list[int] = []
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        current = Span(name, time.monotonic_ns(), parent=self._stack[-1] if self._stack else -1, attrs=attrs)
+        self.spans.append(current)
+        self._stack.append(len(self.spans) - 1)
+        try:
+            yield current
+        except BaseException as exc:
+            current.attrs["error"] = type(exc).__name__
+            raise
+        finally:
+            current.end_ns = time.monotonic_ns()
+            self._stack.pop()
+
+    def add_span(self, name: str, start_ns: int, end_ns: int, **attrs: Any) -> Span:
+        added = Span(name, start_ns, end_ns, self._stack[-1] if self._stack else -1, attrs)
+        self.spans.append(added)
+        return added
+
+    def encode(self) -> dict[str, Any]:
+        base = min((s.start_ns for s in self.spans), default=0)
+        return {
+            "job_id": self.job_id,
+            "attempt": self.attempt,
+            "start_unix_us": (self.epoch_ns + base) // 1000,
+            "spans": [
+                [s.name, s.parent, (s.start_ns - base) // 1000, max(0, s.end_ns - s.start_ns) // 1000, s.attrs]
+                for s in self.spans
+            ],
+        }
+
+
+def _hex_id(*parts: Any, size: int) -> str:
+    return hashlib.blake2b("/".join(str(p) for p in parts).encode(), digest_size=size).hexdigest()
+
+
+def to_chrome(traces: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    events: list[dict[str, Any]] = []
+    for tid, trace in enumerate(traces, start=1):
+        events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": tid,
+                "args": {"name": f"job {trace['job_id']} #{trace['attempt']}"},
+            }
+        )
+        for name, _parent, offset_us, duration_us, attrs in trace["spans"]:
+            events.append(
+                {
+                    "name": name,
+                    "cat": "job",
+                    "ph": "X",
+                    "ts": trace["start_unix_us"] + offset_us,
+                    "dur": duration_us,
+                    "pid": 1,
+                    "tid": tid,
+                    "args": {"job_id": trace["job_id"], "attempt": trace["attempt"], **attrs},
+                }
+            )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(traces: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    spans: list[dict[str, Any]] = []
+    for trace in traces:
+        trace_id = _hex_id(trace["job_id"], trace["attempt"], size=16)
+        for index, (name, parent, offset_us, duration_us, attrs) in enumerate(trace["spans"]):
+            start_ns = (trace["start_unix_us"] + offset_us) * 1000
+            span = {
+                "traceId": trace_id,
+                "spanId": _hex_id(trace_id, index, size=8),
+                "name": name,
+                "kind": 1,
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + duration_us * 1000),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)}
+                    for key, value in {"job.id": trace["job_id"], "job.attempt": trace["attempt"], **attrs}.items()
+                ],
+            }
+            if parent >= 0:
+                span["parentSpanId"] = _hex_id(trace_id, parent, size=8)
+            spans.append(span)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "animefin"}}]},
+                "scopeSpans": [{"scope": {"name": "animefin.downloads"}, "spans": spans}],
+            }
+        ]
+    }
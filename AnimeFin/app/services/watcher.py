@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from typing import Any
+
+from app.services.downloads import DownloadRequest, DownloadService
+from app.services.resilience import UpstreamDegradedError
+from app.storage.jobs import JobsStore
+from app.storage.watchlist import WatchlistStore
+
+
+WEEK_SECONDS = 7 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class WatchPolicy:
+    base_interval: float = 3600
+    release_interval: float = 300
+    release_window: float = 2 * 3600
+    dormant_after: float = 21 * 24 * 3600
+    max_interval: float = 24 * 3600
+
+
+def _week_offset(moment: datetime) -> float:
+    return moment.weekday() * 86400 + moment.hour * 3600 + moment.minute * 60 + moment.second
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def _episode_number(episode: str) -> float | None:
+    try:
+        return float(episode)
+    except ValueError:
+        return None
+
+
+def error_poll_delay(entry: dict[str, Any], policy: WatchPolicy) -> float:
+    # error_polls is the count before this failure, so the first failure waits release_interval.
+    return min(policy.max_interval, policy.release_interval * (2 ** min(entry.get("error_polls", 0), 16)))
+
+
+def next_poll_delay(entry: dict[str, Any], now: datetime, policy: WatchPolicy) -> float:
+    if entry["finished"]:
+        return policy.max_interval
+
+    last_new = entry.get("last_new_episode_at") or entry["created_at"]
+    if (now - _parse(last_new)).total_seconds() >= policy.dormant_after:
+        backoff = policy.base_interval * (2 ** min(entry.get("idle_polls", 0), 16))
+        return min(policy.max_interval, backoff)
+
+    history = entry.get("release_history") or []
+    if not history:
+        return policy.base_interval
+
+    predicted = median(_week_offset(_parse(ts)) for ts in history)
+    until_release = (predicted - _week_offset(now)) % WEEK_SECONDS
+    since_release = WEEK_SECONDS - until_release
+    if min(until_release, since_release) <= policy.release_window:
+        return policy.release_interval
+    return max(policy.release_interval, min(policy.base_interval, until_release - policy.release_window))
+
+
+class EpisodeWatcher:
+    def __init__(
+        self,
+        watchlist: WatchlistStore,
+        anime_source: Any,
+        jobs_store: JobsStore,
+        downloads: DownloadService,
+        *,
+        policy: WatchPolicy | None = None,
+        max_workers: int = 2,
+        tick_seconds: float = 30,
+    ) -> None:
+        self.watchlist = watchlist
+        self.anime_source = anime_source
+        self.jobs_store = jobs_store
+        self.downloads = downloads
+        self.policy = policy or WatchPolicy()
+        self.tick_seconds = tick_seconds
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="watcher")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread_started = False
+
+    def start(self) -> None:
+        if not self._thread_started:
+            self._thread.start()
+            self._thread_started = True
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def run_once(self, now: datetime | None = None) -> dict[str, list[str]]:
+        moment = now or datetime.now(timezone.utc)
+        due = self.watchlist.due(moment.isoformat())
+        futures = {entry["id"]: self._pool.submit(self._poll, entry, moment) for entry in due}
+        results: dict[str, list[str]] = {}
+        for watch_id, future in futures.items():
+            try:
+                results[watch_id] = future.result()
+            except Exception:  # noqa: BLE001
+                results[watch_id] = []
+        return results
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.tick_seconds):
+            try:
+                self.run_once()
+            except Exception:  # noqa: BLE001
+                continue
+
+    def _poll(self, entry: dict[str, Any], now: datetime) -> list[str]:
+        try:
+            return self._check(entry, now)
+        except UpstreamDegradedError as exc:
+            delay = max(exc.retry_after, error_poll_delay(entry, self.policy))
+            error = str(exc)
+        except Exception as exc:  # noqa: BLE001
+            delay = error_poll_delay(entry, self.policy)
+            error = f"{type(exc).__name__}: {exc}"
+        self.watchlist.record_poll(
+            entry["id"],
+            checked_at=now.isoformat(),
+            next_check_at=(now + timedelta(seconds=delay)).isoformat(),
+            new_episodes=0,
+            error=error,
+        )
+        return []
+
+    def _check(self, entry: dict[str, Any], now: datetime) -> list[str]:
+        episodes = self.anime_source.list_episodes(entry["show_id"], entry["mode"])
+        numbers = {ep: _episode_number(ep) for ep in episodes}
+
+        baseline = entry["baseline_episode"]
+        new_baseline: float | None = None
+        if not entry["backfill"] and baseline is None:
+            new_baseline = max((n for n in numbers.values() if n is not None), default=0.0)
+            baseline = new_baseline
+
+        existing = self.jobs_store.existing_episodes(entry["show_id"], entry["mode"])
+        # Specials like "SP1" can't be ordered against the baseline; only a backfill watch picks them up.
+        fresh = [
+            ep
+            for ep in episodes
+            if ep not in existing and (baseline is None or (numbers[ep] is not None and numbers[ep] > baseline))
+        ]
+        if fresh:
+            self.downloads.enqueue(
+                DownloadRequest(
+                    show_id=entry["show_id"],
+                    show_title=entry["show_title"],
+                    episodes=fresh,
+                    mode=entry["mode"],
+                    quality=entry["quality"],
+                    schedule="off_peak" if len(fresh) > 1 else "immediate",
+                )
+            )
+            entry = {
+                **entry,
+                "idle_polls": 0,
+                "last_new_episode_at": now.isoformat(),
+                "release_history": (entry["release_history"] + [now.isoformat()])[-WatchlistStore.RELEASE_HISTORY :],
+            }
+
+        delay = next_poll_delay(entry, now, self.policy)
+        self.watchlist.record_poll(
+            entry["id"],
+            checked_at=now.isoformat(),
+            next_check_at=(now + timedelta(seconds=delay)).isoformat(),
+            new_episodes=len(fresh),
+            baseline_episode=new_baseline,
+        )
+        return fresh
@@ -108,6 +108,27 @@ async function initDownloadsPage() {
   const mediaList = byId("media-list");
   const jobEvents = byId("job-events");
 
+  let followToken = 0;
+
+  async function followJobEvents(jobId) {
+    const token = ++followToken;
+    const base = `/api/downloads/${encodeURIComponent(jobId)}/events`;
+    const format = (event) => `[${event.timestamp}] ${event.level}: ${event.message}`;
+    let page = await getJson(`${base}?tail=200`);
+    jobEvents.textContent = page.events.map(format).join("\n");
+    while (token === followToken && ["scheduled", "queued", "running"].includes(page.status)) {
+      page = await getJson(`${base}?after=${page.next_after}&limit=500&wait=10`);
+      if (token !== followToken) return;
+      if (page.events.length) {
+        jobEvents.textContent += `${jobEvents.textContent ? "\n" : ""}${page.events.map(format).join("\n")}`;
+        jobEvents.scrollTop = jobEvents.scrollHeight;
+      } else {
+        // Empty page: the wait timed out or the server was at its long-poll limit; back off briefly.
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+      }
+    }
+  }
+
   async function refreshJobs() {
     const data = await getJson("/api/downloads");
     jobsBody.innerHTML = "";
@@ -126,15 +147,10 @@ async function initDownloadsPage() {
 
       const detailsBtn = document.createElement("button");
       detailsBtn.textContent = "View";
-      detailsBtn.addEventListener("click", async () => {
-        const detail = await getJson(`/api/downloads/${encodeURIComponent(job.id)}`);
-        jobEvents.textContent = (detail.events || [])
-          .map((event) => `[${event.timestamp}] ${event.level}: ${event.message}`)
-          .join("\n");
-      });
+      detailsBtn.addEventListener("click", () => followJobEvents(job.id));
       actionCell.appendChild(detailsBtn);
 
-      if (job.status === "queued" || job.status === "running") {
+      if (["scheduled", "queued", "running"].includes(job.status)) {
         const cancelBtn = document.createElement("button");
         cancelBtn.textContent = "Cancel";
         cancelBtn.addEventListener("click", async () => {
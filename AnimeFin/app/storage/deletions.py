@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.storage.jobs import utc_now_iso
+
+
+class DeletionStore:
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        self._initialize()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS deletions (
+                    id TEXT PRIMARY KEY,
+                    media_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    trash_path TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    files_total INTEGER NOT NULL DEFAULT 0,
+                    files_removed INTEGER NOT NULL DEFAULT 0,
+                    bytes_total INTEGER NOT NULL DEFAULT 0,
+                    bytes_reclaimed INTEGER NOT NULL DEFAULT 0,
+                    error_message TEXT NOT NULL DEFAULT '',
+                    created_at TEXT NOT NULL,
+                    purge_after TEXT NOT NULL,
+                    finished_at TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_deletions_status ON deletions(status, purge_after)")
+
+    def requeue_interrupted(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE deletions SET status = 'trashed' WHERE status = 'reclaiming'")
+        return cursor.rowcount
+
+    def create(
+        self,
+        deletion_id: str,
+        media_id: str,
+        kind: str,
+        trash_path: str,
+        purge_after: str,
+        bytes_total: int = 0,
+        status: str = "trashed",
+    ) -> dict[str, Any]:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO deletions(id, media_id, type, trash_path, status, bytes_total, created_at, purge_after)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (deletion_id, media_id, kind, trash_path, status, bytes_total, utc_now_iso(), purge_after),
+            )
+            row = conn.execute("SELECT * FROM deletions WHERE id = ?", (deletion_id,)).fetchone()
+        return dict(row)
+
+    def get(self, deletion_id: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM deletions WHERE id = ?", (deletion_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_deletions(self, limit: int = 200) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM deletions ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def due(self, now_iso: str) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM deletions WHERE status = 'trashed' AND purge_after <= ? ORDER BY purge_after ASC",
+                (now_iso,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def stale_pending(self, created_before: str) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM deletions WHERE status = 'pending' AND created_at < ?",
+                (created_before,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def pending_bytes(self, now_iso: str) -> int:
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT COALESCE(SUM(bytes_total - bytes_reclaimed), 0)
+                FROM deletions
+                WHERE status IN ('trashed', 'reclaiming') AND purge_after <= ?
+                """,
+                (now_iso,),
+            ).fetchone()
+        return int(row[0])
+
+    def claim(self, deletion_id: str, from_status: str, to_status: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE deletions SET status = ? WHERE id = ? AND status = ?",
+                (to_status, deletion_id, from_status),
+            )
+        return cursor.rowcount == 1
+
+    def update_progress(
+        self,
+        deletion_id: str,
+        *,
+        files_total: int | None = None,
+        bytes_total: int | None = None,
+        files_removed: int | None = None,
+        bytes_reclaimed: int | None = None,
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE deletions
+                SET files_total = COALESCE(?, files_total),
+                    bytes_total = COALESCE(?, bytes_total),
+                    files_removed = COALESCE(?, files_removed),
+                    bytes_reclaimed = COALESCE(?, bytes_reclaimed)
+                WHERE id = ?
+                """,
+                (files_total, bytes_total, files_removed, bytes_reclaimed, deletion_id),
+            )
+
+    def finish(self, deletion_id: str, status: str, error_message: str = "") -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE deletions SET status = ?, error_message = ?, finished_at = ? WHERE id = ?",
+                (status, error_message, utc_now_iso(), deletion_id),
+            )
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.storage.jobs import utc_now_iso
+
+
+class HashIndex:
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        self._initialize()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS media_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    partial_hash TEXT,
+                    full_hash TEXT,
+                    hashed_at TEXT NOT NULL
+                )
+                """
+            )
+
+    def lookup(self) -> dict[str, dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM media_hashes").fetchall()
+        return {r["path"]: dict(r) for r in rows}
+
+    def save(
+        self,
+        path: str,
+        size: int,
+        mtime_ns: int,
+        *,
+        partial_hash: str | None = None,
+        full_hash: str | None = None,
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO media_hashes(path, size, mtime_ns, partial_hash, full_hash, hashed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    partial_hash = CASE
+                        WHEN media_hashes.size = excluded.size AND media_hashes.mtime_ns = excluded.mtime_ns
+                        THEN COALESCE(excluded.partial_hash, media_hashes.partial_hash)
+                        ELSE excluded.partial_hash END,
+                    full_hash = CASE
+                        WHEN media_hashes.size = excluded.size AND media_hashes.mtime_ns = excluded.mtime_ns
+                        THEN COALESCE(excluded.full_hash, media_hashes.full_hash)
+                        ELSE excluded.full_hash END,
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    hashed_at = excluded.hashed_at
+                """,
+                (path, size, mtime_ns, partial_hash, full_hash, utc_now_iso()),
+            )
+
+    def prune(self, keep: set[str]) -> int:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT path FROM media_hashes").fetchall()
+            stale = [(r["path"],) for r in rows if r["path"] not in keep]
+            conn.executemany("DELETE FROM media_hashes WHERE path = ?", stale)
+        return len(stale)
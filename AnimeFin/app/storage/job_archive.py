@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+ARCHIVABLE_STATUSES = ("done", "failed", "failed_recoverable", "cancelled")
+ARCHIVE_COLUMNS = (
+    "id",
+    "show_id",
+    "show_title",
+    "episode",
+    "mode",
+    "status",
+    "bytes_downloaded",
+    "error_message",
+    "created_at",
+    "finished_at",
+    "duration_seconds",
+)
+
+JOBS_ARCHIVE_DDL = """
+CREATE TABLE IF NOT EXISTS jobs_archive (
+    id TEXT PRIMARY KEY,
+    show_id TEXT NOT NULL,
+    show_title TEXT NOT NULL,
+    episode TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    status TEXT NOT NULL,
+    bytes_downloaded INTEGER NOT NULL,
+    error_message TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    finished_at TEXT,
+    duration_seconds REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def ensure_archive_schema(conn: sqlite3.Connection) -> None:
+    # JobsStore reads jobs_archive too, so it creates the table through here rather than owning a copy.
+    conn.execute(JOBS_ARCHIVE_DDL)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_archive_show ON jobs_archive(show_id, mode)")
+
+
+def _duration(job: dict[str, Any]) -> float:
+    if not job.get("started_at") or not job.get("finished_at"):
+        return 0.0
+    try:
+        started = datetime.fromisoformat(job["started_at"])
+        finished = datetime.fromisoformat(job["finished_at"])
+    except ValueError:
+        return 0.0
+    return max(0.0, (finished - started).total_seconds())
+
+
+def _rollup_key(job: dict[str, Any]) -> tuple[str, str]:
+    return (job["finished_at"] or job["created_at"])[:10], job["show_id"]
+
+
+def _empty_rollup(show_title: str) -> dict[str, Any]:
+    return {"show_title": show_title, "jobs": 0, "done": 0, "failed": 0, "cancelled": 0, "bytes": 0, "seconds": 0.0}
+
+
+def _add(rollup: dict[str, Any], job: dict[str, Any], duration: float) -> None:
+    rollup["jobs"] += 1
+    if job["status"] == "done":
+        rollup["done"] += 1
+        rollup["bytes"] += job["bytes_downloaded"] or 0
+        rollup["seconds"] += duration
+    elif job["status"] == "cancelled":
+        rollup["cancelled"] += 1
+    else:
+        rollup["failed"] += 1
+
+
+def _summary(rollup: dict[str, Any]) -> dict[str, Any]:
+    attempted = rollup["done"] + rollup["failed"]
+    return {
+        "jobs": rollup["jobs"],
+        "episodes": rollup["done"],
+        "failed": rollup["failed"],
+        "cancelled": rollup["cancelled"],
+        "bytes": rollup["bytes"],
+        "mean_throughput_bps": round(rollup["bytes"] / rollup["seconds"], 1) if rollup["seconds"] else 0.0,
+        "failure_rate": round(rollup["failed"] / attempted, 4) if attempted else 0.0,
+    }
+
+
+class JobArchive:
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        self._initialize()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            ensure_archive_schema(conn)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_stats_daily (
+                    day TEXT NOT NULL,
+                    show_id TEXT NOT NULL,
+                    show_title TEXT NOT NULL,
+                    jobs INTEGER NOT NULL,
+                    done INTEGER NOT NULL,
+                    failed INTEGER NOT NULL,
+                    cancelled INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    seconds REAL NOT NULL,
+                    PRIMARY KEY (day, show_id)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def archive_finished(self, finished_before: str, limit: int = 500) -> list[str]:
+        placeholders = ", ".join("?" for _ in ARCHIVABLE_STATUSES)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT * FROM jobs
+                WHERE status IN ({placeholders}) AND finished_at IS NOT NULL AND finished_at < ?
+                ORDER BY finished_at ASC
+                LIMIT ?
+                """,
+                (*ARCHIVABLE_STATUSES, finished_before, limit),
+            ).fetchall()
+            jobs = [dict(r) for r in rows]
+            rollups: dict[tuple[str, str], dict[str, Any]] = {}
+            for job in jobs:
+                duration = _duration(job)
+                record = {**{c: job.get(c) for c in ARCHIVE_COLUMNS}, "duration_seconds": duration}
+                conn.execute(
+                    f"INSERT OR REPLACE INTO jobs_archive({', '.join(ARCHIVE_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in ARCHIVE_COLUMNS)})",
+                    tuple(record[c] for c in ARCHIVE_COLUMNS),
+                )
+                _add(rollups.setdefault(_rollup_key(job), _empty_rollup(job["show_title"])), job, duration)
+            for (day, show_id), rollup in rollups.items():
+                conn.execute(
+                    """
+                    INSERT INTO job_stats_daily(day, show_id, show_title, jobs, done, failed, cancelled, bytes, seconds)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(day, show_id) DO UPDATE SET
+                        show_title = excluded.show_title,
+                        jobs = jobs + excluded.jobs,
+                        done = done + excluded.done,
+                        failed = failed + excluded.failed,
+                        cancelled = cancelled + excluded.cancelled,
+                        bytes = bytes + excluded.bytes,
+                        seconds = seconds + excluded.seconds
+                    """,
+                    (
+                        day,
+                        show_id,
+                        rollup["show_title"],
+                        rollup["jobs"],
+                        rollup["done"],
+                        rollup["failed"],
+                        rollup["cancelled"],
+                        rollup["bytes"],
+                        rollup["seconds"],
+                    ),
+                )
+            ids = [(job["id"],) for job in jobs]
+            conn.executemany("DELETE FROM download_events WHERE job_id = ?", ids)
+            conn.executemany("DELETE FROM postprocess_tasks WHERE job_id = ?", ids)
+            conn.executemany("DELETE FROM jobs WHERE id = ?", ids)
+        return [job["id"] for job in jobs]
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs_archive WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def stats(self, *, since_day: str = "", show_id: str | None = None) -> dict[str, Any]:
+        by_key: dict[tuple[str, str], dict[str, Any]] = {}
+        with self._connect() as conn:
+            for row in conn.execute("SELECT * FROM job_stats_daily WHERE day >= ?", (since_day,)):
+                by_key[(row["day"], row["show_id"])] = {
+                    k: row[k] for k in ("show_title", "jobs", "done", "failed", "cancelled", "bytes", "seconds")
+                }
+
+        if show_id is not None:
+            by_key = {k: v for k, v in by_key.items() if k[1] == show_id}
+        return {
+            "totals": _summary(self._merge(by_key.values())),
+            "shows": sorted(
+                (
+                    {"show_id": sid, "show_title": title, **_summary(self._merge(rs))}
+                    for sid, (title, rs) in self._group(by_key, 1).items()
+                ),
+                key=lambda s: (-s["episodes"], s["show_title"]),
+            ),
+            "days": [
+                {"day": day, **_summary(self._merge(rs))}
+                for day, (_, rs) in sorted(self._group(by_key, 0).items(), reverse=True)
+            ],
+        }
+
+    @staticmethod
+    def _group(
+        by_key: dict[tuple[str, str], dict[str, Any]], index: int
+    ) -> dict[str, tuple[str, list[dict[str, Any]]]]:
+        grouped: dict[str, tuple[str, list[dict[str, Any]]]] = {}
+        for key, rollup in by_key.items():
+            _, items = grouped.setdefault(key[index], (rollup["show_title"], []))
+            items.append(rollup)
+        return grouped
+
+    @staticmethod
+    def _merge(rollups: Iterable[dict[str, Any]]) -> dict[str, Any]:
+        total = _empty_rollup("")
+        for rollup in rollups:
+            for field in ("jobs", "done", "failed", "cancelled", "bytes", "seconds"):
+                total[field] += rollup[field]
+        return total
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import sqlite3
+import time
 import uuid
 from contextlib import contextmanager
 from dataclasses import dataclass
@@ -8,11 +9,26 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Iterator
 
+from app.metrics import REGISTRY, timed
+from app.profiling import current_profile
+from app.storage.job_archive import ensure_archive_schema
+from app.storage.revisions import install_revision_triggers, read_revision
+
+STORE_LATENCY = REGISTRY.histogram(
+    "animefin_jobs_store_operation_seconds",
+    "Latency of JobsStore operations.",
+    ("operation",),
+)
+
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _episode_number(episode: str) -> int | None:
+    return int(episode) if episode.isdigit() and episode == str(int(episode)) else None
+
+
 @dataclass(frozen=True)
 class NewJob:
     show_id: str
@@ -24,6 +40,7 @@ class NewJob:
     source_url: str = ""
     source_type: str = ""
     referer: str = ""
+    schedule: str = "immediate"
 
 
 class JobsStore:
@@ -35,14 +52,23 @@ class JobsStore:
     def _connect(self) -> Iterator[sqlite3.Connection]:
         conn = sqlite3.connect(self._db_path)
         conn.row_factory = sqlite3.Row
+        profile = current_profile()
+        statements = [0]
+        if profile is not None:
+            conn.set_trace_callback(lambda _: statements.__setitem__(0, statements[0] + 1))
+        started = time.perf_counter()
         try:
             yield conn
             conn.commit()
         finally:
             conn.close()
+            if profile is not None:
+                profile.record("sqlite", time.perf_counter() - started, statements[0])
 
     def _initialize(self) -> None:
         with self._connect() as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS jobs (
@@ -75,6 +101,18 @@ class JobsStore:
                 conn.execute("ALTER TABLE jobs ADD COLUMN source_type TEXT NOT NULL DEFAULT ''")
             if "referer" not in names:
                 conn.execute("ALTER TABLE jobs ADD COLUMN referer TEXT NOT NULL DEFAULT ''")
+            if "schedule" not in names:
+                conn.execute("ALTER TABLE jobs ADD COLUMN schedule TEXT NOT NULL DEFAULT 'immediate'")
+            if "batchable" not in names:
+                conn.execute("ALTER TABLE jobs ADD COLUMN batchable INTEGER NOT NULL DEFAULT 1")
+            if "resolve_state" not in names:
+                conn.execute("ALTER TABLE jobs ADD COLUMN resolve_state TEXT NOT NULL DEFAULT ''")
+            if "source_expires_at" not in names:
+                conn.execute("ALTER TABLE jobs ADD COLUMN source_expires_at TEXT")
+            if "resolve_failures" not in names:
+                conn.execute("ALTER TABLE jobs ADD COLUMN resolve_failures INTEGER NOT NULL DEFAULT 0")
+            if "resolve_retry_at" not in names:
+                conn.execute("ALTER TABLE jobs ADD COLUMN resolve_retry_at TEXT")
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS download_events (
@@ -83,11 +121,65 @@ class JobsStore:
                     level TEXT NOT NULL,
                     message TEXT NOT NULL,
                     timestamp TEXT NOT NULL,
+                    kind TEXT NOT NULL DEFAULT 'lifecycle',
                     FOREIGN KEY(job_id) REFERENCES jobs(id)
                 )
                 """
             )
+            event_columns = {c["name"] for c in conn.execute("PRAGMA table_info(download_events)").fetchall()}
+            if "kind" not in event_columns:
+                conn.execute("ALTER TABLE download_events ADD COLUMN kind TEXT NOT NULL DEFAULT 'lifecycle'")
+                conn.execute(
+                    """
+                    UPDATE download_events SET kind = 'output'
+                    WHERE level = 'info'
+                      AND message NOT IN ('Job queued', 'Download started', 'Download completed')
+                      AND message NOT LIKE 'Executing: %'
+                    """
+                )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS event_archives (
+                    job_id TEXT PRIMARY KEY,
+                    path TEXT NOT NULL,
+                    events INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    archived_at TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS postprocess_tasks (
+                    job_id TEXT PRIMARY KEY,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    steps TEXT NOT NULL DEFAULT '',
+                    progress_pct REAL NOT NULL DEFAULT 0,
+                    error_message TEXT NOT NULL DEFAULT '',
+                    normalized INTEGER NOT NULL DEFAULT 0,
+                    media_path TEXT NOT NULL DEFAULT '',
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+                """
+            )
+            task_columns = {c["name"] for c in conn.execute("PRAGMA table_info(postprocess_tasks)").fetchall()}
+            if "normalized" not in task_columns:
+                conn.execute("ALTER TABLE postprocess_tasks ADD COLUMN normalized INTEGER NOT NULL DEFAULT 0")
+            if "media_path" not in task_columns:
+                conn.execute("ALTER TABLE postprocess_tasks ADD COLUMN media_path TEXT NOT NULL DEFAULT ''")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_postprocess_claim ON postprocess_tasks(status, priority, created_at)"
+            )
+            install_revision_triggers(conn, "jobs")
+            ensure_archive_schema(conn)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_show_mode ON jobs(show_id, mode)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs(status, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_download_events_job ON download_events(job_id, id)")
 
+    @timed(STORE_LATENCY, operation="create_jobs")
     def create_jobs(self, jobs: list[NewJob]) -> list[str]:
         created_ids: list[str] = []
         now = utc_now_iso()
@@ -99,8 +191,9 @@ class JobsStore:
                     INSERT INTO jobs (
                         id, show_id, show_title, episode, mode, quality, status,
                         progress_pct, bytes_downloaded, bytes_total, output_path,
-                        source_url, source_type, referer, error_message, created_at, started_at, finished_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, 'queued', 0, 0, 0, ?, ?, ?, ?, '', ?, NULL, NULL)
+                        source_url, source_type, referer, error_message, created_at, started_at, finished_at,
+                        schedule
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, 0, 0, 0, ?, ?, ?, ?, '', ?, NULL, NULL, ?)
                     """,
                     (
                         job_id,
@@ -109,23 +202,26 @@ class JobsStore:
                         job.episode,
                         job.mode,
                         job.quality,
+                        "scheduled" if job.schedule == "off_peak" else "queued",
                         job.output_path,
                         job.source_url,
                         job.source_type,
                         job.referer,
                         now,
+                        job.schedule,
                     ),
                 )
                 conn.execute(
                     """
                     INSERT INTO download_events(job_id, level, message, timestamp)
-                    VALUES (?, 'info', 'Job queued', ?)
+                    VALUES (?, 'info', ?, ?)
                     """,
-                    (job_id, now),
+                    (job_id, "Job scheduled for off-peak window" if job.schedule == "off_peak" else "Job queued", now),
                 )
                 created_ids.append(job_id)
         return created_ids
 
+    @timed(STORE_LATENCY, operation="list_jobs")
     def list_jobs(self) -> list[dict[str, Any]]:
         with self._connect() as conn:
             rows = conn.execute(
@@ -137,25 +233,300 @@ class JobsStore:
             ).fetchall()
         return [dict(r) for r in rows]
 
+    @timed(STORE_LATENCY, operation="existing_episodes")
+    def existing_episodes(self, show_id: str, mode: str) -> set[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT episode FROM jobs WHERE show_id = ? AND mode = ?
+                UNION
+                SELECT episode FROM jobs_archive WHERE show_id = ? AND mode = ?
+                """,
+                (show_id, mode, show_id, mode),
+            ).fetchall()
+        return {r["episode"] for r in rows}
+
+    @timed(STORE_LATENCY, operation="get_job")
     def get_job(self, job_id: str) -> dict[str, Any] | None:
         with self._connect() as conn:
             row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
             if not row:
                 return None
-            events = conn.execute(
+            last = conn.execute(
+                "SELECT MAX(id) AS last_id FROM download_events WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        job = dict(row)
+        job["last_event_id"] = last["last_id"] or 0
+        return job
+
+    @timed(STORE_LATENCY, operation="list_events")
+    def list_events(self, job_id: str, *, after: int = 0, limit: int = 200) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
                 """
-                SELECT level, message, timestamp
+                SELECT id, level, message, timestamp, kind
                 FROM download_events
-                WHERE job_id = ?
+                WHERE job_id = ? AND id > ?
                 ORDER BY id ASC
-                LIMIT 500
+                LIMIT ?
+                """,
+                (job_id, after, limit),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    @timed(STORE_LATENCY, operation="tail_events")
+    def tail_events(self, job_id: str, count: int) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, level, message, timestamp, kind
+                FROM download_events
+                WHERE job_id = ?
+                ORDER BY id DESC
+                LIMIT ?
+                """,
+                (job_id, count),
+            ).fetchall()
+        return [dict(r) for r in reversed(rows)]
+
+    @timed(STORE_LATENCY, operation="count_by_status")
+    def count_by_status(self) -> dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    @timed(STORE_LATENCY, operation="revision")
+    def revision(self) -> int:
+        with self._connect() as conn:
+            return read_revision(conn, "jobs")
+
+    @timed(STORE_LATENCY, operation="get_status")
+    def get_status(self, job_id: str) -> str | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["status"] if row else None
+
+    @timed(STORE_LATENCY, operation="claim_next_queued")
+    def claim_next_queued(self) -> str | None:
+        with self._connect() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at ASC LIMIT 1"
+                ).fetchone()
+                if not row:
+                    return None
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = 'running' WHERE id = ? AND status = 'queued'",
+                    (row["id"],),
+                )
+                if cursor.rowcount == 1:
+                    return row["id"]
+
+    @timed(STORE_LATENCY, operation="claim_batch")
+    def claim_batch(self, job_id: str, limit: int) -> list[str]:
+        with self._connect() as conn:
+            anchor = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if limit <= 1 or not anchor or anchor["source_url"] or not anchor["batchable"]:
+                return [job_id]
+            if _episode_number(anchor["episode"]) is None:
+                return [job_id]
+            rows = conn.execute(
+                """
+                SELECT id, episode
+                FROM jobs
+                WHERE status = 'queued' AND batchable = 1 AND source_url = ''
+                  AND show_id = ? AND show_title = ? AND mode = ? AND quality = ? AND schedule = ? AND id != ?
+                ORDER BY created_at ASC
+                """,
+                (
+                    anchor["show_id"],
+                    anchor["show_title"],
+                    anchor["mode"],
+                    anchor["quality"],
+                    anchor["schedule"],
+                    job_id,
+                ),
+            ).fetchall()
+            candidates: dict[int, str] = {}
+            for row in rows:
+                number = _episode_number(row["episode"])
+                if number is not None:
+                    candidates.setdefault(number, row["id"])
+            first = last = int(anchor["episode"])
+            claimed = {first: job_id}
+            for step in (1, -1):
+                number = first + step
+                while len(claimed) < limit and number in candidates:
+                    cursor = conn.execute(
+                        "UPDATE jobs SET status = 'running' WHERE id = ? AND status = 'queued'",
+                        (candidates[number],),
+                    )
+                    if cursor.rowcount != 1:
+                        break
+                    claimed[number] = candidates[number]
+                    number += step
+        return [claimed[number] for number in sorted(claimed)]
+
+    @timed(STORE_LATENCY, operation="split_from_batch")
+    def split_from_batch(self, job_id: str, message: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE jobs
+                SET status = 'queued', batchable = 0, error_message = '', finished_at = NULL
+                WHERE id = ?
                 """,
                 (job_id,),
+            )
+            conn.execute(
+                """
+                INSERT INTO download_events(job_id, level, message, timestamp)
+                VALUES (?, 'warn', ?, ?)
+                """,
+                (job_id, message, utc_now_iso()),
+            )
+
+    @timed(STORE_LATENCY, operation="resolution_candidates")
+    def resolution_candidates(self, lookahead: int, refresh_before: str, now: str = "") -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT *
+                FROM (SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at ASC LIMIT ?)
+                WHERE ((resolve_state = '' AND source_url = '')
+                       OR (resolve_state = 'resolved' AND source_expires_at <= ?))
+                  AND (resolve_retry_at IS NULL OR resolve_retry_at <= ?)
+                ORDER BY created_at ASC
+                """,
+                (lookahead, refresh_before, now or utc_now_iso()),
             ).fetchall()
-        job = dict(row)
-        job["events"] = [dict(e) for e in events]
-        return job
+        return [dict(row) for row in rows]
+
+    @timed(STORE_LATENCY, operation="store_resolution")
+    def store_resolution(
+        self, job_id: str, *, source_url: str, source_type: str, referer: str, expires_at: str, status: str = "queued"
+    ) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET source_url = ?, source_type = ?, referer = ?, source_expires_at = ?, resolve_state = 'resolved',
+                    resolve_failures = 0, resolve_retry_at = NULL
+                WHERE id = ? AND status = ?
+                  AND (resolve_state = 'resolved' OR (resolve_state = '' AND source_url = ''))
+                """,
+                (source_url, source_type, referer, expires_at, job_id, status),
+            )
+            if cursor.rowcount == 1:
+                conn.execute(
+                    """
+                    INSERT INTO download_events(job_id, level, message, timestamp)
+                    VALUES (?, 'info', ?, ?)
+                    """,
+                    (job_id, f"Stream resolved ahead of download ({source_type}, expires {expires_at})", utc_now_iso()),
+                )
+        return cursor.rowcount == 1
+
+    @timed(STORE_LATENCY, operation="mark_unresolvable")
+    def mark_unresolvable(self, job_id: str, message: str) -> None:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET resolve_state = 'unavailable' WHERE id = ? AND resolve_state != 'unavailable'",
+                (job_id,),
+            )
+            if cursor.rowcount == 1:
+                conn.execute(
+                    """
+                    INSERT INTO download_events(job_id, level, message, timestamp)
+                    VALUES (?, 'warn', ?, ?)
+                    """,
+                    (job_id, message, utc_now_iso()),
+                )
+
+    @timed(STORE_LATENCY, operation="record_resolve_failure")
+    def record_resolve_failure(self, job_id: str, message: str, *, retry_at: str, max_failures: int) -> int:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET resolve_failures = resolve_failures + 1, resolve_retry_at = ? WHERE id = ?",
+                (retry_at, job_id),
+            )
+            row = conn.execute("SELECT resolve_failures FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            failures = row["resolve_failures"] if row else 0
+            if failures >= max_failures:
+                # Give up on ahead-of-time resolution; the worker falls back to ani-cli.
+                conn.execute(
+                    """
+                    UPDATE jobs
+                    SET source_url = '', source_type = '', referer = '', source_expires_at = NULL,
+                        resolve_state = 'unavailable'
+                    WHERE id = ? AND resolve_state != 'unavailable'
+                    """,
+                    (job_id,),
+                )
+                message = f"{message}; giving up after {failures} attempts, ani-cli will resolve it"
+            else:
+                message = f"{message}; retrying after {retry_at}"
+            if row:
+                conn.execute(
+                    """
+                    INSERT INTO download_events(job_id, level, message, timestamp)
+                    VALUES (?, 'warn', ?, ?)
+                    """,
+                    (job_id, message, utc_now_iso()),
+                )
+        return failures
+
+    @timed(STORE_LATENCY, operation="clear_resolution")
+    def clear_resolution(self, job_id: str, message: str) -> None:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                UPDATE jobs
+                SET source_url = '', source_type = '', referer = '', source_expires_at = NULL, resolve_state = ''
+                WHERE id = ? AND resolve_state = 'resolved'
+                """,
+                (job_id,),
+            )
+            if cursor.rowcount == 1:
+                conn.execute(
+                    """
+                    INSERT INTO download_events(job_id, level, message, timestamp)
+                    VALUES (?, 'warn', ?, ?)
+                    """,
+                    (job_id, message, utc_now_iso()),
+                )
+
+    @timed(STORE_LATENCY, operation="release_scheduled")
+    def release_scheduled(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE jobs SET status = 'queued' WHERE status = 'scheduled'")
+        return cursor.rowcount
+
+    @timed(STORE_LATENCY, operation="hold_off_peak")
+    def hold_off_peak(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'scheduled' WHERE status = 'queued' AND schedule = 'off_peak'"
+            )
+        return cursor.rowcount
+
+    @timed(STORE_LATENCY, operation="requeue_job")
+    def requeue_job(self, job_id: str, message: str, status: str = "queued") -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error_message = '', finished_at = NULL WHERE id = ?",
+                (status, job_id),
+            )
+            conn.execute(
+                """
+                INSERT INTO download_events(job_id, level, message, timestamp)
+                VALUES (?, 'warn', ?, ?)
+                """,
+                (job_id, message, utc_now_iso()),
+            )
 
+    @timed(STORE_LATENCY, operation="update_job_status")
     def update_job_status(
         self,
         job_id: str,
@@ -175,6 +546,7 @@ class JobsStore:
                 (status, error_message, started_at, finished_at, job_id),
             )
 
+    @timed(STORE_LATENCY, operation="update_progress")
     def update_progress(
         self,
         job_id: str,
@@ -204,20 +576,229 @@ class JobsStore:
                 ),
             )
 
-    def append_event(self, job_id: str, level: str, message: str) -> None:
+    @timed(STORE_LATENCY, operation="append_event")
+    def append_event(self, job_id: str, level: str, message: str, kind: str = "lifecycle") -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO download_events(job_id, level, message, timestamp, kind)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (job_id, level, message, utc_now_iso(), kind),
+            )
+
+    @timed(STORE_LATENCY, operation="enqueue_postprocess")
+    def enqueue_postprocess(
+        self, job_id: str, priority: int = 0, *, renormalize: bool = False, media_path: str = ""
+    ) -> None:
+        now = utc_now_iso()
         with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO postprocess_tasks(job_id, priority, status, media_path, created_at)
+                VALUES (?, ?, 'pending', ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    priority = excluded.priority,
+                    media_path = CASE WHEN excluded.media_path != '' THEN excluded.media_path ELSE media_path END,
+                    status = 'pending',
+                    steps = '',
+                    progress_pct = 0,
+                    error_message = '',
+                    normalized = CASE WHEN ? THEN 0 ELSE normalized END,
+                    created_at = excluded.created_at,
+                    started_at = NULL,
+                    finished_at = NULL
+                WHERE status != 'running'
+                """,
+                (job_id, priority, media_path, now, int(renormalize)),
+            )
             conn.execute(
                 """
                 INSERT INTO download_events(job_id, level, message, timestamp)
-                VALUES (?, ?, ?, ?)
+                VALUES (?, 'info', 'Post-processing queued', ?)
+                """,
+                (job_id, now),
+            )
+
+    @timed(STORE_LATENCY, operation="claim_next_postprocess")
+    def claim_next_postprocess(self) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            while True:
+                row = conn.execute(
+                    """
+                    SELECT t.job_id, t.priority, t.normalized,
+                           COALESCE(NULLIF(t.media_path, ''), j.output_path) AS output_path
+                    FROM postprocess_tasks t JOIN jobs j ON j.id = t.job_id
+                    WHERE t.status = 'pending'
+                    ORDER BY t.priority DESC, t.created_at ASC
+                    LIMIT 1
+                    """
+                ).fetchone()
+                if not row:
+                    return None
+                cursor = conn.execute(
+                    """
+                    UPDATE postprocess_tasks SET status = 'running', started_at = ?
+                    WHERE job_id = ? AND status = 'pending'
+                    """,
+                    (utc_now_iso(), row["job_id"]),
+                )
+                if cursor.rowcount == 1:
+                    return dict(row)
+
+    @timed(STORE_LATENCY, operation="update_postprocess")
+    def update_postprocess(
+        self,
+        job_id: str,
+        *,
+        status: str | None = None,
+        steps: str | None = None,
+        progress_pct: float | None = None,
+        error_message: str | None = None,
+        finished_at: str | None = None,
+        normalized: bool | None = None,
+    ) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE postprocess_tasks
+                SET status = COALESCE(?, status),
+                    steps = COALESCE(?, steps),
+                    progress_pct = COALESCE(?, progress_pct),
+                    error_message = COALESCE(?, error_message),
+                    finished_at = COALESCE(?, finished_at),
+                    normalized = COALESCE(?, normalized)
+                WHERE job_id = ?
+                """,
+                (
+                    status,
+                    steps,
+                    progress_pct,
+                    error_message,
+                    finished_at,
+                    None if normalized is None else int(normalized),
+                    job_id,
+                ),
+            )
+
+    @timed(STORE_LATENCY, operation="get_postprocess")
+    def get_postprocess(self, job_id: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM postprocess_tasks WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    @timed(STORE_LATENCY, operation="count_postprocess_by_status")
+    def count_postprocess_by_status(self) -> dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM postprocess_tasks GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    @timed(STORE_LATENCY, operation="requeue_running_postprocess")
+    def requeue_running_postprocess(self) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE postprocess_tasks SET status = 'pending', started_at = NULL WHERE status = 'running'"
+            )
+        return cursor.rowcount
+
+    @timed(STORE_LATENCY, operation="compaction_candidates")
+    def compaction_candidates(self, status: str, finished_before: str, limit: int = 100) -> list[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT j.id FROM jobs j
+                LEFT JOIN event_archives a ON a.job_id = j.id
+                WHERE j.status = ? AND j.finished_at IS NOT NULL AND j.finished_at < ? AND a.job_id IS NULL
+                ORDER BY j.finished_at ASC
+                LIMIT ?
+                """,
+                (status, finished_before, limit),
+            ).fetchall()
+        return [r["id"] for r in rows]
+
+    @timed(STORE_LATENCY, operation="compact_events")
+    def compact_events(self, job_id: str, *, keep_output: int, archive_path: str, events: int, size: int) -> int:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                """
+                DELETE FROM download_events
+                WHERE job_id = ? AND kind = 'output' AND id NOT IN (
+                    SELECT id FROM download_events
+                    WHERE job_id = ? AND kind = 'output'
+                    ORDER BY id DESC
+                    LIMIT ?
+                )
                 """,
-                (job_id, level, message, utc_now_iso()),
+                (job_id, job_id, keep_output),
             )
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO event_archives(job_id, path, events, bytes, archived_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (job_id, archive_path, events, size, utc_now_iso()),
+            )
+        return cursor.rowcount
+
+    def event_archive(self, job_id: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM event_archives WHERE job_id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    @timed(STORE_LATENCY, operation="expired_event_archives")
+    def expired_event_archives(self, archived_before: str, limit: int = 500) -> list[dict[str, Any]]:
+        # Only logs whose job has left the hot table; live jobs keep theirs for the log endpoint.
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT a.* FROM event_archives a
+                LEFT JOIN jobs j ON j.id = a.job_id
+                WHERE a.archived_at < ? AND j.id IS NULL
+                ORDER BY a.archived_at ASC
+                LIMIT ?
+                """,
+                (archived_before, limit),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    @timed(STORE_LATENCY, operation="delete_event_archives")
+    def delete_event_archives(self, job_ids: list[str]) -> int:
+        with self._connect() as conn:
+            cursor = conn.executemany("DELETE FROM event_archives WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+        return cursor.rowcount
+
+    @timed(STORE_LATENCY, operation="incremental_vacuum")
+    def incremental_vacuum(self, pages: int) -> dict[str, int]:
+        with self._connect() as conn:
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if mode == 2:
+                conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return {
+            "incremental": int(mode == 2),
+            "pages_freed": before - after,
+            "free_pages_left": after,
+        }
+
+    def convert_to_incremental_vacuum(self) -> dict[str, int]:
+        # A full VACUUM blocks every writer for the whole rewrite and needs about twice the
+        # file size in free disk, so this only runs from the `vacuum` maintenance command.
+        before = self._db_path.stat().st_size
+        with self._connect() as conn:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return {"converted": 0, "bytes_before": before, "bytes_after": before}
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.commit()
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return {"converted": 1, "bytes_before": before, "bytes_after": self._db_path.stat().st_size}
 
+    @timed(STORE_LATENCY, operation="mark_running_jobs_recoverable")
     def mark_running_jobs_recoverable(self) -> list[str]:
         with self._connect() as conn:
             rows = conn.execute(
-                "SELECT id FROM jobs WHERE status IN ('running', 'queued') ORDER BY created_at ASC"
+                "SELECT id FROM jobs WHERE status = 'running' ORDER BY created_at ASC"
             ).fetchall()
             ids = [r["id"] for r in rows]
             if not ids:
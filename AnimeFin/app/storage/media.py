@@ -1,48 +1,355 @@
 from __future__ import annotations
 
+import multiprocessing
+import os
 import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any
+
+from app.services.media_probe import probe_media
+from app.storage.deletions import DeletionStore
+from app.storage.media_index import MediaEntry, MediaIndex
+from app.storage.media_metadata import METADATA_FIELDS, MediaMetadataCache
+from app.storage.media_usage import MediaUsageStore
+
+
+TRASH_DIR_NAME = ".trash"
+ACCESS_DEBOUNCE_SECONDS = 60.0
+ACCESS_DEBOUNCE_ENTRIES = 4096
 
 
 class MediaStore:
-    def __init__(self, downloads_root: Path) -> None:
+    def __init__(
+        self,
+        downloads_root: Path,
+        index: MediaIndex | None = None,
+        metadata: MediaMetadataCache | None = None,
+        probe_workers: int = 2,
+        deletions: DeletionStore | None = None,
+        trash_grace_seconds: float = 0,
+        usage: MediaUsageStore | None = None,
+    ) -> None:
         self.downloads_root = downloads_root.resolve()
         self.downloads_root.mkdir(parents=True, exist_ok=True)
+        self.trash_root = self.downloads_root / TRASH_DIR_NAME
+        self.index = index
+        self.metadata = metadata
+        self.deletions = deletions
+        self.trash_grace_seconds = trash_grace_seconds
+        self.usage = usage
+        self._last_access: OrderedDict[str, float] = OrderedDict()
+        self._access_lock = threading.Lock()
+        self.probe_workers = probe_workers
+        self._probe_pool: ProcessPoolExecutor | None = None
+        self._probe_lock = threading.Lock()
+        self._probing: set[str] = set()
+        self._reconcile_lock = threading.Lock()
+        self._reconciler_stop = threading.Event()
+        self._reconciler_thread: threading.Thread | None = None
+
+    def list_media(self, show: str | None = None, offset: int = 0, limit: int | None = None) -> list[dict[str, str]]:
+        return self.query_media(show=show, offset=offset, limit=limit)[0]
+
+    def revision(self) -> str | None:
+        if self.index is None:
+            return None
+        metadata = self.metadata.revision() if self.metadata is not None else 0
+        return f"{self.index.revision()}.{metadata}"
 
-    def list_media(self) -> list[dict[str, str]]:
-        items: list[dict[str, str]] = []
+    def query_media(
+        self, *, show: str | None = None, offset: int = 0, limit: int | None = None
+    ) -> tuple[list[dict[str, Any]], int]:
+        if self.index is not None:
+            items, total = self.index.list_entries(show=show, offset=offset, limit=limit)
+            return self._with_metadata(items), total
+
+        items: list[dict[str, Any]] = []
         for path in sorted(self.downloads_root.glob("**/*"), key=lambda p: str(p).lower()):
             if path.is_dir():
                 continue
             rel = path.relative_to(self.downloads_root)
+            if rel.parts[0] == TRASH_DIR_NAME:
+                continue
             media_id = rel.as_posix()
-            items.append(
-                {
-                    "media_id": media_id,
-                    "show": rel.parts[0] if rel.parts else "unknown",
-                    "path": str(path),
-                }
-            )
+            item = {
+                "media_id": media_id,
+                "show": rel.parts[0] if rel.parts else "unknown",
+                "path": str(path),
+            }
+            if show is None or item["show"] == show:
+                items.append(item)
+        end = None if limit is None else offset + limit
+        page = items[offset:end]
+        for item in page:
+            stat = Path(item["path"]).stat()
+            item["size"] = stat.st_size
+            item["mtime_ns"] = stat.st_mtime_ns
+        return self._with_metadata(page), len(items)
+
+    def _with_metadata(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        cached = {}
+        if self.metadata is not None:
+            cached = self.metadata.get_many([(i["path"], i["size"], i["mtime_ns"]) for i in items])
+        for item in items:
+            item["size_bytes"] = item.pop("size")
+            item["mtime"] = item.pop("mtime_ns") / 1e9
+            item.update(cached.get(item["path"]) or dict.fromkeys(METADATA_FIELDS))
         return items
 
+    def schedule_probe(self, path: Path) -> Future | None:
+        if self.metadata is None:
+            return None
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        key = str(path)
+        if self.metadata.get(key, stat.st_size, stat.st_mtime_ns) is not None:
+            return None
+        with self._probe_lock:
+            if key in self._probing:
+                return None
+            self._probing.add(key)
+            if self.probe_workers <= 0:
+                future: Future = Future()
+                try:
+                    future.set_result(probe_media(key))
+                except Exception as exc:  # noqa: BLE001
+                    future.set_exception(exc)
+            else:
+                if self._probe_pool is None:
+                    self._probe_pool = ProcessPoolExecutor(
+                        max_workers=self.probe_workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                future = self._probe_pool.submit(probe_media, key)
+
+        def store(done: Future) -> None:
+            with self._probe_lock:
+                self._probing.discard(key)
+            if done.exception() is None and self.metadata is not None:
+                self.metadata.put(key, stat.st_size, stat.st_mtime_ns, done.result())
+
+        future.add_done_callback(store)
+        return future
+
+    def shutdown(self) -> None:
+        self.stop_reconciler()
+        if self._probe_pool is not None:
+            self._probe_pool.shutdown(wait=False, cancel_futures=True)
+
     def _safe_path(self, media_id: str) -> Path:
         candidate = (self.downloads_root / media_id).resolve()
         if self.downloads_root not in candidate.parents and candidate != self.downloads_root:
             raise ValueError("Invalid media id path.")
+        if candidate == self.trash_root or self.trash_root in candidate.parents:
+            raise ValueError("Invalid media id path.")
         return candidate
 
-    def delete_media(self, media_id: str) -> dict[str, str]:
+    def record_access(self, media_id: str) -> None:
+        if self.usage is None:
+            return
+        now = time.monotonic()
+        with self._access_lock:
+            last = self._last_access.get(media_id)
+            if last is not None and now - last < ACCESS_DEBOUNCE_SECONDS:
+                return
+            self._last_access[media_id] = now
+            self._last_access.move_to_end(media_id)
+            while len(self._last_access) > ACCESS_DEBOUNCE_ENTRIES:
+                self._last_access.popitem(last=False)
+        self.usage.touch(media_id, self._show_of(media_id))
+
+    def set_watched(self, media_id: str, watched: bool = True) -> dict[str, Any]:
+        if self.usage is None:
+            raise ValueError("Access tracking is not enabled.")
+        target = self._safe_path(media_id)
+        if not target.is_file():
+            raise FileNotFoundError(media_id)
+        media_id = target.relative_to(self.downloads_root).as_posix()
+        self.usage.set_watched(media_id, self._show_of(media_id), watched)
+        return self.usage.get(media_id) or {}
+
+    def delete_media(self, media_id: str, grace_seconds: float | None = None) -> dict[str, str]:
         target = self._safe_path(media_id)
         if not target.exists():
             raise FileNotFoundError(media_id)
+        kind = "directory" if target.is_dir() else "file"
 
-        if target.is_dir():
+        if self.deletions is not None:
+            deletion_id = str(uuid.uuid4())
+            bytes_total = target.stat().st_size if kind == "file" else 0
+            staged = self.trash_root / deletion_id / target.name
+            grace = self.trash_grace_seconds if grace_seconds is None else grace_seconds
+            purge_after = datetime.now(timezone.utc) + timedelta(seconds=grace)
+            # Record first: a crash after the move must still leave a row the reclaimer can find.
+            self.deletions.create(
+                deletion_id,
+                media_id,
+                kind,
+                str(staged),
+                purge_after.isoformat(),
+                bytes_total=bytes_total,
+                status="pending",
+            )
+            try:
+                staged.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(target, staged)
+            except OSError as exc:
+                self.deletions.finish(deletion_id, "failed", str(exc))
+                raise
+            self.deletions.claim(deletion_id, "pending", "trashed")
+            self._forget(target)
+            self._prune_empty_parents(target.parent)
+            return {"deleted": media_id, "type": kind, "deletion_id": deletion_id}
+
+        if kind == "directory":
             shutil.rmtree(target)
-            return {"deleted": media_id, "type": "directory"}
+            self._forget(target)
+            return {"deleted": media_id, "type": kind}
 
         target.unlink()
-        parent = target.parent
+        self._forget(target)
+        self._prune_empty_parents(target.parent)
+        return {"deleted": media_id, "type": kind}
+
+    def restore_deletion(self, deletion_id: str) -> dict[str, Any]:
+        if self.deletions is None:
+            raise FileNotFoundError(deletion_id)
+        record = self.deletions.get(deletion_id)
+        if not record:
+            raise FileNotFoundError(deletion_id)
+        original = self._safe_path(record["media_id"])
+        if original.exists():
+            raise FileExistsError(record["media_id"])
+        if not self.deletions.claim(deletion_id, "trashed", "restoring"):
+            raise ValueError(f"Deletion {deletion_id} can no longer be restored")
+
+        staged = Path(record["trash_path"])
+        try:
+            original.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(staged, original)
+        except OSError as exc:
+            self.deletions.claim(deletion_id, "restoring", "trashed")
+            raise ValueError(f"Unable to restore {record['media_id']}: {exc}") from exc
+        try:
+            staged.parent.rmdir()
+        except OSError:
+            pass
+        self.deletions.finish(deletion_id, "restored")
+        self.record_path(original)
+        return self.deletions.get(deletion_id) or {}
+
+    def _prune_empty_parents(self, parent: Path) -> None:
         while parent != self.downloads_root and not any(parent.iterdir()):
             parent.rmdir()
+            self._forget(parent)
             parent = parent.parent
-        return {"deleted": media_id, "type": "file"}
+
+    def record_path(self, path: Path) -> None:
+        target = path.resolve()
+        if self.downloads_root not in target.parents:
+            return
+        if self.index is None:
+            if target.is_file():
+                self.schedule_probe(target)
+            return
+        if target.is_dir():
+            self.reconcile(target)
+        elif target.is_file():
+            self.index.upsert([self._entry(target, target.stat())])
+            self.schedule_probe(target)
+
+    def record_job(self, job: dict[str, Any]) -> None:
+        output_path = Path(job["output_path"])
+        self.record_path(output_path if output_path.is_file() else output_path.parent)
+
+    def reconcile(self, start: Path | None = None) -> dict[str, int]:
+        if self.index is None:
+            return {"scanned_dirs": 0, "changed_dirs": 0, "removed_dirs": 0}
+        root = (start or self.downloads_root).resolve()
+        with self._reconcile_lock:
+            known = self.index.directory_mtimes()
+            seen: set[str] = set()
+            changed = 0
+            for dirpath, dirnames, filenames in os.walk(root):
+                directory = Path(dirpath)
+                if directory == self.downloads_root and TRASH_DIR_NAME in dirnames:
+                    dirnames.remove(TRASH_DIR_NAME)
+                rel_dir = self._rel_dir(directory)
+                seen.add(rel_dir)
+                try:
+                    mtime_ns = directory.stat().st_mtime_ns
+                except FileNotFoundError:
+                    continue
+                if known.get(rel_dir) == mtime_ns:
+                    continue
+                entries = []
+                for name in filenames:
+                    path = directory / name
+                    try:
+                        entries.append(self._entry(path, path.stat()))
+                    except FileNotFoundError:
+                        continue
+                self.index.replace_directory(rel_dir, mtime_ns, entries)
+                for entry in entries:
+                    self.schedule_probe(Path(entry.path))
+                changed += 1
+
+            scope = self._rel_dir(root)
+            stale = {
+                d for d in known if d not in seen and (not scope or d == scope or d.startswith(scope + "/"))
+            }
+            self.index.drop_directories(stale)
+        return {"scanned_dirs": len(seen), "changed_dirs": changed, "removed_dirs": len(stale)}
+
+    def start_reconciler(self, interval_seconds: float) -> None:
+        if self.index is None or self._reconciler_thread is not None:
+            return
+
+        def loop() -> None:
+            while True:
+                try:
+                    self.reconcile()
+                except OSError:
+                    pass
+                if self._reconciler_stop.wait(interval_seconds):
+                    return
+
+        self._reconciler_thread = threading.Thread(target=loop, daemon=True)
+        self._reconciler_thread.start()
+
+    def stop_reconciler(self) -> None:
+        self._reconciler_stop.set()
+
+    def _forget(self, target: Path) -> None:
+        if self.index is not None:
+            self.index.remove(target.relative_to(self.downloads_root).as_posix())
+        if self.metadata is not None:
+            self.metadata.forget(str(target))
+        if self.usage is not None:
+            self.usage.forget(target.relative_to(self.downloads_root).as_posix())
+
+    @staticmethod
+    def _show_of(media_id: str) -> str:
+        return media_id.split("/", 1)[0] if media_id else "unknown"
+
+    def _rel_dir(self, directory: Path) -> str:
+        rel = directory.relative_to(self.downloads_root).as_posix()
+        return "" if rel == "." else rel
+
+    def _entry(self, path: Path, stat: os.stat_result) -> MediaEntry:
+        rel = path.relative_to(self.downloads_root)
+        return MediaEntry(
+            media_id=rel.as_posix(),
+            show=rel.parts[0] if rel.parts else "unknown",
+            directory=self._rel_dir(path.parent),
+            path=str(path),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+        )
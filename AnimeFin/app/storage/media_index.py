@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.storage.revisions import install_revision_triggers, read_revision
+
+
+@dataclass(frozen=True)
+class MediaEntry:
+    media_id: str
+    show: str
+    directory: str
+    path: str
+    size: int
+    mtime_ns: int
+
+
+class MediaIndex:
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        self._initialize()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS media_entries (
+                    media_id TEXT PRIMARY KEY,
+                    show TEXT NOT NULL,
+                    directory TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    mtime_ns INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_media_sort ON media_entries(media_id COLLATE NOCASE)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_media_show ON media_entries(show, media_id COLLATE NOCASE)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_media_directory ON media_entries(directory)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS media_dirs (
+                    directory TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL
+                )
+                """
+            )
+            install_revision_triggers(conn, "media_entries")
+
+    def revision(self) -> int:
+        with self._connect() as conn:
+            return read_revision(conn, "media_entries")
+
+    def upsert(self, entries: list[MediaEntry]) -> None:
+        if not entries:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                """
+                INSERT INTO media_entries(media_id, show, directory, path, size, mtime_ns)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(media_id) DO UPDATE SET
+                    show = excluded.show,
+                    directory = excluded.directory,
+                    path = excluded.path,
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns
+                """,
+                [(e.media_id, e.show, e.directory, e.path, e.size, e.mtime_ns) for e in entries],
+            )
+
+    def remove(self, media_id: str) -> None:
+        prefix = media_id.rstrip("/") + "/"
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM media_entries WHERE media_id = ? OR substr(media_id, 1, ?) = ?",
+                (media_id, len(prefix), prefix),
+            )
+            conn.execute(
+                "DELETE FROM media_dirs WHERE directory = ? OR substr(directory, 1, ?) = ?",
+                (media_id, len(prefix), prefix),
+            )
+
+    def list_entries(
+        self, *, show: str | None = None, offset: int = 0, limit: int | None = None
+    ) -> tuple[list[dict[str, Any]], int]:
+        where = "WHERE show = ?" if show is not None else ""
+        params: tuple[Any, ...] = (show,) if show is not None else ()
+        with self._connect() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM media_entries {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"""
+                SELECT media_id, show, path, size, mtime_ns
+                FROM media_entries
+                {where}
+                ORDER BY media_id COLLATE NOCASE
+                LIMIT ? OFFSET ?
+                """,
+                (*params, -1 if limit is None else limit, offset),
+            ).fetchall()
+        return [dict(r) for r in rows], total
+
+    def total_bytes(self) -> int:
+        with self._connect() as conn:
+            return int(conn.execute("SELECT COALESCE(SUM(size), 0) FROM media_entries").fetchone()[0])
+
+    def sizes(self, media_ids: list[str]) -> dict[str, int]:
+        found: dict[str, int] = {}
+        with self._connect() as conn:
+            for start in range(0, len(media_ids), 500):
+                chunk = media_ids[start : start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT media_id, size FROM media_entries WHERE media_id IN ({placeholders})", chunk
+                ).fetchall()
+                found.update({r["media_id"]: r["size"] for r in rows})
+        return found
+
+    def directory_mtimes(self) -> dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT directory, mtime_ns FROM media_dirs").fetchall()
+        return {r["directory"]: r["mtime_ns"] for r in rows}
+
+    def replace_directory(self, directory: str, mtime_ns: int, entries: list[MediaEntry]) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM media_entries WHERE directory = ?", (directory,))
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO media_entries(media_id, show, directory, path, size, mtime_ns)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                [(e.media_id, e.show, e.directory, e.path, e.size, e.mtime_ns) for e in entries],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO media_dirs(directory, mtime_ns) VALUES (?, ?)",
+                (directory, mtime_ns),
+            )
+
+    def drop_directories(self, directories: set[str]) -> None:
+        if not directories:
+            return
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM media_entries WHERE directory = ?", [(d,) for d in directories])
+            conn.executemany("DELETE FROM media_dirs WHERE directory = ?", [(d,) for d in directories])
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.storage.jobs import utc_now_iso
+from app.storage.revisions import install_revision_triggers, read_revision
+
+
+METADATA_FIELDS = ("container", "duration_seconds", "video_codec", "audio_codec", "faststart")
+
+
+class MediaMetadataCache:
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        self._initialize()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS media_metadata (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    container TEXT NOT NULL DEFAULT 'unknown',
+                    duration_seconds REAL,
+                    video_codec TEXT,
+                    audio_codec TEXT,
+                    faststart INTEGER NOT NULL DEFAULT 0,
+                    probed_at TEXT NOT NULL
+                )
+                """
+            )
+            install_revision_triggers(conn, "media_metadata")
+
+    def revision(self) -> int:
+        with self._connect() as conn:
+            return read_revision(conn, "media_metadata")
+
+    def get(self, path: str, size: int, mtime_ns: int) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM media_metadata WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, size, mtime_ns),
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def get_many(self, keys: list[tuple[str, int, int]]) -> dict[str, dict[str, Any]]:
+        wanted = {path: (size, mtime_ns) for path, size, mtime_ns in keys}
+        paths = list(wanted)
+        found: dict[str, dict[str, Any]] = {}
+        with self._connect() as conn:
+            for start in range(0, len(paths), self.LOOKUP_CHUNK):
+                chunk = paths[start : start + self.LOOKUP_CHUNK]
+                placeholders = ",".join("?" for _ in chunk)
+                rows = conn.execute(
+                    f"SELECT * FROM media_metadata WHERE path IN ({placeholders})", chunk
+                ).fetchall()
+                for row in rows:
+                    if wanted[row["path"]] == (row["size"], row["mtime_ns"]):
+                        found[row["path"]] = self._to_dict(row)
+        return found
+
+    def put(self, path: str, size: int, mtime_ns: int, metadata: dict[str, Any]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO media_metadata(
+                    path, size, mtime_ns, container, duration_seconds, video_codec, audio_codec, faststart, probed_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    path,
+                    size,
+                    mtime_ns,
+                    metadata.get("container") or "unknown",
+                    metadata.get("duration_seconds"),
+                    metadata.get("video_codec"),
+                    metadata.get("audio_codec"),
+                    int(bool(metadata.get("faststart"))),
+                    utc_now_iso(),
+                ),
+            )
+
+    def forget(self, path: str) -> None:
+        prefix = path.rstrip("/") + "/"
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM media_metadata WHERE path = ? OR substr(path, 1, ?) = ?",
+                (path, len(prefix), prefix),
+            )
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict[str, Any]:
+        item = {field: row[field] for field in METADATA_FIELDS}
+        item["faststart"] = bool(item["faststart"])
+        return item
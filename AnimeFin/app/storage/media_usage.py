@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.storage.jobs import utc_now_iso
+
+
+class MediaUsageStore:
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        self._initialize()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS media_access (
+                    media_id TEXT PRIMARY KEY,
+                    show TEXT NOT NULL,
+                    last_access_at TEXT,
+                    watched INTEGER NOT NULL DEFAULT 0,
+                    watched_at TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_media_access_lru ON media_access(watched, last_access_at)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pinned_shows (
+                    show TEXT PRIMARY KEY,
+                    pinned_at TEXT NOT NULL,
+                    pinned INTEGER NOT NULL DEFAULT 1
+                )
+                """
+            )
+            pin_columns = {c["name"] for c in conn.execute("PRAGMA table_info(pinned_shows)").fetchall()}
+            if "pinned" not in pin_columns:
+                conn.execute("ALTER TABLE pinned_shows ADD COLUMN pinned INTEGER NOT NULL DEFAULT 1")
+
+    def touch(self, media_id: str, show: str, accessed_at: str | None = None) -> None:
+        when = accessed_at or utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO media_access(media_id, show, last_access_at) VALUES (?, ?, ?)
+                ON CONFLICT(media_id) DO UPDATE SET last_access_at = excluded.last_access_at
+                """,
+                (media_id, show, when),
+            )
+
+    def set_watched(self, media_id: str, show: str, watched: bool) -> None:
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO media_access(media_id, show, last_access_at, watched, watched_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(media_id) DO UPDATE SET
+                    watched = excluded.watched,
+                    watched_at = excluded.watched_at,
+                    last_access_at = COALESCE(media_access.last_access_at, excluded.last_access_at)
+                """,
+                (media_id, show, now, int(watched), now if watched else None),
+            )
+
+    def get(self, media_id: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM media_access WHERE media_id = ?", (media_id,)).fetchone()
+        return dict(row) if row else None
+
+    def eviction_candidates(self, limit: int = 500) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT a.media_id, a.show, a.last_access_at, a.watched_at
+                FROM media_access a
+                LEFT JOIN pinned_shows p ON p.show = a.show AND p.pinned = 1
+                WHERE a.watched = 1 AND p.show IS NULL
+                ORDER BY COALESCE(a.last_access_at, a.watched_at) ASC
+                LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def forget(self, media_id: str) -> None:
+        prefix = media_id.rstrip("/") + "/"
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM media_access WHERE media_id = ? OR substr(media_id, 1, ?) = ?",
+                (media_id, len(prefix), prefix),
+            )
+
+    def pin_show(self, show: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO pinned_shows(show, pinned_at, pinned) VALUES (?, ?, 1)
+                ON CONFLICT(show) DO UPDATE SET pinned = 1, pinned_at = excluded.pinned_at
+                WHERE pinned = 0
+                """,
+                (show, utc_now_iso()),
+            )
+
+    def seed_pins(self, shows: list[str]) -> None:
+        # Config pins only create missing rows, so an unpin made through the API survives restarts.
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO pinned_shows(show, pinned_at) VALUES (?, ?)",
+                [(show, now) for show in shows],
+            )
+
+    def unpin_show(self, show: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE pinned_shows SET pinned = 0 WHERE show = ? AND pinned = 1", (show,))
+        return cursor.rowcount > 0
+
+    def pinned_shows(self) -> list[str]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT show FROM pinned_shows WHERE pinned = 1 ORDER BY show ASC").fetchall()
+        return [r["show"] for r in rows]
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sqlite3
+
+
+def install_revision_triggers(conn: sqlite3.Connection, table: str) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS table_revisions (name TEXT PRIMARY KEY, revision INTEGER NOT NULL) WITHOUT ROWID"
+    )
+    conn.execute("INSERT OR IGNORE INTO table_revisions(name, revision) VALUES (?, 0)", (table,))
+    for operation in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_revision_{operation.lower()} AFTER {operation} ON {table}
+            BEGIN
+                UPDATE table_revisions SET revision = revision + 1 WHERE name = '{table}';
+            END
+            """
+        )
+
+
+def read_revision(conn: sqlite3.Connection, table: str) -> int:
+    row = conn.execute("SELECT revision FROM table_revisions WHERE name = ?", (table,)).fetchone()
+    return row[0] if row else 0
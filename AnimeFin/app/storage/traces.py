@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+
+class TraceStore:
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        self._initialize()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS job_traces (
+                    job_id TEXT NOT NULL,
+                    attempt INTEGER NOT NULL,
+                    started_at TEXT NOT NULL,
+                    executor TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    duration_us INTEGER NOT NULL,
+                    spans BLOB NOT NULL,
+                    PRIMARY KEY (job_id, attempt)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_traces_started ON job_traces(started_at)")
+
+    def next_attempt(self, job_id: str) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT MAX(attempt) AS n FROM job_traces WHERE job_id = ?", (job_id,)).fetchone()
+        return (row["n"] or 0) + 1
+
+    def save(self, trace: dict[str, Any], *, executor: str, status: str) -> None:
+        started_at = datetime.fromtimestamp(trace["start_unix_us"] / 1_000_000, timezone.utc).isoformat()
+        duration = max((offset + dur for _, _, offset, dur, _ in trace["spans"]), default=0)
+        payload = zlib.compress(json.dumps(trace["spans"], separators=(",", ":")).encode("utf-8"))
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO job_traces(job_id, attempt, started_at, executor, status, duration_us, spans)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (trace["job_id"], trace["attempt"], started_at, executor, status, duration, payload),
+            )
+
+    def delete_jobs(self, job_ids: list[str]) -> int:
+        with self._connect() as conn:
+            cursor = conn.executemany("DELETE FROM job_traces WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+        return cursor.rowcount
+
+    def list_traces(
+        self,
+        *,
+        job_id: str | None = None,
+        executor: str | None = None,
+        since: str = "",
+        limit: int = 1000,
+    ) -> list[dict[str, Any]]:
+        clauses, params = ["started_at >= ?"], [since]
+        if job_id is not None:
+            clauses.append("job_id = ?")
+            params.append(job_id)
+        if executor is not None:
+            clauses.append("executor = ?")
+            params.append(executor)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT * FROM job_traces WHERE {' AND '.join(clauses)}
+                ORDER BY started_at ASC
+                LIMIT ?
+                """,
+                (*params, limit),
+            ).fetchall()
+        return [
+            {
+                "job_id": r["job_id"],
+                "attempt": r["attempt"],
+                "executor": r["executor"],
+                "status": r["status"],
+                "start_unix_us": round(datetime.fromisoformat(r["started_at"]).timestamp() * 1_000_000),
+                "spans": json.loads(zlib.decompress(r["spans"])),
+            }
+            for r in rows
+        ]
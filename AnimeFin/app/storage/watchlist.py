@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.storage.jobs import utc_now_iso
+
+
+@dataclass(frozen=True)
+class NewWatch:
+    show_id: str
+    show_title: str
+    mode: str
+    quality: str
+    backfill: bool = False
+
+
+class WatchlistStore:
+    RELEASE_HISTORY = 8
+
+    def __init__(self, db_path: Path) -> None:
+        self._db_path = db_path
+        self._initialize()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self._db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS watchlist (
+                    id TEXT PRIMARY KEY,
+                    show_id TEXT NOT NULL,
+                    show_title TEXT NOT NULL,
+                    mode TEXT NOT NULL,
+                    quality TEXT NOT NULL,
+                    backfill INTEGER NOT NULL DEFAULT 0,
+                    baseline_episode REAL,
+                    finished INTEGER NOT NULL DEFAULT 0,
+                    idle_polls INTEGER NOT NULL DEFAULT 0,
+                    release_history TEXT NOT NULL DEFAULT '[]',
+                    last_error TEXT NOT NULL DEFAULT '',
+                    error_polls INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    last_checked_at TEXT,
+                    last_new_episode_at TEXT,
+                    next_check_at TEXT NOT NULL,
+                    UNIQUE(show_id, mode)
+                )
+                """
+            )
+            columns = {c["name"] for c in conn.execute("PRAGMA table_info(watchlist)").fetchall()}
+            if "error_polls" not in columns:
+                conn.execute("ALTER TABLE watchlist ADD COLUMN error_polls INTEGER NOT NULL DEFAULT 0")
+
+    def add(self, watch: NewWatch) -> dict[str, Any]:
+        now = utc_now_iso()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO watchlist (
+                    id, show_id, show_title, mode, quality, backfill, created_at, next_check_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(show_id, mode) DO UPDATE SET
+                    show_title = excluded.show_title,
+                    quality = excluded.quality,
+                    finished = 0,
+                    next_check_at = excluded.next_check_at
+                """,
+                (
+                    str(uuid.uuid4()),
+                    watch.show_id,
+                    watch.show_title,
+                    watch.mode,
+                    watch.quality,
+                    int(watch.backfill),
+                    now,
+                    now,
+                ),
+            )
+            row = conn.execute(
+                "SELECT * FROM watchlist WHERE show_id = ? AND mode = ?", (watch.show_id, watch.mode)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def list_watches(self) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM watchlist ORDER BY show_title ASC").fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def get(self, watch_id: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM watchlist WHERE id = ?", (watch_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def remove(self, watch_id: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM watchlist WHERE id = ?", (watch_id,))
+        return cursor.rowcount > 0
+
+    def set_finished(self, watch_id: str, finished: bool) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE watchlist SET finished = ?, idle_polls = 0, next_check_at = ? WHERE id = ?",
+                (int(finished), utc_now_iso(), watch_id),
+            )
+        return cursor.rowcount > 0
+
+    def due(self, now_iso: str, limit: int = 50) -> list[dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM watchlist WHERE next_check_at <= ? ORDER BY next_check_at ASC LIMIT ?",
+                (now_iso, limit),
+            ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def record_poll(
+        self,
+        watch_id: str,
+        *,
+        checked_at: str,
+        next_check_at: str,
+        new_episodes: int,
+        baseline_episode: float | None = None,
+        error: str = "",
+    ) -> None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM watchlist WHERE id = ?", (watch_id,)).fetchone()
+            if not row:
+                return
+            history = json.loads(row["release_history"] or "[]")
+            idle_polls = row["idle_polls"]
+            error_polls = row["error_polls"] + 1 if error else 0
+            last_new = row["last_new_episode_at"]
+            if new_episodes:
+                history = (history + [checked_at])[-self.RELEASE_HISTORY :]
+                idle_polls = 0
+                last_new = checked_at
+            elif not error:
+                idle_polls += 1
+            conn.execute(
+                """
+                UPDATE watchlist
+                SET last_checked_at = ?, next_check_at = ?, idle_polls = ?, release_history = ?,
+                    last_new_episode_at = ?, last_error = ?, error_polls = ?,
+                    baseline_episode = COALESCE(?, baseline_episode)
+                WHERE id = ?
+                """,
+                (
+                    checked_at,
+                    next_check_at,
+                    idle_polls,
+                    json.dumps(history),
+                    last_new,
+                    error,
+                    error_polls,
+                    baseline_episode,
+                    watch_id,
+                ),
+            )
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict[str, Any]:
+        item = dict(row)
+        item["backfill"] = bool(item["backfill"])
+        item["finished"] = bool(item["finished"])
+        item["release_history"] = json.loads(item["release_history"] or "[]")
+        return item
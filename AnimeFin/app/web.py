@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any
+
+from flask import Flask
+
+from app.config import AppConfig, load_config
+from app.main import create_app
+
+
+def _gunicorn_application(app: Flask, options: dict[str, Any]):
+    from gunicorn.app.base import BaseApplication
+
+    class WebApplication(BaseApplication):
+        def load_config(self) -> None:
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Flask:
+            return app
+
+    return WebApplication()
+
+
+def gunicorn_options(cfg: AppConfig) -> dict[str, Any]:
+    return {
+        "bind": f"{cfg.host}:{cfg.port}",
+        "workers": cfg.web_workers,
+        "threads": cfg.web_threads,
+        "worker_class": "gthread",
+        "graceful_timeout": cfg.shutdown_grace_seconds,
+        "timeout": max(60, int(cfg.shutdown_grace_seconds) * 2),
+        "keepalive": 5,
+        "accesslog": "-",
+    }
+
+
+def run_web() -> None:
+    cfg = load_config()
+    app = create_app(cfg, workers=False)
+    try:
+        application = _gunicorn_application(app, gunicorn_options(cfg))
+    except ImportError:
+        print("gunicorn is not installed; falling back to the Flask development server")
+        app.run(host=cfg.host, port=cfg.port, debug=cfg.debug, threaded=True)
+        return
+    application.run()
+
+
+if __name__ == "__main__":
+    run_web()
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import signal
+import threading
+
+from app.config import load_config
+from app.metrics import serve_metrics
+from app.main import build_services, start_workers, stop_workers
+
+
+def run_worker() -> None:
+    cfg = load_config()
+    services = build_services(cfg)
+    stopping = threading.Event()
+
+    def request_stop(signum, frame) -> None:
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    start_workers(services)
+    metrics_server = serve_metrics(cfg.host, cfg.worker_metrics_port) if cfg.worker_metrics_port else None
+    print("AnimeFin worker started")
+    while not stopping.wait(1.0):
+        pass
+    print(f"AnimeFin worker stopping; waiting up to {cfg.shutdown_grace_seconds:.0f}s for running downloads")
+    if not stop_workers(services, cfg.shutdown_grace_seconds):
+        print("AnimeFin worker did not drain in time")
+    if metrics_server is not None:
+        metrics_server.shutdown()
+
+
+if __name__ == "__main__":
+    run_worker()
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from werkzeug.serving import make_server
+
+from app.config import AppConfig
+from app.main import create_app
+from benchmarks.media_server import ServerOptions, serve, start_in_thread
+from benchmarks.pipeline import BASE_DIR, StubHlsExecutor, StubMp4Executor, _git_commit, _QuietHandler
+
+TREND_STATS = ("avg", "min", "med", "max", "p(90)", "p(95)", "p(99)")
+
+
+@dataclass(frozen=True)
+class LoadOptions:
+    clients: int = 20
+    producers: int = 2
+    duration: float = 60
+    poll_interval: float = 1.0
+    enqueue_interval: float = 2.0
+    episodes_per_enqueue: int = 3
+    hls_ratio: float = 0.25
+    revalidate: bool = True
+    file_bytes: int = 256 * 1024
+    segments: int = 4
+    upstream_delay: float = 0.0
+    p95_threshold_ms: float = 500
+    error_threshold: float = 0.1
+    in_process_server: bool = False
+    seed: int = 1
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    seconds: float
+    failed: bool
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.samples: list[Sample] = []
+        self._lock = threading.Lock()
+
+    def add(self, endpoint: str, seconds: float, failed: bool) -> None:
+        with self._lock:
+            self.samples.append(Sample(endpoint, seconds, failed))
+
+
+class _Client(threading.Thread):
+    def __init__(self, base_url: str, recorder: _Recorder, stop: threading.Event, options: LoadOptions, seed: int):
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.recorder = recorder
+        self.stop_event = stop
+        self.options = options
+        self.random = random.Random(seed)
+        self.etags: dict[str, str] = {}
+
+    def request(self, endpoint: str, path: str, body: dict | None = None) -> Any:
+        headers = {"Accept-Encoding": "gzip"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        elif self.options.revalidate and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(body).encode() if body is not None else None,
+            headers=headers,
+            method="POST" if body is not None else "GET",
+        )
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                payload = response.read()
+                if response.headers.get("Content-Encoding") == "gzip":
+                    payload = gzip.decompress(payload)
+                if response.headers.get("ETag"):
+                    self.etags[path] = response.headers["ETag"]
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            failed = exc.code != 304
+            self.recorder.add(endpoint, time.perf_counter() - started, failed)
+            return None
+        except (urllib.error.URLError, OSError):
+            self.recorder.add(endpoint, time.perf_counter() - started, True)
+            return None
+        self.recorder.add(endpoint, time.perf_counter() - started, False)
+        return payload
+
+
+class _Dashboard(_Client):
+    def run(self) -> None:
+        self.stop_event.wait(self.random.uniform(0, self.options.poll_interval))
+        while not self.stop_event.is_set():
+            self.request("list_downloads", "/api/downloads")
+            self.request("list_media", "/api/media")
+            self.stop_event.wait(self.options.poll_interval)
+
+
+class _Producer(_Client):
+    def __init__(self, *args: Any, media_url: str, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.media_url = media_url
+        self.enqueued = 0
+
+    def run(self) -> None:
+        next_episode: dict[str, int] = {}
+        while not self.stop_event.is_set():
+            show = f"show-{self.random.randrange(50)}"
+            self.request("search", f"/api/search?q={show.replace('-', '%20')}&mode=sub")
+            first = next_episode.get(show, 1)
+            next_episode[show] = first + self.options.episodes_per_enqueue
+            hls = self.random.random() < self.options.hls_ratio
+            source = f"{self.media_url}/hls/{show}/index.m3u8" if hls else f"{self.media_url}/video/{show}.mp4"
+            body = {
+                "show_id": show,
+                "show_title": show,
+                "mode": "sub",
+                "episodes": [str(first + n) for n in range(self.options.episodes_per_enqueue)],
+                "source_url": source,
+                "source_type": "m3u8_ffmpeg" if hls else "mp4_aria2",
+            }
+            created = self.request("enqueue", "/api/downloads", body)
+            if created:
+                self.enqueued += len(json.loads(created)["job_ids"])
+            self.stop_event.wait(self.options.enqueue_interval)
+
+
+def _trend(seconds: list[float]) -> dict[str, float]:
+    if not seconds:
+        return {stat: 0.0 for stat in TREND_STATS}
+    ordered = sorted(value * 1000 for value in seconds)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "avg": round(statistics.fmean(ordered), 3),
+        "min": round(ordered[0], 3),
+        "med": round(statistics.median(ordered), 3),
+        "max": round(ordered[-1], 3),
+        "p(90)": pick(0.90),
+        "p(95)": pick(0.95),
+        "p(99)": pick(0.99),
+    }
+
+
+def summarize(samples: list[Sample], elapsed: float, options: LoadOptions) -> dict[str, Any]:
+    failed = sum(1 for s in samples if s.failed)
+    duration = _trend([s.seconds for s in samples])
+    metrics: dict[str, Any] = {
+        "http_reqs": {"count": len(samples), "rate": round(len(samples) / elapsed, 3) if elapsed else 0.0},
+        "http_req_duration": duration,
+        "http_req_failed": {
+            "passes": failed,
+            "fails": len(samples) - failed,
+            "value": round(failed / len(samples), 5) if samples else 0.0,
+        },
+        "vus_max": {"value": options.clients + options.producers},
+    }
+    for endpoint in sorted({s.endpoint for s in samples}):
+        tagged = [s for s in samples if s.endpoint == endpoint]
+        metrics[f"http_req_duration{{endpoint:{endpoint}}}"] = _trend([s.seconds for s in tagged])
+        metrics[f"http_reqs{{endpoint:{endpoint}}}"] = {
+            "count": len(tagged),
+            "rate": round(len(tagged) / elapsed, 3) if elapsed else 0.0,
+        }
+    thresholds = {
+        f"http_req_duration: p(95)<{options.p95_threshold_ms:g}": duration["p(95)"] < options.p95_threshold_ms,
+        f"http_req_failed: rate<{options.error_threshold:g}": metrics["http_req_failed"]["value"]
+        < options.error_threshold,
+    }
+    return {"metrics": metrics, "thresholds": thresholds}
+
+
+def _format_ms(value: float) -> str:
+    return f"{value * 1000:.2f}µs" if value < 1 else f"{value:.2f}ms"
+
+
+def _trend_line(trend: dict[str, float]) -> str:
+    return " ".join(f"{stat}={_format_ms(trend[stat])}" for stat in TREND_STATS)
+
+
+def render_text(summary: dict[str, Any]) -> str:
+    metrics = summary["metrics"]
+    lines = ["█ THRESHOLDS", ""]
+    for name, ok in summary["thresholds"].items():
+        lines.append(f"    {'✓' if ok else '✗'} {name}")
+    lines += ["", "█ TOTAL RESULTS", "", "    HTTP"]
+    lines.append(f"    {'http_req_duration':.<40}: {_trend_line(metrics['http_req_duration'])}")
+    for name, trend in metrics.items():
+        if name.startswith("http_req_duration{"):
+            tag = name[len("http_req_duration{") : -1]
+            lines.append(f"      {'{ ' + tag + ' }':.<38}: {_trend_line(trend)}")
+    failed = metrics["http_req_failed"]
+    total = failed["passes"] + failed["fails"]
+    lines.append(f"    {'http_req_failed':.<40}: {failed['value'] * 100:.2f}%  {failed['passes']} out of {total}")
+    lines.append(f"    {'http_reqs':.<40}: {metrics['http_reqs']['count']:<6} {metrics['http_reqs']['rate']}/s")
+    return "\n".join(lines)
+
+
+def _start_media_server(options: LoadOptions):
+    server_options = ServerOptions(
+        file_bytes=options.file_bytes,
+        segments=options.segments,
+        seed=options.seed,
+        upstream_delay=options.upstream_delay,
+    )
+    if options.in_process_server:
+        server = start_in_thread(server_options)
+        return server.base_url, server.shutdown
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    process = context.Process(target=serve, args=(server_options, "127.0.0.1", 0, ready), daemon=True)
+    process.start()
+    return ready.get(timeout=30), process.terminate
+
+
+def run_load(options: LoadOptions, workdir: Path) -> dict[str, Any]:
+    stub_url, stop_stub = _start_media_server(options)
+    cfg = AppConfig(
+        base_dir=BASE_DIR,
+        downloads_dir=workdir / "downloads",
+        database_path=workdir / "jobs.sqlite3",
+        ani_cli_path=workdir / "ani-cli",
+        allanime_api=f"{stub_url}/api",
+        allanime_referer=stub_url,
+        user_agent="animefin-load",
+        host="127.0.0.1",
+        port=0,
+        debug=False,
+        media_probe_workers=0,
+        queue_poll_seconds=0.05,
+        postprocess_enabled=False,
+        stream_resolve_lookahead=0,
+    )
+    cfg.downloads_dir.mkdir(parents=True, exist_ok=True)
+    app = create_app(cfg, workers=False)
+    downloads = app.extensions["downloads"]
+    downloads._aria2 = downloads._yt_dlp = StubMp4Executor()
+    downloads._ffmpeg = StubHlsExecutor()
+    web = make_server("127.0.0.1", 0, app, threaded=True, request_handler=_QuietHandler)
+    threading.Thread(target=web.serve_forever, daemon=True).start()
+    web_url = f"http://127.0.0.1:{web.server_port}"
+
+    recorder = _Recorder()
+    stop = threading.Event()
+    dashboards = [_Dashboard(web_url, recorder, stop, options, options.seed + n) for n in range(options.clients)]
+    producers = [
+        _Producer(web_url, recorder, stop, options, options.seed + 1000 + n, media_url=stub_url)
+        for n in range(options.producers)
+    ]
+    downloads.start()
+    started = time.perf_counter()
+    for client in dashboards + producers:
+        client.start()
+    stop.wait(options.duration)
+    stop.set()
+    for client in dashboards + producers:
+        client.join()
+    elapsed = time.perf_counter() - started
+
+    downloads.shutdown(timeout=5)
+    web.shutdown()
+    stop_stub()
+    app.extensions["media"].shutdown()
+
+    summary = summarize(recorder.samples, elapsed, options)
+    return {
+        **summary,
+        "meta": {
+            "benchmark": "animefin-api-load",
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+            },
+            "options": asdict(options),
+            "elapsed_seconds": round(elapsed, 3),
+            "jobs_enqueued": sum(p.enqueued for p in producers),
+            "job_status_counts": app.extensions["jobs_store"].count_by_status(),
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    defaults = LoadOptions()
+    parser = argparse.ArgumentParser(description="Load test the AnimeFin API with stubbed downloads and upstream")
+    parser.add_argument("--clients", type=int, default=defaults.clients)
+    parser.add_argument("--producers", type=int, default=defaults.producers)
+    parser.add_argument("--duration", type=float, default=defaults.duration)
+    parser.add_argument("--poll-interval", type=float, default=defaults.poll_interval)
+    parser.add_argument("--enqueue-interval", type=float, default=defaults.enqueue_interval)
+    parser.add_argument("--episodes-per-enqueue", type=int, default=defaults.episodes_per_enqueue)
+    parser.add_argument("--hls-ratio", type=float, default=defaults.hls_ratio)
+    parser.add_argument("--no-revalidate", dest="revalidate", action="store_false")
+    parser.add_argument("--file-bytes", type=int, default=defaults.file_bytes)
+    parser.add_argument("--segments", type=int, default=defaults.segments)
+    parser.add_argument("--upstream-delay", type=float, default=defaults.upstream_delay)
+    parser.add_argument("--p95-threshold-ms", type=float, default=defaults.p95_threshold_ms)
+    parser.add_argument("--error-threshold", type=float, default=defaults.error_threshold)
+    parser.add_argument("--in-process-server", action="store_true")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+    options = LoadOptions(**{k: v for k, v in vars(args).items() if k in LoadOptions.__dataclass_fields__})
+
+    with tempfile.TemporaryDirectory(prefix="animefin-load-") as workdir:
+        report = run_load(options, Path(workdir))
+
+    out = args.out or BASE_DIR / "benchmarks" / "results" / f"load-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+    print(render_text(report))
+    print(f"\nWrote {out}")
+    if not all(report["thresholds"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
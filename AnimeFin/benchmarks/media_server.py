@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHUNK = 64 * 1024
+MP4_HEADER = b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomiso2"
+
+
+@dataclass(frozen=True)
+class ServerOptions:
+    file_bytes: int = 4 * 1024 * 1024
+    segments: int = 8
+    bytes_per_second: float = 0
+    failure_rate: float = 0.0
+    seed: int = 1
+    catalog_shows: int = 50
+    catalog_episodes: int = 24
+    upstream_delay: float = 0.0
+
+
+def _payload(size: int) -> bytes:
+    body = MP4_HEADER + bytes(range(256)) * (size // 256 + 1)
+    return body[:size]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "MediaServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        if self.server.should_fail():
+            self._send(503, b"synthetic failure\n", "text/plain")
+            return
+        if re.fullmatch(r"/video/[\w-]+\.mp4", self.path):
+            self._send(200, self.server.video, "video/mp4")
+        elif match := re.fullmatch(r"/hls/([\w-]+)/index\.m3u8", self.path):
+            self._send(200, self.server.playlist(match.group(1)).encode(), "application/vnd.apple.mpegurl")
+        elif re.fullmatch(r"/hls/[\w-]+/seg\d+\.ts", self.path):
+            self._send(200, self.server.segment, "video/mp2t")
+        else:
+            self._send(404, b"not found\n", "text/plain")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, b"bad request\n", "text/plain")
+            return
+        if self.path != "/api":
+            self._send(404, b"not found\n", "text/plain")
+            return
+        if self.server.options.upstream_delay > 0:
+            time.sleep(self.server.options.upstream_delay)
+        self._send(200, json.dumps(self.server.graphql(payload)).encode(), "application/json")
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        rate = self.server.options.bytes_per_second
+        started = time.monotonic()
+        sent = 0
+        for offset in range(0, len(body), CHUNK):
+            chunk = body[offset : offset + CHUNK]
+            self.wfile.write(chunk)
+            sent += len(chunk)
+            if rate > 0:
+                wait = sent / rate - (time.monotonic() - started)
+                if wait > 0:
+                    time.sleep(wait)
+
+
+class MediaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, options: ServerOptions) -> None:
+        super().__init__((host, port), _Handler)
+        self.options = options
+        self.video = _payload(options.file_bytes)
+        self.segment = _payload(max(1, options.file_bytes // max(1, options.segments)))
+        self._random = random.Random(options.seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def should_fail(self) -> bool:
+        if self.options.failure_rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < self.options.failure_rate
+
+    def graphql(self, payload: dict) -> dict:
+        variables = payload.get("variables") or {}
+        episodes = [str(n) for n in range(1, self.options.catalog_episodes + 1)]
+        if "search" in variables:
+            query = str((variables["search"] or {}).get("query") or "").lower()
+            mode = variables.get("translationType") or "sub"
+            edges = [
+                {"_id": f"show-{n}", "name": f"Show {n}", "availableEpisodes": {mode: len(episodes)}}
+                for n in range(self.options.catalog_shows)
+                if query in f"show {n}"
+            ]
+            return {"data": {"shows": {"edges": edges[:40]}}}
+        if "showId" in variables and "episodeString" not in variables:
+            detail = {"sub": episodes, "dub": episodes}
+            return {"data": {"show": {"_id": variables["showId"], "availableEpisodesDetail": detail}}}
+        return {"data": {"episode": {"episodeString": variables.get("episodeString"), "sourceUrls": []}}}
+
+    def playlist(self, name: str) -> str:
+        lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:4", "#EXT-X-MEDIA-SEQUENCE:0"]
+        for index in range(self.options.segments):
+            lines += ["#EXTINF:4.0,", f"seg{index}.ts"]
+        lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+
+def start_in_thread(options: ServerOptions, host: str = "127.0.0.1", port: int = 0) -> MediaServer:
+    server = MediaServer(host, port, options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve(options: ServerOptions, host: str, port: int, ready=None) -> None:
+    server = MediaServer(host, port, options)
+    if ready is not None:
+        ready.put(server.base_url)
+    server.serve_forever()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic MP4/HLS server for download benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--file-bytes", type=int, default=ServerOptions.file_bytes)
+    parser.add_argument("--segments", type=int, default=ServerOptions.segments)
+    parser.add_argument("--bytes-per-second", type=float, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    options = ServerOptions(args.file_bytes, args.segments, args.bytes_per_second, args.failure_rate)
+    print(f"Serving synthetic media on http://{args.host}:{args.port}")
+    serve(options, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
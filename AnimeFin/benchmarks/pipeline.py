@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app.config import AppConfig
+from app.main import create_app
+from app.services.downloads import DownloadRequest
+from app.services.executors import BaseExecutor
+from benchmarks.media_server import ServerOptions, serve, start_in_thread
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+READ_CHUNK = 256 * 1024
+
+
+@dataclass(frozen=True)
+class BenchmarkOptions:
+    jobs: int = 200
+    episodes_per_request: int = 12
+    hls_ratio: float = 0.25
+    pollers: int = 8
+    poll_interval: float = 0.05
+    timeout: float = 600
+    file_bytes: int = 2 * 1024 * 1024
+    segments: int = 8
+    bytes_per_second: float = 0
+    failure_rate: float = 0.0
+    in_process_server: bool = False
+    seed: int = 1
+
+
+class StubMp4Executor(BaseExecutor):
+    name = "stub-mp4"
+
+    def build_command(self, url: str, output_path: Path, referer: str = "", rate_limit: int = 0) -> list[str]:
+        return [self.name, url, str(output_path)]
+
+    def run(
+        self,
+        command: list[str],
+        line_handler: Callable[[str], None],
+        env: dict[str, str] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> int:
+        _, url, output = command
+        part = Path(output + ".part")
+        try:
+            with part.open("wb") as handle:
+                self._fetch(url, handle, line_handler, should_stop)
+        except (urllib.error.URLError, OSError) as exc:
+            line_handler(f"ERROR: {exc}")
+            return 1
+        part.replace(output)
+        return 0
+
+    def _fetch(self, url, handle, line_handler, should_stop) -> None:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            total = int(response.headers.get("Content-Length") or 0)
+            done = 0
+            next_report = 0.0
+            while chunk := response.read(READ_CHUNK):
+                if should_stop and should_stop():
+                    raise OSError("stopped")
+                handle.write(chunk)
+                done += len(chunk)
+                pct = 100.0 * done / total if total else 0.0
+                if pct >= next_report:
+                    line_handler(f"[download] {pct:5.1f}% of {total} bytes")
+                    next_report = pct + 10
+
+
+class StubHlsExecutor(StubMp4Executor):
+    name = "stub-hls"
+
+    def _fetch(self, url, handle, line_handler, should_stop) -> None:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            playlist = response.read().decode("utf-8")
+        segments = [line for line in playlist.splitlines() if line and not line.startswith("#")]
+        base = url.rsplit("/", 1)[0]
+        for index, name in enumerate(segments):
+            super()._fetch(f"{base}/{name}", handle, lambda line: None, should_stop)
+            line_handler(f"[hls] segment {index + 1}/{len(segments)} {100.0 * (index + 1) / len(segments):.1f}%")
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if not samples:
+        return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _io_write_bytes() -> int | None:
+    try:
+        for line in Path("/proc/self/io").read_text().splitlines():
+            if line.startswith("write_bytes:"):
+                return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _db_bytes(database: Path) -> int:
+    return sum(p.stat().st_size for p in database.parent.glob(database.name + "*") if p.is_file())
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _start_media_server(options: BenchmarkOptions):
+    server_options = ServerOptions(
+        file_bytes=options.file_bytes,
+        segments=options.segments,
+        bytes_per_second=options.bytes_per_second,
+        failure_rate=options.failure_rate,
+        seed=options.seed,
+    )
+    if options.in_process_server:
+        server = start_in_thread(server_options)
+        return server.base_url, server.shutdown
+    context = multiprocessing.get_context("spawn")
+    ready = context.Queue()
+    process = context.Process(target=serve, args=(server_options, "127.0.0.1", 0, ready), daemon=True)
+    process.start()
+    return ready.get(timeout=30), process.terminate
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args: Any) -> None:
+        pass
+
+
+class _Poller(threading.Thread):
+    def __init__(self, base_url: str, job_ids: list[str], interval: float, stop: threading.Event, seed: int) -> None:
+        super().__init__(daemon=True)
+        self.base_url = base_url
+        self.job_ids = job_ids
+        self.interval = interval
+        self.stop_event = stop
+        self.random = random.Random(seed)
+        self.latencies: dict[str, list[float]] = {"list_downloads": [], "job_events_tail": []}
+        self.errors = 0
+
+    def run(self) -> None:
+        while not self.stop_event.is_set():
+            self._get("list_downloads", "/api/downloads")
+            job_id = self.random.choice(self.job_ids)
+            self._get("job_events_tail", f"/api/downloads/{job_id}/events?tail=50")
+            self.stop_event.wait(self.interval)
+
+    def _get(self, name: str, path: str) -> None:
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(self.base_url + path, timeout=30) as response:
+                response.read()
+        except (urllib.error.URLError, OSError):
+            self.errors += 1
+            return
+        self.latencies[name].append(time.perf_counter() - started)
+
+
+def run_benchmark(options: BenchmarkOptions, workdir: Path) -> dict[str, Any]:
+    cfg = AppConfig(
+        base_dir=BASE_DIR,
+        downloads_dir=workdir / "downloads",
+        database_path=workdir / "jobs.sqlite3",
+        ani_cli_path=workdir / "ani-cli",
+        allanime_api="http://127.0.0.1:9/api",
+        allanime_referer="http://127.0.0.1:9",
+        user_agent="animefin-benchmark",
+        host="127.0.0.1",
+        port=0,
+        debug=False,
+        media_probe_workers=0,
+        queue_poll_seconds=0.05,
+    )
+    cfg.downloads_dir.mkdir(parents=True, exist_ok=True)
+    media_url, stop_media = _start_media_server(options)
+    app = create_app(cfg, workers=False)
+    downloads = app.extensions["downloads"]
+    jobs_store = app.extensions["jobs_store"]
+    downloads._aria2 = downloads._yt_dlp = StubMp4Executor()
+    downloads._ffmpeg = StubHlsExecutor()
+    web = make_server("127.0.0.1", 0, app, threaded=True, request_handler=_QuietHandler)
+    threading.Thread(target=web.serve_forever, daemon=True).start()
+    web_url = f"http://127.0.0.1:{web.server_port}"
+
+    rng = random.Random(options.seed)
+    requests = []
+    for index in range(0, options.jobs, options.episodes_per_request):
+        count = min(options.episodes_per_request, options.jobs - index)
+        hls = rng.random() < options.hls_ratio
+        name = f"show-{index // options.episodes_per_request}"
+        requests.append(
+            DownloadRequest(
+                show_id=name,
+                show_title=name,
+                episodes=[str(n + 1) for n in range(count)],
+                mode="sub",
+                quality="best",
+                source_url=f"{media_url}/hls/{name}/index.m3u8" if hls else f"{media_url}/video/{name}.mp4",
+                source_type="m3u8_ffmpeg" if hls else "mp4_aria2",
+            )
+        )
+
+    db_before, io_before = _db_bytes(cfg.database_path), _io_write_bytes()
+    enqueue_started = time.perf_counter()
+    job_ids = [job_id for req in requests for job_id in downloads.enqueue(req)]
+    enqueue_seconds = time.perf_counter() - enqueue_started
+
+    stop_pollers = threading.Event()
+    pollers = [
+        _Poller(web_url, job_ids, options.poll_interval, stop_pollers, options.seed + n) for n in range(options.pollers)
+    ]
+    cpu_before = _cpu_seconds()
+    started = time.perf_counter()
+    for poller in pollers:
+        poller.start()
+    downloads.start()
+    timed_out = False
+    while True:
+        counts = jobs_store.count_by_status()
+        if not counts.get("queued") and not counts.get("running"):
+            break
+        if time.perf_counter() - started > options.timeout:
+            timed_out = True
+            break
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - started
+    cpu_used = _cpu_seconds() - cpu_before
+
+    stop_pollers.set()
+    for poller in pollers:
+        poller.join()
+    downloads.shutdown(timeout=5)
+    web.shutdown()
+    stop_media()
+    app.extensions["media"].shutdown()
+
+    io_after = _io_write_bytes()
+    with sqlite3.connect(cfg.database_path) as conn:
+        events = conn.execute("SELECT COUNT(*) FROM download_events").fetchone()[0]
+    counts = jobs_store.count_by_status()
+    finished = counts.get("done", 0) + counts.get("failed", 0)
+    latencies: dict[str, list[float]] = {}
+    for poller in pollers:
+        for name, samples in poller.latencies.items():
+            latencies.setdefault(name, []).extend(samples)
+
+    return {
+        "benchmark": "animefin-download-pipeline",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "options": asdict(options),
+        "results": {
+            "timed_out": timed_out,
+            "status_counts": counts,
+            "enqueue": {
+                "jobs": len(job_ids),
+                "seconds": round(enqueue_seconds, 4),
+                "jobs_per_second": round(len(job_ids) / enqueue_seconds, 1) if enqueue_seconds else 0.0,
+            },
+            "end_to_end": {
+                "seconds": round(elapsed, 3),
+                "jobs_finished": finished,
+                "jobs_per_minute": round(finished / elapsed * 60, 1) if elapsed else 0.0,
+            },
+            "cpu": {
+                "seconds": round(cpu_used, 3),
+                "seconds_per_job": round(cpu_used / finished, 5) if finished else 0.0,
+                "note": "process CPU, including the in-process web server and pollers",
+            },
+            "sqlite": {
+                "db_growth_bytes": _db_bytes(cfg.database_path) - db_before,
+                "db_growth_bytes_per_job": round((_db_bytes(cfg.database_path) - db_before) / len(job_ids), 1)
+                if job_ids
+                else 0.0,
+                "download_events": events,
+                "events_per_job": round(events / len(job_ids), 2) if job_ids else 0.0,
+            },
+            "io": {
+                "process_write_bytes": io_after - io_before if io_before is not None and io_after is not None else None,
+                "note": "all writes by this process: SQLite pages, WAL/journal and downloaded media",
+            },
+            "api_latency": {
+                "pollers": options.pollers,
+                "errors": sum(p.errors for p in pollers),
+                **{name: _percentiles(samples) for name, samples in latencies.items()},
+            },
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    defaults = BenchmarkOptions()
+    parser = argparse.ArgumentParser(description="End-to-end DownloadService benchmark with stub executors")
+    parser.add_argument("--jobs", type=int, default=defaults.jobs)
+    parser.add_argument("--episodes-per-request", type=int, default=defaults.episodes_per_request)
+    parser.add_argument("--hls-ratio", type=float, default=defaults.hls_ratio)
+    parser.add_argument("--pollers", type=int, default=defaults.pollers)
+    parser.add_argument("--poll-interval", type=float, default=defaults.poll_interval)
+    parser.add_argument("--timeout", type=float, default=defaults.timeout)
+    parser.add_argument("--file-bytes", type=int, default=defaults.file_bytes)
+    parser.add_argument("--segments", type=int, default=defaults.segments)
+    parser.add_argument("--bytes-per-second", type=float, default=defaults.bytes_per_second)
+    parser.add_argument("--failure-rate", type=float, default=defaults.failure_rate)
+    parser.add_argument("--in-process-server", action="store_true")
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args(argv)
+    options = BenchmarkOptions(
+        **{k: v for k, v in vars(args).items() if k in BenchmarkOptions.__dataclass_fields__}
+    )
+
+    with tempfile.TemporaryDirectory(prefix="animefin-bench-") as workdir:
+        report = run_benchmark(options, Path(workdir))
+
+    out = args.out or BASE_DIR / "benchmarks" / "results" / f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+    json.dump(report["results"], sys.stdout, indent=2)
+    print(f"\nWrote {out}")
+
+
+if __name__ == "__main__":
+    main()
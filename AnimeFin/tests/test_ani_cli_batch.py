@@ -0,0 +1,111 @@
+import sys
+from pathlib import Path
+
+from app.services.downloads import DownloadService
+from app.storage.jobs import JobsStore, NewJob
+
+FAKE_ANI_CLI = """#!{python}
+import os, sys
+from pathlib import Path
+
+args = sys.argv[1:]
+episodes = args[args.index("-e") + 1]
+first, _, last = episodes.partition("-")
+with open(os.environ["FAKE_ANI_CLI_LOG"], "a") as log:
+    log.write(" ".join(args) + "\\n")
+target = Path(os.environ["ANI_CLI_DOWNLOAD_DIR"])
+for episode in range(int(first), int(last or first) + 1):
+    print(f"\\033[1;34mPlaying episode {{episode}}...\\033[0m", flush=True)
+    if str(episode) == os.environ.get("FAKE_ANI_CLI_FAIL_AT"):
+        print("Episode not released!", flush=True)
+        sys.exit(1)
+    print("50.0%", flush=True)
+    if str(episode) == os.environ.get("FAKE_ANI_CLI_CRASH_AT"):
+        (target / f"{{args[-1]}} Episode {{episode}}.mp4").write_bytes(b"\\0" * 7)
+        sys.exit(1)
+    (target / f"{{args[-1]}} Episode {{episode}}.mp4").write_bytes(b"\\0" * 64 * episode)
+"""
+
+
+def _fake_ani_cli(tmp_path: Path, monkeypatch) -> Path:
+    script = tmp_path / "ani-cli"
+    script.write_text(FAKE_ANI_CLI.format(python=sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setenv("FAKE_ANI_CLI_LOG", str(tmp_path / "calls.log"))
+    return script
+
+
+def _job(tmp_path: Path, episode: str, **kwargs) -> NewJob:
+    values = {"show_id": "show-1", "show_title": "Show", "mode": "sub", "quality": "best", **kwargs}
+    return NewJob(
+        values["show_id"],
+        values["show_title"],
+        episode,
+        values["mode"],
+        values["quality"],
+        str(tmp_path / f"episode-{episode}.mp4"),
+        source_url=values.get("source_url", ""),
+    )
+
+
+def test_claim_batch_takes_consecutive_matching_episodes(tmp_path: Path) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    ids = store.create_jobs([_job(tmp_path, str(n)) for n in (3, 4, 5, 6, 8)])
+    dub = store.create_jobs([_job(tmp_path, "7", mode="dub")])
+    direct = store.create_jobs([_job(tmp_path, "2", source_url="https://x.test/2.mp4")])
+
+    anchor = store.claim_next_queued()
+    assert store.claim_batch(anchor, 3) == ids[:3]
+    assert store.get_status(ids[3]) == "queued"
+    assert store.claim_batch(store.claim_next_queued(), 12) == [ids[3]]
+    assert {store.get_status(j) for j in dub + direct + ids[4:]} == {"queued"}
+
+
+def test_one_invocation_downloads_the_whole_range(tmp_path: Path, monkeypatch) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    service = DownloadService(store, tmp_path / "downloads", _fake_ani_cli(tmp_path, monkeypatch), max_batch=12)
+    completed = []
+    service.add_completion_listener(lambda job: completed.append(job["episode"]))
+    ids = store.create_jobs([_job(tmp_path, str(n)) for n in (1, 2, 3)])
+
+    service._process_batch(store.claim_batch(store.claim_next_queued(), 12))
+
+    assert (tmp_path / "calls.log").read_text().split() == ["-d", "-S", "1", "-e", "1-3", "Show"]
+    assert completed == ["1", "2", "3"]
+    jobs = [store.get_job(job_id) for job_id in ids]
+    assert [job["status"] for job in jobs] == ["done"] * 3
+    assert [job["bytes_downloaded"] for job in jobs] == [64, 128, 192]
+    assert any(e["message"] == "50.0%" for e in store.list_events(ids[1]))
+    assert not any("Playing" in e["message"] for e in store.list_events(ids[0]))
+
+
+def test_failure_splits_unfinished_episodes_into_single_retries(tmp_path: Path, monkeypatch) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    service = DownloadService(store, tmp_path / "downloads", _fake_ani_cli(tmp_path, monkeypatch), max_batch=12)
+    ids = store.create_jobs([_job(tmp_path, str(n)) for n in (1, 2, 3)])
+    monkeypatch.setenv("FAKE_ANI_CLI_FAIL_AT", "2")
+
+    service._process_batch(store.claim_batch(store.claim_next_queued(), 12))
+
+    assert [store.get_status(job_id) for job_id in ids] == ["done", "queued", "queued"]
+    assert "retrying it on its own" in store.tail_events(ids[1], 1)[0]["message"]
+    retry = store.claim_next_queued()
+    assert retry == ids[1] and store.claim_batch(retry, 12) == [retry]
+
+    monkeypatch.delenv("FAKE_ANI_CLI_FAIL_AT")
+    service._process_job(retry)
+    assert store.get_status(retry) == "done"
+    assert (tmp_path / "calls.log").read_text().splitlines()[-1].endswith("-e 2 Show")
+
+
+def test_episode_in_progress_when_ani_cli_dies_is_not_marked_done(tmp_path: Path, monkeypatch) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    service = DownloadService(store, tmp_path / "downloads", _fake_ani_cli(tmp_path, monkeypatch), max_batch=12)
+    ids = store.create_jobs([_job(tmp_path, str(n)) for n in (1, 2, 3)])
+    monkeypatch.setenv("FAKE_ANI_CLI_CRASH_AT", "1")
+
+    service._process_batch(store.claim_batch(store.claim_next_queued(), 12))
+
+    assert (tmp_path / "downloads" / "Show" / "Show Episode 1.mp4").stat().st_size == 7
+    assert [store.get_status(job_id) for job_id in ids] == ["queued"] * 3
+    assert "exit code 1" in store.tail_events(ids[0], 1)[0]["message"]
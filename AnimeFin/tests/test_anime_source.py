@@ -1,6 +1,11 @@
+import http.client
 import json
+import urllib.error
+
+import pytest
 
 from app.services.anime_source import AnimeSourceService
+from app.services.resilience import CircuitBreaker, UpstreamDegradedError
 
 
 class _FakeResponse:
@@ -60,3 +65,64 @@ def test_list_episodes_returns_sorted_unique_values(monkeypatch):
     service = AnimeSourceService("https://example.test/api", "https://example.test", "agent")
     episodes = service.list_episodes("show-1", mode="sub")
     assert episodes == ["1", "1.5", "2", "3"]
+
+
+def test_upstream_failure_raises_degraded_and_opens_breaker(monkeypatch):
+    calls = []
+
+    def failing_urlopen(*args, **kwargs):  # noqa: ARG001
+        calls.append(1)
+        raise urllib.error.URLError("connection refused")
+
+    monkeypatch.setattr("urllib.request.urlopen", failing_urlopen)
+
+    breaker = CircuitBreaker(window_size=4, min_calls=2, failure_rate_threshold=0.5, reset_timeout=60)
+    service = AnimeSourceService("https://example.test/api", "https://example.test", "agent", breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(UpstreamDegradedError):
+            service.search_shows("frieren", mode="sub")
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(UpstreamDegradedError) as excinfo:
+        service.list_episodes("show-1", mode="sub")
+    assert len(calls) == 2
+    assert excinfo.value.retry_after > 0
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        http.client.RemoteDisconnected("closed"),
+        http.client.IncompleteRead(b"{"),
+        UnicodeDecodeError("utf-8", b"\xff", 0, 1, "bad"),
+    ],
+)
+def test_dropped_connections_count_as_failures(monkeypatch, error):
+    def broken_urlopen(*args, **kwargs):  # noqa: ARG001
+        raise error
+
+    monkeypatch.setattr("urllib.request.urlopen", broken_urlopen)
+    breaker = CircuitBreaker(window_size=4, min_calls=2, failure_rate_threshold=0.5, reset_timeout=60)
+    service = AnimeSourceService("https://example.test/api", "https://example.test", "agent", breaker=breaker)
+    for _ in range(2):
+        with pytest.raises(UpstreamDegradedError):
+            service.list_episodes("show-1", mode="sub")
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_unexpected_error_releases_the_half_open_probe(monkeypatch):
+    clock = [0.0]
+    breaker = CircuitBreaker(min_calls=1, reset_timeout=10, clock=lambda: clock[0])
+    breaker.record_failure()
+    clock[0] = 10
+    service = AnimeSourceService("https://example.test/api", "https://example.test", "agent", breaker=breaker)
+
+    def buggy(payload, timeout=20):  # noqa: ARG001
+        raise KeyError("boom")
+
+    monkeypatch.setattr(service, "_post_graphql", buggy)
+    with pytest.raises(KeyError):
+        service.list_episodes("show-1", mode="sub")
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,24 @@
+from benchmarks.pipeline import BenchmarkOptions, run_benchmark
+
+
+def test_benchmark_harness_smoke(tmp_path):
+    options = BenchmarkOptions(
+        jobs=6,
+        episodes_per_request=3,
+        hls_ratio=0.5,
+        pollers=1,
+        file_bytes=64 * 1024,
+        segments=4,
+        in_process_server=True,
+        timeout=60,
+    )
+
+    report = run_benchmark(options, tmp_path)
+
+    results = report["results"]
+    assert results["timed_out"] is False
+    assert results["status_counts"] == {"done": 6}
+    assert results["end_to_end"]["jobs_finished"] == 6
+    assert results["sqlite"]["download_events"] >= 6 * 4
+    assert results["api_latency"]["list_downloads"]["count"] >= 1
+    assert len(list((tmp_path / "downloads").rglob("episode-*.mp4"))) == 6
@@ -0,0 +1,79 @@
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.services.db_backup import DatabaseBackup
+from app.storage.jobs import JobsStore, NewJob
+
+
+def _jobs(tmp_path: Path, start: int, count: int) -> list[NewJob]:
+    return [
+        NewJob("show-1", "Show " + "x" * 200, str(n), "sub", "best", str(tmp_path / f"ep{n}.mp4"))
+        for n in range(start, start + count)
+    ]
+
+
+def _count_jobs(path: Path) -> int:
+    with closing(sqlite3.connect(path)) as conn:
+        return conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+
+def test_backup_completes_while_the_queue_is_written(tmp_path: Path) -> None:
+    db_path = tmp_path / "jobs.sqlite3"
+    store = JobsStore(db_path)
+    store.create_jobs(_jobs(tmp_path, 0, 2000))
+    backup = DatabaseBackup(db_path, tmp_path / "backups", pages_per_step=16, step_sleep=0.001, max_restarts=3)
+    stop = threading.Event()
+    written = []
+
+    def writer() -> None:
+        writer_store = JobsStore(db_path)
+        n = 10_000
+        while not stop.is_set():
+            (job_id,) = writer_store.create_jobs(_jobs(tmp_path, n, 1))
+            writer_store.append_event(job_id, "info", "progress")
+            written.append(job_id)
+            n += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        result = backup.run_once()
+    finally:
+        stop.set()
+        thread.join()
+
+    assert written and result["pages"] > 16
+    snapshot = Path(result["path"])
+    assert 2000 <= _count_jobs(snapshot) <= 2000 + len(written)
+    with closing(sqlite3.connect(snapshot)) as conn:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert not list((tmp_path / "backups").glob("*.partial"))
+
+
+def test_backups_are_rotated(tmp_path: Path) -> None:
+    db_path = tmp_path / "jobs.sqlite3"
+    JobsStore(db_path)
+    backup = DatabaseBackup(db_path, tmp_path / "backups", keep=2)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    paths = [backup.run_once(now=start + timedelta(days=day))["path"] for day in range(4)]
+
+    assert [str(p) for p in backup.list_backups()] == paths[-2:]
+
+
+def test_restore_replaces_live_database_and_keeps_a_safety_copy(tmp_path: Path) -> None:
+    db_path = tmp_path / "jobs.sqlite3"
+    store = JobsStore(db_path)
+    store.create_jobs(_jobs(tmp_path, 0, 3))
+    backup = DatabaseBackup(db_path, tmp_path / "backups")
+    snapshot = Path(backup.run_once()["path"])
+    store.create_jobs(_jobs(tmp_path, 3, 5))
+
+    result = backup.restore(snapshot)
+
+    assert _count_jobs(db_path) == 3
+    assert _count_jobs(Path(result["safety_copy"])) == 8
+    assert len(JobsStore(db_path).list_jobs()) == 3
@@ -0,0 +1,102 @@
+import os
+
+from app.services import dedup
+from app.services.dedup import DedupService
+from app.storage.hash_index import HashIndex
+from app.storage.media import MediaStore
+
+
+def _write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_dedup_reports_then_hardlinks_true_duplicates(tmp_path):
+    root = tmp_path / "downloads"
+    payload = b"episode-bytes" * 200
+    first = _write(root / "Frieren" / "episode-1.mp4", payload)
+    second = _write(root / "Frieren Beyond" / "episode-1.mp4", payload)
+    same_size = _write(root / "Other" / "episode-1.mp4", payload[:-1] + b"!")
+    service = DedupService(MediaStore(root), HashIndex(tmp_path / "jobs.sqlite3"), partial_bytes=64)
+
+    report = service.run(dry_run=True)
+    assert report["reclaimable_bytes"] == len(payload)
+    assert report["files_linked"] == 0
+    assert len(report["duplicate_groups"]) == 1
+    assert first.stat().st_ino != second.stat().st_ino
+
+    report = service.run(dry_run=False)
+    assert report["files_linked"] == 1
+    assert first.stat().st_ino == second.stat().st_ino
+    assert second.read_bytes() == payload
+    assert same_size.stat().st_ino != first.stat().st_ino
+
+
+def test_dedup_reuses_persisted_hashes(tmp_path, monkeypatch):
+    root = tmp_path / "downloads"
+    _write(root / "A" / "episode-1.mp4", b"x" * 500)
+    _write(root / "B" / "episode-1.mp4", b"x" * 500)
+    service = DedupService(MediaStore(root), HashIndex(tmp_path / "jobs.sqlite3"), partial_bytes=64)
+    service.run(dry_run=True)
+
+    calls = []
+    real_blake2 = dedup._blake2
+
+    def counting(path, limit=None):
+        calls.append(path)
+        return real_blake2(path, limit)
+
+    monkeypatch.setattr(dedup, "_blake2", counting)
+    report = DedupService(MediaStore(root), HashIndex(tmp_path / "jobs.sqlite3"), partial_bytes=64).run()
+    assert calls == []
+    assert report["reclaimable_bytes"] == 500
+
+
+def test_dedup_skips_a_file_rewritten_after_hashing(tmp_path, monkeypatch):
+    root = tmp_path / "downloads"
+    payload = b"episode-bytes" * 200
+    first = _write(root / "A" / "episode-1.mp4", payload)
+    second = _write(root / "B" / "episode-1.mp4", payload)
+    os.utime(first, ns=(1, 1))
+    service = DedupService(MediaStore(root), HashIndex(tmp_path / "jobs.sqlite3"), partial_bytes=64)
+    real_blake2 = dedup._blake2
+
+    def hash_then_rewrite(path, limit=None):
+        digest = real_blake2(path, limit)
+        if path == second and limit is None:
+            second.write_bytes(b"normalized!!!" * 200)
+        return digest
+
+    monkeypatch.setattr(dedup, "_blake2", hash_then_rewrite)
+    report = service.run(dry_run=False)
+
+    assert (report["files_linked"], report["files_skipped_changed"]) == (0, 1)
+    assert second.read_bytes() == b"normalized!!!" * 200
+    assert first.stat().st_ino != second.stat().st_ino
+
+
+def test_dedup_clears_a_stale_temp_and_skips_files_it_cannot_link(tmp_path, monkeypatch):
+    root = tmp_path / "downloads"
+    payload = b"episode-bytes" * 200
+    first = _write(root / "A" / "episode-1.mp4", payload)
+    second = _write(root / "B" / "episode-1.mp4", payload)
+    third = _write(root / "C" / "episode-1.mp4", payload)
+    for n, path in enumerate((first, second, third), start=1):
+        os.utime(path, ns=(n, n))
+    stale = _write(root / "B" / ".episode-1.mp4.dedup-tmp", b"left by a crash")
+    service = DedupService(MediaStore(root), HashIndex(tmp_path / "jobs.sqlite3"), partial_bytes=64)
+    real_replace = os.replace
+
+    def refuse_c(src, dst):
+        if str(dst) == str(third):
+            raise PermissionError(1, "Operation not permitted")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(dedup.os, "replace", refuse_c)
+    report = service.run(dry_run=False)
+
+    assert (report["files_linked"], report["files_skipped_error"]) == (1, 1)
+    assert first.stat().st_ino == second.stat().st_ino != third.stat().st_ino
+    assert not stale.exists()
+    assert not list(root.rglob("*.dedup-tmp"))
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.reclaimer import IoThrottle, TrashReclaimer
+from app.storage.deletions import DeletionStore
+from app.storage.media import MediaStore
+from app.storage.media_index import MediaIndex
+
+
+def _build(tmp_path, grace=3600):
+    db_path = tmp_path / "jobs.sqlite3"
+    deletions = DeletionStore(db_path)
+    store = MediaStore(
+        tmp_path / "downloads", MediaIndex(db_path), deletions=deletions, trash_grace_seconds=grace
+    )
+    season = tmp_path / "downloads" / "Show" / "Season 1"
+    season.mkdir(parents=True)
+    (season / "episode-1.mp4").write_bytes(b"a" * 10)
+    (season / "episode-2.mp4").write_bytes(b"b" * 20)
+    store.reconcile()
+    return store, deletions
+
+
+def test_delete_moves_to_trash_and_restore_puts_it_back(tmp_path):
+    store, deletions = _build(tmp_path)
+    result = store.delete_media("Show/Season 1")
+    assert result["type"] == "directory"
+    assert not (tmp_path / "downloads" / "Show").exists()
+    assert store.list_media() == []
+    store.reconcile()
+    assert store.list_media() == []
+    assert deletions.get(result["deletion_id"])["status"] == "trashed"
+
+    restored = store.restore_deletion(result["deletion_id"])
+    assert restored["status"] == "restored"
+    assert (tmp_path / "downloads" / "Show" / "Season 1" / "episode-2.mp4").read_bytes() == b"b" * 20
+    assert [i["media_id"] for i in store.list_media()] == [
+        "Show/Season 1/episode-1.mp4",
+        "Show/Season 1/episode-2.mp4",
+    ]
+
+
+def test_reclaimer_purges_after_grace_period_and_reports_progress(tmp_path):
+    store, deletions = _build(tmp_path, grace=60)
+    deletion_id = store.delete_media("Show/Season 1")["deletion_id"]
+    reclaimer = TrashReclaimer(deletions, bytes_per_second=0, files_per_second=0)
+
+    assert reclaimer.run_once() == []
+    later = datetime.now(timezone.utc) + timedelta(seconds=120)
+    assert reclaimer.run_once(later) == [deletion_id]
+
+    record = deletions.get(deletion_id)
+    assert record["status"] == "reclaimed"
+    assert (record["files_removed"], record["bytes_reclaimed"]) == (2, 30)
+    assert list(store.trash_root.iterdir()) == []
+
+
+def test_delete_interrupted_after_the_move_is_still_reclaimed(tmp_path, monkeypatch):
+    store, deletions = _build(tmp_path, grace=60)
+    real_claim = deletions.claim
+
+    def crash_after_move(deletion_id, from_status, to_status):
+        if from_status == "pending":
+            raise RuntimeError("worker died")
+        return real_claim(deletion_id, from_status, to_status)
+
+    monkeypatch.setattr(deletions, "claim", crash_after_move)
+    with pytest.raises(RuntimeError):
+        store.delete_media("Show/Season 1/episode-1.mp4")
+    monkeypatch.setattr(deletions, "claim", real_claim)
+    (record,) = deletions.list_deletions()
+    assert record["status"] == "pending"
+    assert not (tmp_path / "downloads" / "Show" / "Season 1" / "episode-1.mp4").exists()
+
+    reclaimer = TrashReclaimer(deletions, bytes_per_second=0, files_per_second=0)
+    later = datetime.now(timezone.utc) + timedelta(seconds=120)
+    assert reclaimer.recover_pending(later) == 1
+    assert reclaimer.run_once(later) == [record["id"]]
+    assert list(store.trash_root.iterdir()) == []
+
+
+def test_io_throttle_sleeps_to_hold_rate():
+    now = [0.0]
+    slept = []
+    throttle = IoThrottle(100, 0, clock=lambda: now[0], sleep=slept.append)
+    throttle.consume(50)
+    throttle.consume(150)
+    assert slept == [0.5, 2.0]
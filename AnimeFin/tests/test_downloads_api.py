@@ -9,6 +9,12 @@ class _FakeAnimeSource:
         self.last_search_mode = mode
         return [{"id": "show-1", "title": "Frieren", "episode_count": 10}]
 
+    def search_version(self, query, mode):  # noqa: ARG002
+        return None
+
+    def search_shows_versioned(self, query, mode):
+        return "v1", self.search_shows(query, mode)
+
     def list_episodes(self, show_id, mode):  # noqa: ARG002
         self.last_episodes_mode = mode
         return ["1", "2", "3"]
@@ -0,0 +1,109 @@
+import threading
+from pathlib import Path
+
+from app.config import AppConfig
+from app.main import create_app
+from app.services.eviction import EvictionEngine
+from app.storage import media
+from app.storage.media import MediaStore
+from app.storage.media_index import MediaIndex
+from app.storage.media_usage import MediaUsageStore
+
+
+def _build(tmp_path):
+    db_path = tmp_path / "jobs.sqlite3"
+    root = tmp_path / "downloads"
+    for rel in ["A/episode-1.mp4", "A/episode-2.mp4", "A/episode-3.mp4", "Pinned/episode-1.mp4"]:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 100)
+    usage = MediaUsageStore(db_path)
+    store = MediaStore(root, MediaIndex(db_path), usage=usage)
+    store.reconcile()
+    return store, usage
+
+
+def test_evicts_least_recently_accessed_watched_episodes_until_low_water(tmp_path):
+    store, usage = _build(tmp_path)
+    usage.pin_show("Pinned")
+    store.set_watched("A/episode-1.mp4")
+    store.set_watched("A/episode-2.mp4")
+    store.set_watched("Pinned/episode-1.mp4")
+    usage.touch("A/episode-1.mp4", "A", "2026-01-02T00:00:00+00:00")
+    usage.touch("A/episode-2.mp4", "A", "2026-01-01T00:00:00+00:00")
+    usage.touch("Pinned/episode-1.mp4", "Pinned", "2025-01-01T00:00:00+00:00")
+
+    engine = EvictionEngine(store, quota_bytes=400, high_water=0.9, low_water=0.75)
+    assert engine.usage()["used_bytes"] == 400
+
+    evicted = engine.run_once()
+    assert [e["media_id"] for e in evicted] == ["A/episode-2.mp4"]
+    assert engine.usage()["used_bytes"] == 300
+    assert engine.run_once() == []
+    assert (tmp_path / "downloads" / "Pinned" / "episode-1.mp4").exists()
+    assert (tmp_path / "downloads" / "A" / "episode-3.mp4").exists()
+
+
+def test_below_high_water_evicts_nothing(tmp_path):
+    store, _ = _build(tmp_path)
+    store.set_watched("A/episode-1.mp4")
+    engine = EvictionEngine(store, quota_bytes=1000)
+    assert engine.run_once() == []
+
+
+def test_config_pins_do_not_undo_an_api_unpin(tmp_path):
+    _, usage = _build(tmp_path)
+    usage.seed_pins(["Pinned", "A"])
+    assert usage.unpin_show("A")
+
+    usage.seed_pins(["Pinned", "A"])
+    assert usage.pinned_shows() == ["Pinned"]
+    usage.pin_show("A")
+    assert usage.pinned_shows() == ["A", "Pinned"]
+
+
+def test_evict_endpoint_refuses_when_eviction_is_disabled(tmp_path):
+    cfg = AppConfig(
+        base_dir=Path.cwd(),
+        downloads_dir=tmp_path / "downloads",
+        database_path=tmp_path / "jobs.sqlite3",
+        ani_cli_path=tmp_path / "ani-cli",
+        allanime_api="https://example.test",
+        allanime_referer="https://example.test",
+        user_agent="test-agent",
+        host="127.0.0.1",
+        port=5001,
+        debug=False,
+        eviction_enabled=False,
+    )
+    client = create_app(cfg, workers=False).test_client()
+
+    assert client.post("/api/storage/evict").status_code == 409
+
+
+def test_concurrent_access_is_debounced_once_and_bounded(tmp_path, monkeypatch):
+    store, _ = _build(tmp_path)
+    monkeypatch.setattr(media, "ACCESS_DEBOUNCE_ENTRIES", 8)
+    touched = []
+    monkeypatch.setattr(store.usage, "touch", lambda media_id, show: touched.append(media_id))
+    start = threading.Barrier(8)
+
+    def hammer(worker):
+        start.wait()
+        for n in range(200):
+            store.record_access("A/episode-1.mp4")
+            store.record_access(f"B/episode-{worker}-{n}.mp4")
+
+    threads = [threading.Thread(target=hammer, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(touched) - touched.count("A/episode-1.mp4") == 8 * 200
+    assert len(store._last_access) == 8
+
+    touched.clear()
+    for _ in range(3):
+        store.record_access("A/episode-2.mp4")
+    assert touched == ["A/episode-2.mp4"]
@@ -0,0 +1,101 @@
+import gzip
+import json
+from pathlib import Path
+
+from app.config import AppConfig
+from app.main import create_app
+from app.services.anime_source import AnimeSourceService
+from app.storage.jobs import NewJob
+
+
+def _build_test_app(tmp_path):
+    cfg = AppConfig(
+        base_dir=Path.cwd(),
+        downloads_dir=tmp_path / "downloads",
+        database_path=tmp_path / "jobs.sqlite3",
+        ani_cli_path=tmp_path / "ani-cli",
+        allanime_api="https://example.test",
+        allanime_referer="https://example.test",
+        user_agent="test-agent",
+        host="127.0.0.1",
+        port=5001,
+        debug=False,
+    )
+    (tmp_path / "downloads").mkdir()
+    app = create_app(cfg, workers=False)
+    app.testing = True
+    return app
+
+
+def _jobs(tmp_path: Path, count: int) -> list[NewJob]:
+    return [NewJob("show-1", "Show", str(n), "sub", "best", str(tmp_path / f"ep{n}.mp4")) for n in range(count)]
+
+
+def test_download_list_answers_304_until_jobs_change(tmp_path):
+    app = _build_test_app(tmp_path)
+    client = app.test_client()
+    store = app.extensions["jobs_store"]
+    store.create_jobs(_jobs(tmp_path, 1))
+
+    first = client.get("/api/downloads")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"jobs-')
+
+    cached = client.get("/api/downloads", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.data == b"" and cached.headers["ETag"] == etag
+
+    (job_id,) = store.create_jobs(_jobs(tmp_path, 1))
+    store.update_progress(job_id, progress_pct=10.0)
+    changed = client.get("/api/downloads", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_large_responses_are_gzipped_when_accepted(tmp_path):
+    app = _build_test_app(tmp_path)
+    client = app.test_client()
+    app.extensions["jobs_store"].create_jobs(_jobs(tmp_path, 30))
+
+    plain = client.get("/api/downloads")
+    packed = client.get("/api/downloads", headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert packed.headers["Content-Encoding"] == "gzip" and "Accept-Encoding" in packed.headers["Vary"]
+    assert len(packed.data) < len(plain.data) / 3
+    assert json.loads(gzip.decompress(packed.data)) == plain.get_json()
+    assert "Content-Encoding" not in client.get("/api/health", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_media_etag_follows_index_revision(tmp_path):
+    app = _build_test_app(tmp_path)
+    client = app.test_client()
+    etag = client.get("/api/media").headers["ETag"]
+    assert client.get("/api/media", headers={"If-None-Match": etag}).status_code == 304
+
+    episode = tmp_path / "downloads" / "Show" / "episode-1.mp4"
+    episode.parent.mkdir()
+    episode.write_bytes(b"\0" * 32)
+    app.extensions["media"].reconcile()
+
+    changed = client.get("/api/media", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.get_json()["total"] == 1
+
+
+def test_cached_search_answers_304_without_calling_upstream(tmp_path):
+    app = _build_test_app(tmp_path)
+    client = app.test_client()
+    source = AnimeSourceService("https://example.test", "https://example.test", "agent", search_cache_seconds=60)
+    calls = []
+
+    def fake_post(payload, timeout=20):  # noqa: ARG001
+        calls.append(payload)
+        edges = [{"_id": "show-1", "name": "Frieren", "availableEpisodes": {"sub": 10}}]
+        return {"data": {"shows": {"edges": edges}}}
+
+    source._post_graphql = fake_post
+    app.extensions["anime_source"] = source
+
+    first = client.get("/api/search?q=Frieren&mode=sub")
+    cached = client.get("/api/search?q=frieren&mode=sub", headers={"If-None-Match": first.headers["ETag"]})
+
+    assert first.status_code == 200 and cached.status_code == 304
+    assert len(calls) == 1
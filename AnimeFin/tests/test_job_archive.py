@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.config import AppConfig
+from app.main import create_app
+from app.services.job_archiver import JobArchiver
+from app.storage.job_archive import JobArchive
+from app.storage.jobs import JobsStore, NewJob
+
+
+def _job(store: JobsStore, show: str, episode: str, status: str, finished: str, size: int = 0) -> str:
+    (job_id,) = store.create_jobs([NewJob(show, show.title(), episode, "sub", "best", f"/tmp/{show}-{episode}.mp4")])
+    store.append_event(job_id, "info", "line", kind="output")
+    store.update_job_status(job_id, status=status, started_at=finished.replace("T10", "T09"), finished_at=finished)
+    store.update_progress(job_id, bytes_downloaded=size)
+    return job_id
+
+
+def test_archiving_moves_old_jobs_and_keeps_rollups(tmp_path):
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    archive = JobArchive(tmp_path / "jobs.sqlite3")
+    old_done = _job(store, "frieren", "1", "done", "2026-01-01T10:00:00+00:00", 3600 * 1000)
+    _job(store, "frieren", "2", "failed", "2026-01-01T10:00:00+00:00")
+    _job(store, "dandadan", "1", "done", "2026-01-02T10:00:00+00:00", 1800 * 1000)
+    recent = _job(store, "frieren", "3", "done", "2026-03-01T10:00:00+00:00", 3600 * 2000)
+    running = store.create_jobs([NewJob("frieren", "Frieren", "4", "sub", "best", "/tmp/f4.mp4")])[0]
+
+    moved = JobArchiver(archive, after_days=30).run_once(datetime(2026, 3, 2, tzinfo=timezone.utc))
+
+    assert moved == 3
+    assert {job["id"] for job in store.list_jobs()} == {recent, running}
+    assert store.list_events(old_done) == []
+    assert archive.get(old_done)["duration_seconds"] == 3600
+    assert store.existing_episodes("frieren", "sub") == {"1", "2", "3", "4"}
+
+    stats = archive.stats()
+    assert stats["totals"]["episodes"] == 2
+    assert stats["totals"]["failure_rate"] == round(1 / 3, 4)
+    frieren = next(s for s in stats["shows"] if s["show_id"] == "frieren")
+    assert frieren["episodes"] == 1
+    assert frieren["mean_throughput_bps"] == 1000.0
+    assert [d["day"] for d in stats["days"]] == ["2026-01-02", "2026-01-01"]
+    assert archive.stats(since_day="2026-02-01")["totals"]["jobs"] == 0
+
+
+def _config(tmp_path):
+    return AppConfig(
+        base_dir=Path.cwd(),
+        downloads_dir=tmp_path / "downloads",
+        database_path=tmp_path / "jobs.sqlite3",
+        ani_cli_path=tmp_path / "ani-cli",
+        allanime_api="https://example.test",
+        allanime_referer="https://example.test",
+        user_agent="test-agent",
+        host="127.0.0.1",
+        port=5001,
+        debug=False,
+    )
+
+
+def test_stats_endpoint_and_archived_job_lookup(tmp_path):
+    app = create_app(_config(tmp_path), workers=False)
+    store = app.extensions["jobs_store"]
+    job_id = _job(store, "frieren", "1", "done", "2026-01-01T10:00:00+00:00", 1000)
+    app.extensions["job_archive"].archive_finished("2026-02-01")
+    client = app.test_client()
+
+    detail = client.get(f"/api/downloads/{job_id}").get_json()
+    assert detail["archived"] is True
+    _job(store, "frieren", "2", "done", "2026-03-01T10:00:00+00:00", 1000)
+    stats = client.get("/api/stats?days=0&show_id=frieren").get_json()
+    assert stats["totals"]["episodes"] == 1
+    assert stats["current"] == {"done": 1}
+    assert client.get("/api/stats?days=x").status_code == 400
+
+
+def test_archived_job_keeps_its_log_until_retention_and_drops_traces(tmp_path):
+    app = create_app(_config(tmp_path), workers=False)
+    store, traces = app.extensions["jobs_store"], app.extensions["traces"]
+    job_id = _job(store, "frieren", "1", "done", "2026-01-01T10:00:00+00:00", 1000)
+    traces.save({"job_id": job_id, "attempt": 1, "start_unix_us": 0, "spans": []}, executor="ani-cli", status="done")
+    archiver = app.extensions["job_archiver"]
+    client = app.test_client()
+
+    assert archiver.run_once(datetime(2026, 3, 1, tzinfo=timezone.utc)) == 1
+    assert traces.list_traces(job_id=job_id) == []
+    response = client.get(f"/api/downloads/{job_id}/log")
+    assert response.status_code == 200 and "info: line" in response.get_data(as_text=True)
+
+    log_path = Path(store.event_archive(job_id)["path"])
+    archiver.run_once(datetime.now(timezone.utc) + timedelta(days=181))
+    assert not log_path.exists() and store.event_archive(job_id) is None
+    assert client.get(f"/api/downloads/{job_id}/log").status_code == 404
+    assert client.get("/api/downloads/missing/log").status_code == 404
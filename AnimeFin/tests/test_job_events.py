@@ -0,0 +1,92 @@
+import threading
+import time
+from pathlib import Path
+
+from app.config import AppConfig
+from app.main import create_app
+from app.storage.jobs import JobsStore, NewJob
+
+
+def _create_job(store: JobsStore, tmp_path: Path) -> str:
+    (job_id,) = store.create_jobs([NewJob("show-1", "Show", "1", "sub", "best", str(tmp_path / "ep1.mp4"))])
+    return job_id
+
+
+def _build_test_app(tmp_path):
+    cfg = AppConfig(
+        base_dir=Path.cwd(),
+        downloads_dir=tmp_path / "downloads",
+        database_path=tmp_path / "jobs.sqlite3",
+        ani_cli_path=tmp_path / "ani-cli",
+        allanime_api="https://example.test",
+        allanime_referer="https://example.test",
+        user_agent="test-agent",
+        host="127.0.0.1",
+        port=5001,
+        debug=False,
+    )
+    app = create_app(cfg, workers=False)
+    app.testing = True
+    return app
+
+
+def test_events_are_paged_by_id_and_tailed(tmp_path):
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    job_id = _create_job(store, tmp_path)
+    for n in range(10):
+        store.append_event(job_id, "info", f"line {n}")
+
+    first = store.list_events(job_id, limit=4)
+    second = store.list_events(job_id, after=first[-1]["id"], limit=4)
+    assert [e["message"] for e in first] == ["Job queued", "line 0", "line 1", "line 2"]
+    assert [e["message"] for e in second] == ["line 3", "line 4", "line 5", "line 6"]
+    assert [e["message"] for e in store.tail_events(job_id, 2)] == ["line 8", "line 9"]
+
+
+def test_events_endpoint_supports_after_tail_and_follow(tmp_path):
+    app = _build_test_app(tmp_path)
+    store = app.extensions["jobs_store"]
+    job_id = _create_job(store, tmp_path)
+    client = app.test_client()
+
+    detail = client.get(f"/api/downloads/{job_id}").get_json()
+    assert "events" not in detail
+
+    page = client.get(f"/api/downloads/{job_id}/events?limit=1").get_json()
+    assert [e["message"] for e in page["events"]] == ["Job queued"]
+    assert page["has_more"] is True
+    assert page["next_after"] == detail["last_event_id"]
+
+    tail = client.get(f"/api/downloads/{job_id}/events?tail=5").get_json()
+    assert [e["message"] for e in tail["events"]] == ["Job queued"]
+
+    def append_later():
+        time.sleep(0.3)
+        store.append_event(job_id, "info", "50%")
+
+    writer = threading.Thread(target=append_later)
+    writer.start()
+    started = time.monotonic()
+    followed = client.get(f"/api/downloads/{job_id}/events?after={page['next_after']}&wait=5").get_json()
+    writer.join()
+    assert [e["message"] for e in followed["events"]] == ["50%"]
+    assert time.monotonic() - started < 4
+
+    assert client.get(f"/api/downloads/{job_id}/events?tail=0").status_code == 400
+    assert client.get("/api/downloads/missing/events").status_code == 404
+
+
+def test_long_polls_beyond_the_thread_budget_answer_immediately(tmp_path):
+    app = _build_test_app(tmp_path)
+    job_id = _create_job(app.extensions["jobs_store"], tmp_path)
+    client = app.test_client()
+    after = client.get(f"/api/downloads/{job_id}/events").get_json()["next_after"]
+    long_polls = app.extensions["long_polls"]
+    while long_polls.acquire(blocking=False):
+        pass
+
+    started = time.monotonic()
+    page = client.get(f"/api/downloads/{job_id}/events?after={after}&wait=5").get_json()
+
+    assert page["events"] == [] and page["next_after"] == after
+    assert time.monotonic() - started < 1
@@ -22,4 +22,6 @@ def test_jobs_store_create_and_get(tmp_path):
     assert job is not None
     assert job["show_id"] == "s1"
     assert job["status"] == "queued"
-    assert any(evt["message"] == "Job queued" for evt in job["events"])
+    assert "events" not in job
+    assert job["last_event_id"] > 0
+    assert [evt["message"] for evt in store.list_events(ids[0])] == ["Job queued"]
@@ -0,0 +1,83 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from app.services.library_notifier import LibraryRefreshNotifier
+
+
+class _StubJellyfin(BaseHTTPRequestHandler):
+    requests: list = []
+    status = 204
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        type(self).requests.append((self.path, self.headers.get("Authorization"), body))
+        self.send_response(type(self).status)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def stub_server():
+    handler = type("Handler", (_StubJellyfin,), {"requests": [], "status": 204})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", handler
+    server.shutdown()
+    server.server_close()
+
+
+def _job(root: Path, show: str, episode: str) -> dict:
+    return {"output_path": str(root / show / f"episode-{episode}.mp4")}
+
+
+def test_refreshes_are_batched_per_folder_and_debounced(tmp_path: Path, stub_server) -> None:
+    url, handler = stub_server
+    notifier = LibraryRefreshNotifier(url, "secret", tmp_path, library_root="/media/downloads", debounce_seconds=60)
+    for episode in ("1", "2", "3"):
+        notifier.notify_job(_job(tmp_path, "Show A", episode))
+    notifier.notify_job(_job(tmp_path, "Show B", "1"))
+
+    result = notifier.run_once(now=1000)
+
+    assert result == {"scope": "folders", "paths": ["/media/downloads/Show A", "/media/downloads/Show B"], "ok": True}
+    (path, auth, body), = handler.requests
+    assert path == "/Library/Media/Updated" and auth == 'MediaBrowser Token="secret"'
+    assert [u["Path"] for u in body["Updates"]] == result["paths"]
+
+    notifier.notify_job(_job(tmp_path, "Show A", "4"))
+    assert notifier.run_once(now=1030) is None
+    assert notifier.run_once(now=1061)["paths"] == ["/media/downloads/Show A"]
+    assert len(handler.requests) == 2
+
+
+def test_falls_back_to_full_refresh_when_too_many_folders(tmp_path: Path, stub_server) -> None:
+    url, handler = stub_server
+    notifier = LibraryRefreshNotifier(url, "secret", tmp_path, max_paths=2)
+    for show in ("A", "B", "C"):
+        notifier.notify_job(_job(tmp_path, show, "1"))
+    notifier.notify_path(tmp_path.parent / "elsewhere")
+
+    assert notifier.run_once(now=0)["scope"] == "library"
+    assert [r[0] for r in handler.requests] == ["/Library/Refresh"]
+
+
+def test_failed_refresh_keeps_folders_pending(tmp_path: Path, stub_server) -> None:
+    url, handler = stub_server
+    handler.status = 500
+    notifier = LibraryRefreshNotifier(url, "secret", tmp_path, debounce_seconds=60)
+    notifier.notify_job(_job(tmp_path, "Show", "1"))
+
+    assert notifier.run_once(now=0)["ok"] is False
+    assert notifier.pending() == [str(tmp_path.resolve() / "Show")]
+
+    handler.status = 204
+    assert notifier.run_once(now=61)["ok"] is True
+    assert notifier.pending() == []
@@ -0,0 +1,31 @@
+import json
+
+from benchmarks.load import LoadOptions, render_text, run_load
+
+
+def test_load_generator_smoke(tmp_path):
+    options = LoadOptions(
+        clients=2,
+        producers=1,
+        duration=1.5,
+        poll_interval=0.1,
+        enqueue_interval=0.3,
+        episodes_per_enqueue=2,
+        file_bytes=32 * 1024,
+        in_process_server=True,
+    )
+
+    report = run_load(options, tmp_path)
+
+    metrics = report["metrics"]
+    assert metrics["http_req_failed"]["value"] == 0
+    assert metrics["http_reqs"]["count"] == sum(
+        v["count"] for k, v in metrics.items() if k.startswith("http_reqs{")
+    )
+    for endpoint in ("list_downloads", "list_media", "search", "enqueue"):
+        trend = metrics[f"http_req_duration{{endpoint:{endpoint}}}"]
+        assert trend["min"] <= trend["med"] <= trend["p(95)"] <= trend["p(99)"] <= trend["max"]
+    assert report["meta"]["jobs_enqueued"] >= 2
+    assert all(report["thresholds"].values())
+    assert "{ endpoint:list_media }" in render_text(report)
+    json.dumps(report)
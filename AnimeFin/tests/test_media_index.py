@@ -0,0 +1,43 @@
+from app.storage.media import MediaStore
+from app.storage.media_index import MediaIndex
+
+
+def _write(path, data=b"x"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_reconcile_indexes_files_and_serves_filtered_pages(tmp_path):
+    root = tmp_path / "downloads"
+    _write(root / "Beta" / "episode-1.mp4")
+    _write(root / "alpha" / "episode-2.mp4")
+    _write(root / "alpha" / "episode-1.mp4")
+    store = MediaStore(root, MediaIndex(tmp_path / "jobs.sqlite3"))
+
+    stats = store.reconcile()
+    assert stats["changed_dirs"] == 3
+    assert store.reconcile()["changed_dirs"] == 0
+
+    items, total = store.query_media()
+    assert total == 3
+    assert [i["media_id"] for i in items] == ["alpha/episode-1.mp4", "alpha/episode-2.mp4", "Beta/episode-1.mp4"]
+
+    page, total = store.query_media(show="alpha", offset=1, limit=1)
+    assert total == 2
+    assert [i["media_id"] for i in page] == ["alpha/episode-2.mp4"]
+
+
+def test_index_tracks_completed_jobs_and_deletes(tmp_path):
+    root = tmp_path / "downloads"
+    store = MediaStore(root, MediaIndex(tmp_path / "jobs.sqlite3"))
+    store.reconcile()
+
+    episode = _write(root / "Show" / "episode-1.mp4")
+    store.record_job({"output_path": str(episode)})
+    assert [i["media_id"] for i in store.list_media()] == ["Show/episode-1.mp4"]
+
+    store.delete_media("Show/episode-1.mp4")
+    assert store.list_media() == []
+    store.reconcile()
+    assert store.list_media() == []
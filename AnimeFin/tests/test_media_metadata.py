@@ -0,0 +1,74 @@
+import struct
+
+from app.services import media_probe
+from app.services.media_probe import probe_media
+from app.storage.media import MediaStore
+from app.storage.media_index import MediaIndex
+from app.storage.media_metadata import MediaMetadataCache
+
+
+def _box(box_type, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _track(handler, fourcc):
+    hdlr = _box(b"hdlr", b"\0" * 8 + handler + b"\0" * 12)
+    stsd = _box(b"stsd", b"\0" * 4 + struct.pack(">I", 1) + _box(fourcc, b"\0" * 16))
+    minf = _box(b"minf", _box(b"stbl", stsd))
+    return _box(b"trak", _box(b"mdia", hdlr + minf))
+
+
+def _mp4(moov_first=True):
+    mvhd = _box(b"mvhd", b"\0" * 12 + struct.pack(">II", 1000, 1440500) + b"\0" * 80)
+    moov = _box(b"moov", mvhd + _track(b"vide", b"avc1") + _track(b"soun", b"mp4a"))
+    mdat = _box(b"mdat", b"\0" * 64)
+    ftyp = _box(b"ftyp", b"isom\0\0\0\0")
+    return ftyp + (moov + mdat if moov_first else mdat + moov)
+
+
+def test_probe_reads_duration_and_codecs_from_moov(tmp_path):
+    path = tmp_path / "episode-1.mp4"
+    path.write_bytes(_mp4(moov_first=False))
+    info = probe_media(str(path))
+    assert info == {
+        "container": "mp4",
+        "duration_seconds": 1440.5,
+        "video_codec": "h264",
+        "audio_codec": "aac",
+        "faststart": False,
+    }
+
+    ts_path = tmp_path / "episode-2.mp4"
+    ts_path.write_bytes((b"\x47" + b"\0" * 187) * 3)
+    assert probe_media(str(ts_path))["container"] == "mpegts"
+
+
+def test_media_listing_uses_cached_metadata_until_file_changes(tmp_path, monkeypatch):
+    root = tmp_path / "downloads"
+    episode = root / "Show" / "episode-1.mp4"
+    episode.parent.mkdir(parents=True)
+    episode.write_bytes(_mp4())
+    db_path = tmp_path / "jobs.sqlite3"
+    store = MediaStore(root, MediaIndex(db_path), MediaMetadataCache(db_path), probe_workers=0)
+
+    calls = []
+    real_probe = media_probe.probe_media
+
+    def counting_probe(path):
+        calls.append(path)
+        return real_probe(path)
+
+    monkeypatch.setattr("app.storage.media.probe_media", counting_probe)
+    store.reconcile()
+    store.record_job({"output_path": str(episode)})
+    assert len(calls) == 1
+
+    item = store.list_media()[0]
+    assert item["duration_seconds"] == 1440.5
+    assert item["video_codec"] == "h264"
+    assert item["size_bytes"] == episode.stat().st_size
+    assert item["faststart"] is True
+
+    episode.write_bytes(_mp4() + b"\0" * 8)
+    store.record_job({"output_path": str(episode)})
+    assert len(calls) == 2
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from app.config import AppConfig
+from app.main import create_app
+from app.metrics import Registry
+from app.storage.jobs import NewJob
+
+
+def _build_test_app(tmp_path):
+    cfg = AppConfig(
+        base_dir=Path.cwd(),
+        downloads_dir=tmp_path / "downloads",
+        database_path=tmp_path / "jobs.sqlite3",
+        ani_cli_path=tmp_path / "ani-cli",
+        allanime_api="https://example.test",
+        allanime_referer="https://example.test",
+        user_agent="test-agent",
+        host="127.0.0.1",
+        port=5001,
+        debug=False,
+    )
+    app = create_app(cfg, workers=False)
+    app.testing = True
+    return app
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = Registry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+    hits = registry.counter("demo_total", "Demo hits.", ("route",))
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+    hits.inc(route='/a"b')
+
+    text = registry.render()
+
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{route="/a"} 3' in text
+    assert 'demo_total{route="/a\\"b"} 1' in text
+
+
+def test_metrics_endpoint_reports_queue_store_and_route_latency(tmp_path) -> None:
+    app = _build_test_app(tmp_path)
+    app.extensions["jobs_store"].create_jobs(
+        [NewJob("show-1", "Show", "1", "sub", "best", str(tmp_path / "episode-1.mp4"))]
+    )
+    client = app.test_client()
+    client.get("/api/health")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    text = response.get_data(as_text=True)
+    assert 'animefin_jobs{status="queued"} 1' in text
+    assert 'animefin_jobs{status="running"} 0' in text
+    assert 'animefin_jobs_store_operation_seconds_count{operation="create_jobs"}' in text
+    assert 'animefin_http_request_seconds_count{method="GET",route="/api/health",status="200"}' in text
+    assert 'route="/metrics"' not in text
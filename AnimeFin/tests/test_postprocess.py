@@ -0,0 +1,169 @@
+import struct
+import sys
+import time
+from pathlib import Path
+
+from app.services.postprocess import PostProcessOptions, PostProcessor, build_command, plan_steps
+from app.storage.jobs import JobsStore, NewJob
+
+FAKE_FFMPEG = """#!{python}
+import shutil, sys
+args = sys.argv[1:]
+source, target = args[args.index("-i") + 1], args[-1]
+if "fail" in source:
+    print("Invalid data found when processing input", flush=True)
+    sys.exit(1)
+for us in (360_000_000, 720_000_000, 1_440_000_000):
+    print(f"out_time_us={{us}}", flush=True)
+print("progress=end", flush=True)
+shutil.copyfile(source, target)
+"""
+
+
+def _box(box_type, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _mp4(moov_first=True):
+    mvhd = _box(b"mvhd", b"\0" * 12 + struct.pack(">II", 1000, 1440500) + b"\0" * 80)
+    moov, mdat = _box(b"moov", mvhd), _box(b"mdat", b"\0" * 64)
+    return _box(b"ftyp", b"isom\0\0\0\0") + (moov + mdat if moov_first else mdat + moov)
+
+
+def _fake_ffmpeg(tmp_path: Path) -> str:
+    script = tmp_path / "ffmpeg"
+    script.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    script.chmod(0o755)
+    return str(script)
+
+
+def _done_job(store: JobsStore, output: Path, schedule: str = "immediate") -> dict:
+    (job_id,) = store.create_jobs([NewJob("show-1", "Show", output.stem, "sub", "best", str(output), schedule=schedule)])
+    store.update_job_status(job_id, status="done")
+    return store.get_job(job_id)
+
+
+def test_plan_steps_detects_ts_and_moov_at_end(tmp_path: Path) -> None:
+    ts, tail, ready = tmp_path / "ts.mp4", tmp_path / "tail.mp4", tmp_path / "ready.mp4"
+    ts.write_bytes((b"\x47" + b"\0" * 187) * 3)
+    tail.write_bytes(_mp4(moov_first=False))
+    ready.write_bytes(_mp4())
+
+    assert plan_steps(ts) == ["remux"]
+    assert plan_steps(tail) == ["faststart"]
+    assert plan_steps(ready) == []
+    assert plan_steps(ready, normalize_audio=True) == ["normalize"]
+    command = build_command("ffmpeg", ts, tmp_path / "out.mp4", ["remux", "normalize"])
+    assert "+faststart" in command and "-af" in command
+    maps = [command[i + 1] for i, arg in enumerate(command) if arg == "-map"]
+    assert maps == ["0"]
+    assert command[command.index("-c:s") + 1] == "mov_text"
+
+
+def test_run_once_processes_by_priority_with_progress_events(tmp_path: Path) -> None:
+    db_path = tmp_path / "jobs.sqlite3"
+    store = JobsStore(db_path)
+    processor = PostProcessor(store, db_path, options=PostProcessOptions(_fake_ffmpeg(tmp_path)))
+    recorded = []
+    processor.add_completion_listener(lambda job: recorded.append(job["id"]))
+
+    ready, later, now = (tmp_path / f"{name}.mp4" for name in ("ready", "later", "now"))
+    ready.write_bytes(_mp4())
+    later.write_bytes(_mp4(moov_first=False))
+    now.write_bytes(_mp4(moov_first=False))
+    ready_job, later_job, now_job = _done_job(store, ready), _done_job(store, later, "off_peak"), _done_job(store, now)
+    for job in (ready_job, later_job, now_job):
+        assert processor.enqueue_job(job)
+
+    assert processor.run_once() == 3
+
+    assert store.get_postprocess(ready_job["id"])["status"] == "skipped"
+    task = store.get_postprocess(now_job["id"])
+    assert (task["status"], task["steps"], task["progress_pct"]) == ("done", "faststart", 100.0)
+    assert recorded == [now_job["id"], later_job["id"]]
+    messages = [e["message"] for e in store.list_events(now_job["id"])]
+    assert "Post-processing 25%" in messages and "Post-processing 50%" in messages
+    assert not list(tmp_path.glob(".*.post.mp4"))
+
+
+def test_failed_processing_keeps_original_file(tmp_path: Path) -> None:
+    db_path = tmp_path / "jobs.sqlite3"
+    store = JobsStore(db_path)
+    processor = PostProcessor(store, db_path, options=PostProcessOptions(_fake_ffmpeg(tmp_path)))
+    output = tmp_path / "fail.mp4"
+    output.write_bytes(_mp4(moov_first=False))
+    job = _done_job(store, output)
+    processor.enqueue_job(job)
+
+    processor.run_once()
+
+    task = store.get_postprocess(job["id"])
+    assert task["status"] == "failed" and "Invalid data" in task["error_message"]
+    assert output.read_bytes() == _mp4(moov_first=False)
+
+
+def test_process_pool_handles_queued_tasks(tmp_path: Path) -> None:
+    db_path = tmp_path / "jobs.sqlite3"
+    store = JobsStore(db_path)
+    processor = PostProcessor(
+        store, db_path, options=PostProcessOptions(_fake_ffmpeg(tmp_path)), workers=2, poll_seconds=0.05
+    )
+    outputs = [tmp_path / f"ep{i}.mp4" for i in range(3)]
+    jobs = []
+    for output in outputs:
+        output.write_bytes(_mp4(moov_first=False))
+        jobs.append(_done_job(store, output))
+    processor.start()
+    try:
+        for job in jobs:
+            processor.enqueue_job(job)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if all(store.get_postprocess(j["id"])["status"] == "done" for j in jobs):
+                break
+            time.sleep(0.05)
+    finally:
+        processor.stop(timeout=5)
+    assert [store.get_postprocess(j["id"])["status"] for j in jobs] == ["done"] * 3
+
+
+def test_audio_is_normalized_once_unless_asked_again(tmp_path: Path) -> None:
+    db_path = tmp_path / "jobs.sqlite3"
+    store = JobsStore(db_path)
+    options = PostProcessOptions(_fake_ffmpeg(tmp_path), normalize_audio=True)
+    processor = PostProcessor(store, db_path, options=options)
+    output = tmp_path / "ep.mp4"
+    output.write_bytes(_mp4())
+    job = _done_job(store, output)
+
+    processor.enqueue_job(job)
+    processor.run_once()
+    assert store.get_postprocess(job["id"])["steps"] == "normalize"
+
+    processor.enqueue_job(job)
+    processor.run_once()
+    assert store.get_postprocess(job["id"])["status"] == "skipped"
+
+    store.enqueue_postprocess(job["id"], renormalize=True)
+    processor.run_once()
+    task = store.get_postprocess(job["id"])
+    assert (task["status"], task["steps"]) == ("done", "normalize")
+
+
+def test_ani_cli_episode_file_is_found_and_processed(tmp_path: Path) -> None:
+    db_path = tmp_path / "jobs.sqlite3"
+    store = JobsStore(db_path)
+    processor = PostProcessor(store, db_path, options=PostProcessOptions(_fake_ffmpeg(tmp_path)))
+    show_dir = tmp_path / "Show"
+    show_dir.mkdir()
+    written = show_dir / "Show Episode 3.mp4"
+    written.write_bytes((b"\x47" + b"\0" * 187) * 3)
+    (job_id,) = store.create_jobs([NewJob("show-1", "Show", "3", "sub", "best", str(show_dir / "episode-3.mp4"))])
+    store.update_job_status(job_id, status="done")
+
+    assert processor.enqueue_job(store.get_job(job_id))
+    processor.run_once()
+
+    task = store.get_postprocess(job_id)
+    assert (task["status"], task["steps"]) == ("done", "remux")
+    assert not (show_dir / "episode-3.mp4").exists()
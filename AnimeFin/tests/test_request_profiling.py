@@ -0,0 +1,78 @@
+import pstats
+from pathlib import Path
+
+from app.config import AppConfig
+from app.main import create_app
+from app.services.anime_source import AnimeSourceService
+from app.storage.jobs import NewJob
+
+
+def _build_test_app(tmp_path: Path, **profiling):
+    cfg = AppConfig(
+        base_dir=Path.cwd(),
+        downloads_dir=tmp_path / "downloads",
+        database_path=tmp_path / "jobs.sqlite3",
+        ani_cli_path=tmp_path / "ani-cli",
+        allanime_api="https://example.test",
+        allanime_referer="https://example.test",
+        user_agent="test-agent",
+        host="127.0.0.1",
+        port=5001,
+        debug=False,
+        profile_dir=tmp_path / "profiles",
+        **profiling,
+    )
+    (tmp_path / "downloads").mkdir()
+    app = create_app(cfg, workers=False)
+    app.testing = True
+    return app
+
+
+def _timings(header: str) -> dict[str, str]:
+    return {part.split(";")[0].strip(): part for part in header.split(",")}
+
+
+def test_server_timing_breaks_down_sqlite_and_serialization(tmp_path: Path) -> None:
+    app = _build_test_app(tmp_path, profile_requests=True, profile_sample_rate=0, profile_slow_ms=60_000)
+    app.extensions["jobs_store"].create_jobs(
+        [NewJob("show-1", "Show", "1", "sub", "best", str(tmp_path / "ep1.mp4"))]
+    )
+
+    response = app.test_client().get("/api/downloads")
+
+    timings = _timings(response.headers["Server-Timing"])
+    assert set(timings) == {"sqlite", "serialize", "total"}
+    assert 'desc="' in timings["sqlite"] and "statement" in timings["sqlite"]
+    assert 'desc="1 call"' in timings["serialize"]
+    assert not (tmp_path / "profiles").exists()
+
+
+def test_upstream_time_is_reported_for_search(tmp_path: Path) -> None:
+    app = _build_test_app(tmp_path, profile_requests=True, profile_sample_rate=0)
+    source = AnimeSourceService("https://example.test", "https://example.test", "agent")
+    source._post_graphql = lambda payload, timeout=20: {"data": {"shows": {"edges": []}}}  # noqa: ARG005
+    app.extensions["anime_source"] = source
+
+    response = app.test_client().get("/api/search?q=frieren")
+
+    assert 'upstream;dur=' in response.headers["Server-Timing"]
+
+
+def test_slow_sampled_requests_are_captured_and_rotated(tmp_path: Path) -> None:
+    app = _build_test_app(
+        tmp_path, profile_requests=True, profile_sample_rate=1.0, profile_slow_ms=0, profile_keep=2
+    )
+    client = app.test_client()
+    for _ in range(3):
+        assert client.get("/api/downloads").status_code == 200
+
+    captures = sorted((tmp_path / "profiles").glob("*.prof"))
+    assert len(captures) == 2
+    assert "-GET-api_downloads-" in captures[-1].name
+    assert pstats.Stats(str(captures[-1])).total_calls > 0
+
+
+def test_profiling_is_off_by_default(tmp_path: Path) -> None:
+    app = _build_test_app(tmp_path)
+
+    assert "Server-Timing" not in app.test_client().get("/api/downloads").headers
@@ -0,0 +1,54 @@
+import threading
+import time
+
+from app.services.resilience import CircuitBreaker, HedgedCaller, LatencyTracker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_half_open_probe_closes_or_reopens():
+    clock = _Clock()
+    breaker = CircuitBreaker(window_size=4, min_calls=2, failure_rate_threshold=0.5, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 10
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failure_rate() == 0.0
+
+
+def test_hedged_caller_sends_duplicate_after_p95():
+    latency = LatencyTracker(min_samples=1)
+    latency.observe(0.01)
+    hedger = HedgedCaller(latency)
+    release = threading.Event()
+    calls = []
+
+    def slow_then_fast():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(2)
+            return "slow"
+        return "fast"
+
+    started = time.monotonic()
+    assert hedger.call(slow_then_fast) == "fast"
+    assert time.monotonic() - started < 1
+    assert len(calls) == 2
+    release.set()
@@ -0,0 +1,74 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from app.services.retention import EventRetention, RetentionPolicy
+from app.storage.jobs import JobsStore, NewJob
+
+
+def _finished_job(store: JobsStore, tmp_path, status: str, lines: int) -> str:
+    (job_id,) = store.create_jobs([NewJob("show-1", "Show", status, "sub", "best", str(tmp_path / "ep.mp4"))])
+    store.append_event(job_id, "info", "Download started")
+    for n in range(lines):
+        store.append_event(job_id, "info", f"[download] {n}%", kind="output")
+    store.append_event(job_id, "info", "Download completed")
+    store.update_job_status(job_id, status=status, finished_at="2026-01-01T00:00:00+00:00")
+    return job_id
+
+
+def test_compaction_keeps_lifecycle_and_tail_and_archives_full_log(tmp_path):
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    done = _finished_job(store, tmp_path, "done", 50)
+    failed = _finished_job(store, tmp_path, "failed", 50)
+    cancelled = _finished_job(store, tmp_path, "cancelled", 50)
+    retention = EventRetention(
+        store,
+        tmp_path / "archives",
+        {
+            "done": RetentionPolicy(keep_output_lines=3, after_seconds=3600),
+            "failed": RetentionPolicy(keep_output_lines=10, after_seconds=3600),
+            "cancelled": RetentionPolicy(keep_output_lines=-1, after_seconds=3600),
+        },
+    )
+
+    report = retention.run_once(datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(hours=2))
+
+    assert report["jobs_compacted"] == 2
+    assert report["events_removed"] == 47 + 40
+    kept = [e["message"] for e in store.list_events(done, limit=100)]
+    assert kept == ["Job queued", "Download started", "[download] 47%", "[download] 48%", "[download] 49%", "Download completed"]
+    assert len(store.list_events(failed, limit=100)) == 13
+    assert len(store.list_events(cancelled, limit=100)) == 53
+
+    archived = list(retention.read_archive(done))
+    assert len(archived) == 53
+    assert archived[2]["message"] == "[download] 0%"
+    assert store.event_archive(done)["events"] == 53
+    assert retention.run_once(datetime(2026, 1, 2, tzinfo=timezone.utc))["jobs_compacted"] == 0
+
+
+def test_recent_jobs_are_left_alone_and_vacuum_runs_incrementally(tmp_path):
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    job_id = _finished_job(store, tmp_path, "done", 5)
+    retention = EventRetention(store, tmp_path / "archives", {"done": RetentionPolicy(0, 86400)})
+
+    report = retention.run_once(datetime(2026, 1, 1, 12, tzinfo=timezone.utc))
+
+    assert report["jobs_compacted"] == 0
+    assert report["vacuum"]["incremental"] == 1
+    assert len(store.list_events(job_id)) == 8
+    assert retention.read_archive(job_id) is None
+
+
+def test_retention_never_vacuums_a_legacy_database(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE legacy (id INTEGER)")
+    store = JobsStore(path)
+    retention = EventRetention(store, tmp_path / "archives", {"done": RetentionPolicy(0, 86400)})
+
+    report = retention.run_once(datetime(2026, 1, 1, tzinfo=timezone.utc))
+
+    assert report["vacuum"] == {"incremental": 0, "pages_freed": 0, "free_pages_left": 0}
+    assert store.convert_to_incremental_vacuum()["converted"] == 1
+    assert store.incremental_vacuum(10)["incremental"] == 1
+    assert store.convert_to_incremental_vacuum()["converted"] == 0
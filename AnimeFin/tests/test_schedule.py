@@ -0,0 +1,99 @@
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from app.services.downloads import DownloadService
+from app.services.executors import Aria2Executor, YtDlpExecutor
+from app.services.schedule import DownloadSchedule, parse_rate, parse_windows
+from app.storage.jobs import JobsStore, NewJob
+
+# 2024-01-01 is a Monday.
+MONDAY_NOON = datetime(2024, 1, 1, 12, 0)
+SATURDAY_3AM = datetime(2024, 1, 6, 3, 0)
+SATURDAY_NOON = datetime(2024, 1, 6, 12, 0)
+
+
+def _job(tmp_path: Path, episode: str, schedule: str = "immediate") -> NewJob:
+    return NewJob(
+        show_id="show-1",
+        show_title="Show",
+        episode=episode,
+        mode="sub",
+        quality="best",
+        output_path=str(tmp_path / f"episode-{episode}.mp4"),
+        schedule=schedule,
+    )
+
+
+def test_parse_windows_handles_ranges_options_and_overnight_wrap() -> None:
+    night, weekend = parse_windows("mon-fri 23:00-07:00 concurrency=3 bandwidth=5M; sat,sun 00-09")
+
+    assert night.concurrency == 3 and night.bytes_per_second == 5 * 1024**2
+    assert night.contains(datetime(2024, 1, 1, 23, 30))
+    assert night.contains(SATURDAY_3AM)  # Friday night spills into Saturday morning
+    assert not night.contains(datetime(2024, 1, 1, 3, 0))  # Sunday night is not in mon-fri
+    assert not night.contains(MONDAY_NOON)
+    assert weekend.contains(SATURDAY_3AM) and not weekend.contains(SATURDAY_NOON)
+    assert parse_rate("512k") == 512 * 1024 and parse_rate("100") == 100
+    assert parse_rate("") == 0 and parse_rate("  ") == 0
+
+
+def test_parse_windows_rejects_bad_entries() -> None:
+    with pytest.raises(ValueError):
+        parse_windows("someday 01:00-02:00")
+    with pytest.raises(ValueError):
+        parse_windows("mon 25:00-02:00")
+
+
+def test_schedule_limits_follow_the_active_window() -> None:
+    schedule = DownloadSchedule(parse_windows("sat 00:00-09:00 concurrency=4 bandwidth=8M"), concurrency=1)
+
+    assert schedule.max_concurrency == 4
+    inside = schedule.limits(SATURDAY_3AM)
+    assert (inside.concurrency, inside.bytes_per_second, inside.off_peak_open) == (4, 8 * 1024**2, True)
+    outside = schedule.limits(SATURDAY_NOON)
+    assert (outside.concurrency, outside.off_peak_open) == (1, False)
+    assert DownloadSchedule().limits(SATURDAY_NOON).off_peak_open
+
+
+def test_off_peak_jobs_wait_for_the_window(tmp_path: Path) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    service = DownloadService(
+        store, tmp_path, tmp_path / "ani-cli", schedule=DownloadSchedule(parse_windows("sat 00:00-09:00"))
+    )
+    now_id, later_id = store.create_jobs([_job(tmp_path, "1"), _job(tmp_path, "2", "off_peak")])
+
+    assert store.get_status(later_id) == "scheduled"
+    service.apply_schedule(SATURDAY_NOON)
+    assert store.claim_next_queued() == now_id
+    assert store.claim_next_queued() is None
+
+    service.apply_schedule(SATURDAY_3AM)
+    assert store.claim_next_queued() == later_id
+
+
+def test_window_close_checkpoints_running_off_peak_job(tmp_path: Path) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    service = DownloadService(
+        store, tmp_path, tmp_path / "ani-cli", schedule=DownloadSchedule(parse_windows("sat 00:00-09:00"))
+    )
+    (job_id,) = store.create_jobs([_job(tmp_path, "1", "off_peak")])
+    service.apply_schedule(SATURDAY_3AM)
+    assert store.claim_next_queued() == job_id
+    service._running[job_id] = "off_peak"
+
+    service.apply_schedule(SATURDAY_NOON)
+
+    assert service._is_preempted(job_id)
+    assert service._finish_job(job_id, -15) == "scheduled"
+    assert store.get_status(job_id) == "scheduled"
+    assert "off-peak window closed" in store.tail_events(job_id, 1)[0]["message"]
+
+
+def test_bandwidth_cap_is_passed_to_capable_executors(tmp_path: Path) -> None:
+    output = tmp_path / "ep.mp4"
+
+    assert "--limit-rate" in YtDlpExecutor().build_command("https://x/ep", output, rate_limit=1024)
+    assert "--max-overall-download-limit=1024" in Aria2Executor().build_command("https://x/ep", output, rate_limit=1024)
+    assert not any("limit" in arg for arg in YtDlpExecutor().build_command("https://x/ep", output))
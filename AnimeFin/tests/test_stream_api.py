@@ -0,0 +1,80 @@
+from pathlib import Path
+
+from app.config import AppConfig
+from app.main import create_app
+from app.storage.media import MediaStore
+
+
+PAYLOAD = bytes(range(256)) * 4
+
+
+def _build_test_app(tmp_path):
+    cfg = AppConfig(
+        base_dir=Path.cwd(),
+        downloads_dir=tmp_path / "downloads",
+        database_path=tmp_path / "jobs.sqlite3",
+        ani_cli_path=tmp_path / "ani-cli",
+        allanime_api="https://example.test",
+        allanime_referer="https://example.test",
+        user_agent="test-agent",
+        host="127.0.0.1",
+        port=5001,
+        debug=False,
+    )
+    app = create_app(cfg, workers=False)
+    app.testing = True
+    app.extensions["media"] = MediaStore(cfg.downloads_dir)
+    file_path = cfg.downloads_dir / "Show" / "episode-1.mp4"
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(PAYLOAD)
+    return app
+
+
+def test_stream_full_file_and_conditional_get(tmp_path):
+    client = _build_test_app(tmp_path).test_client()
+    res = client.get("/media/Show/episode-1.mp4")
+    assert res.status_code == 200
+    assert res.data == PAYLOAD
+    assert res.headers["Accept-Ranges"] == "bytes"
+    assert res.headers["Content-Type"] == "video/mp4"
+    etag = res.headers["ETag"]
+
+    cached = client.get("/media/Show/episode-1.mp4", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.data == b""
+
+
+def test_stream_single_suffix_and_multi_ranges(tmp_path):
+    client = _build_test_app(tmp_path).test_client()
+
+    res = client.get("/media/Show/episode-1.mp4", headers={"Range": "bytes=10-19"})
+    assert res.status_code == 206
+    assert res.data == PAYLOAD[10:20]
+    assert res.headers["Content-Range"] == f"bytes 10-19/{len(PAYLOAD)}"
+    assert res.headers["Content-Length"] == "10"
+
+    res = client.get("/media/Show/episode-1.mp4", headers={"Range": "bytes=-4"})
+    assert res.status_code == 206
+    assert res.data == PAYLOAD[-4:]
+
+    res = client.get("/media/Show/episode-1.mp4", headers={"Range": "bytes=0-1, 100-101"})
+    assert res.status_code == 206
+    assert res.mimetype == "multipart/byteranges"
+    assert int(res.headers["Content-Length"]) == len(res.data)
+    assert f"Content-Range: bytes 100-101/{len(PAYLOAD)}".encode() in res.data
+    assert PAYLOAD[100:102] in res.data
+
+
+def test_stream_if_range_unsatisfiable_and_traversal(tmp_path):
+    client = _build_test_app(tmp_path).test_client()
+
+    res = client.get("/media/Show/episode-1.mp4", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert res.status_code == 200
+    assert res.data == PAYLOAD
+
+    res = client.get("/media/Show/episode-1.mp4", headers={"Range": f"bytes={len(PAYLOAD)}-"})
+    assert res.status_code == 416
+    assert res.headers["Content-Range"] == f"bytes */{len(PAYLOAD)}"
+
+    assert client.get("/media/Show/missing.mp4").status_code == 404
+    assert client.get("/media/..%2F..%2Fetc%2Fpasswd").status_code in {400, 404}
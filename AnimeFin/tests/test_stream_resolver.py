@@ -0,0 +1,157 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.services.anime_source import AnimeSourceService
+from app.services.downloads import DownloadService
+from app.services.stream_resolver import StreamResolver, source_expiry
+from app.storage.jobs import JobsStore, NewJob
+
+NOW = datetime(2024, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _encode(path: str) -> str:
+    return "--" + bytes(b ^ 0x38 for b in path.encode()).hex()
+
+
+class _FakeSource:
+    def __init__(self, results: dict[str, dict | None]) -> None:
+        self.results = results
+        self.calls: list[str] = []
+
+    def resolve_episode_source(self, show_id, mode, episode, quality):  # noqa: ARG002
+        self.calls.append(episode)
+        return self.results.get(episode)
+
+
+def _job(tmp_path: Path, episode: str, **kwargs) -> NewJob:
+    return NewJob("show-1", "Show", episode, "sub", "best", str(tmp_path / f"episode-{episode}.mp4"), **kwargs)
+
+
+def test_source_service_decodes_provider_ids_and_picks_quality(monkeypatch) -> None:
+    source = AnimeSourceService("https://api.example.test/api", "https://ref.test", "agent")
+    source._post_graphql = lambda payload, timeout=20: {  # noqa: ARG005
+        "data": {
+            "episode": {
+                "sourceUrls": [
+                    {"sourceUrl": _encode("/apivtwo/clock?id=s"), "sourceName": "S-mp4"},
+                    {"sourceUrl": _encode("/apivtwo/clock?id=l"), "sourceName": "Luf-Mp4"},
+                    {"sourceUrl": "https://embed.test/x", "sourceName": "Mp4"},
+                ]
+            }
+        }
+    }
+    fetched = []
+
+    def fake_links(path):
+        fetched.append(source.media_base + path)
+        if path.endswith("id=s"):
+            return [(1080, "https://cdn.test/s-1080.mp4", "mp4_aria2", "https://ref.test")]
+        return [(720, "https://cdn.test/l/master.m3u8", "m3u8_ffmpeg", "https://hls.test")]
+
+    monkeypatch.setattr(source, "_provider_links", fake_links)
+
+    best = source.resolve_episode_source("show-1", "sub", "3")
+    assert best == {"url": "https://cdn.test/s-1080.mp4", "type": "mp4_aria2", "referer": "https://ref.test"}
+    assert fetched[0] == "https://example.test/apivtwo/clock.json?id=s"
+    assert source.resolve_episode_source("show-1", "sub", "3", "720p")["type"] == "m3u8_ffmpeg"
+
+
+def test_resolver_fills_the_next_queued_jobs_only(tmp_path: Path) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    ids = store.create_jobs([_job(tmp_path, str(n)) for n in (1, 2, 3)])
+    (direct,) = store.create_jobs([_job(tmp_path, "4", source_url="https://user.test/4.mp4")])
+    hit = {"url": "https://cdn.test/ep.mp4?expires=1717243800", "type": "mp4_aria2", "referer": "https://ref.test"}
+    source = _FakeSource({"1": hit, "2": None, "3": hit})
+    resolver = StreamResolver(store, source, lookahead=2, ttl_seconds=3600)
+
+    assert resolver.run_once(now=NOW) == {ids[0]: "resolved", ids[1]: "unavailable"}
+    assert resolver.run_once(now=NOW) == {}
+
+    first = store.get_job(ids[0])
+    assert (first["source_url"], first["source_type"], first["resolve_state"]) == (hit["url"], "mp4_aria2", "resolved")
+    assert first["source_expires_at"] == "2024-06-01T12:10:00+00:00"
+    assert store.get_job(ids[1])["resolve_state"] == "unavailable"
+    assert store.get_job(ids[2])["source_url"] == ""
+    assert store.get_job(direct)["resolve_state"] == ""
+
+    later = NOW + timedelta(minutes=9)
+    assert resolver.run_once(now=later) == {ids[0]: "resolved"}
+    assert source.calls == ["1", "2", "1"]
+
+
+def test_source_expiry_uses_ttl_without_url_hint() -> None:
+    assert source_expiry("https://cdn.test/ep.mp4?token=x", NOW, 60) == NOW + timedelta(seconds=60)
+
+
+def test_worker_resolves_again_when_claimed_source_expired(tmp_path: Path, monkeypatch) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    (job_id,) = store.create_jobs([_job(tmp_path, "1")])
+    fresh = {"url": "https://cdn.test/fresh.mp4", "type": "mp4_aria2", "referer": ""}
+    resolver = StreamResolver(store, _FakeSource({"1": fresh}), ttl_seconds=3600)
+    store.store_resolution(
+        job_id,
+        source_url="https://cdn.test/stale.mp4",
+        source_type="mp4_aria2",
+        referer="",
+        expires_at=(datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat(),
+    )
+    service = DownloadService(store, tmp_path / "downloads", tmp_path / "ani-cli", resolver=resolver)
+    ran = []
+    monkeypatch.setattr(service, "_run_job", lambda job, trace, outcome, rate_limit=0: ran.append(job["source_url"]))
+
+    assert store.claim_next_queued() == job_id
+    service._process_job(job_id)
+
+    assert ran == ["https://cdn.test/fresh.mp4"]
+    messages = [e["message"] for e in store.list_events(job_id)]
+    assert "Resolved stream URL expired; resolving again" in messages
+
+
+def test_worker_falls_back_to_ani_cli_when_resolution_blows_up(tmp_path: Path, monkeypatch) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    (job_id,) = store.create_jobs([_job(tmp_path, "1")])
+
+    class _BrokenSource:
+        def resolve_episode_source(self, *args):  # noqa: ARG002
+            raise ValueError("non-hexadecimal number found in fromhex() arg")
+
+    resolver = StreamResolver(store, _BrokenSource(), ttl_seconds=3600)
+    store.store_resolution(
+        job_id,
+        source_url="https://cdn.test/stale.mp4",
+        source_type="mp4_aria2",
+        referer="",
+        expires_at=(datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat(),
+    )
+    service = DownloadService(store, tmp_path / "downloads", tmp_path / "ani-cli", resolver=resolver)
+    ran = []
+    monkeypatch.setattr(service, "_run_job", lambda job, trace, outcome, rate_limit=0: ran.append(job["source_url"]))
+
+    assert store.claim_next_queued() == job_id
+    service._process_job(job_id)
+
+    assert ran == [""]
+    assert resolver.resolve_job(job_id) == "error"
+
+
+def test_failing_resolution_backs_off_then_gives_up(tmp_path: Path) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    (job_id,) = store.create_jobs([_job(tmp_path, "1")])
+    calls = []
+
+    class _BrokenSource:
+        def resolve_episode_source(self, *args):  # noqa: ARG002
+            calls.append(args)
+            raise ValueError("bad provider id")
+
+    resolver = StreamResolver(store, _BrokenSource(), retry_seconds=60, max_failures=2)
+
+    assert resolver.run_once(now=NOW) == {job_id: "error"}
+    assert resolver.run_once(now=NOW + timedelta(seconds=1)) == {}
+    assert len(calls) == 1
+
+    assert resolver.run_once(now=NOW + timedelta(seconds=61)) == {job_id: "error"}
+    assert resolver.run_once(now=NOW + timedelta(hours=1)) == {}
+    assert len(calls) == 2
+    job = store.get_job(job_id)
+    assert (job["resolve_state"], job["resolve_failures"]) == ("unavailable", 2)
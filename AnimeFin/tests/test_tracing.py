@@ -0,0 +1,54 @@
+import sys
+
+from app.services.downloads import DownloadService
+from app.services.executors import BaseExecutor
+from app.services.tracing import JobTrace, to_chrome, to_otlp
+from app.storage.jobs import JobsStore, NewJob
+from app.storage.traces import TraceStore
+
+
+class _StubExecutor(BaseExecutor):
+    name = "stub"
+
+
+def test_job_phases_are_traced_per_attempt_and_exported(tmp_path, monkeypatch):
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    traces = TraceStore(tmp_path / "jobs.sqlite3")
+    service = DownloadService(store, tmp_path / "downloads", tmp_path / "ani-cli", traces=traces)
+    (job_id,) = store.create_jobs(
+        [NewJob("show-1", "Show", "1", "sub", "best", str(tmp_path / "ep1.mp4"), source_url="https://x.test/a.mp4")]
+    )
+    command = [sys.executable, "-c", "print('50%'); print('100%')"]
+    monkeypatch.setattr(service, "_resolve_command_and_executor", lambda job, show_dir, rate_limit=0: (command, _StubExecutor()))
+
+    service._process_job(job_id)
+    service._process_job(job_id)
+
+    recorded = traces.list_traces(job_id=job_id)
+    assert [t["attempt"] for t in recorded] == [1, 2]
+    spans = {span[0]: span for span in recorded[0]["spans"]}
+    assert {"queue_wait", "job", "prepare", "resolve", "download", "finalize", "completion_hooks"} <= set(spans)
+    assert spans["job"][4]["status"] == "done"
+    assert spans["download"][4] == {"executor": "stub", "exit_code": 0, "bytes": 0}
+    job_index = [s[0] for s in recorded[0]["spans"]].index("job")
+    assert spans["download"][1] == job_index
+    assert spans["download"][3] <= spans["job"][3]
+    assert traces.list_traces(executor="yt-dlp") == []
+
+    chrome = to_chrome(recorded)
+    assert {e["ph"] for e in chrome["traceEvents"]} == {"M", "X"}
+    otlp = to_otlp(recorded)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    download = next(s for s in otlp if s["name"] == "download")
+    job = next(s for s in otlp if s["name"] == "job" and s["traceId"] == download["traceId"])
+    assert download["parentSpanId"] == job["spanId"]
+    assert int(download["endTimeUnixNano"]) >= int(download["startTimeUnixNano"])
+
+
+def test_failed_span_records_error_type():
+    trace = JobTrace("job-1")
+    try:
+        with trace.span("resolve"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert trace.encode()["spans"][0][4] == {"error": "RuntimeError"}
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+from app.services.downloads import DownloadService
+from app.services.watcher import EpisodeWatcher, WatchPolicy, next_poll_delay
+from app.storage.jobs import JobsStore
+from app.storage.watchlist import NewWatch, WatchlistStore
+
+
+class _FakeAnimeSource:
+    def __init__(self, episodes):
+        self.episodes = episodes
+
+    def list_episodes(self, show_id, mode):  # noqa: ARG002
+        return list(self.episodes)
+
+
+def _build(tmp_path, episodes):
+    db_path = tmp_path / "jobs.sqlite3"
+    jobs_store = JobsStore(db_path)
+    watchlist = WatchlistStore(db_path)
+    downloads = DownloadService(jobs_store, tmp_path / "downloads", tmp_path / "ani-cli")
+    source = _FakeAnimeSource(episodes)
+    watcher = EpisodeWatcher(watchlist, source, jobs_store, downloads, max_workers=2)
+    return watcher, watchlist, jobs_store, source
+
+
+def test_watcher_baselines_then_enqueues_only_new_episodes(tmp_path):
+    watcher, watchlist, jobs_store, source = _build(tmp_path, ["1", "2", "3"])
+    watch = watchlist.add(NewWatch(show_id="s1", show_title="Frieren", mode="sub", quality="best"))
+    now = datetime.now(timezone.utc)
+
+    assert watcher.run_once(now) == {watch["id"]: []}
+    assert jobs_store.list_jobs() == []
+
+    source.episodes = ["1", "2", "3", "4"]
+    later = now + timedelta(days=1)
+    assert watcher.run_once(later) == {watch["id"]: ["4"]}
+    assert watcher.run_once(later + timedelta(days=1)) == {watch["id"]: []}
+    jobs = jobs_store.list_jobs()
+    assert [job["episode"] for job in jobs] == ["4"]
+    assert watchlist.get(watch["id"])["last_new_episode_at"] == later.isoformat()
+
+
+def test_backfill_watch_enqueues_missing_episodes(tmp_path):
+    watcher, watchlist, jobs_store, _ = _build(tmp_path, ["1", "2"])
+    watch = watchlist.add(NewWatch(show_id="s1", show_title="Frieren", mode="sub", quality="best", backfill=True))
+    assert watcher.run_once(datetime.now(timezone.utc)) == {watch["id"]: ["1", "2"]}
+    assert jobs_store.existing_episodes("s1", "sub") == {"1", "2"}
+
+
+def test_poll_delay_tightens_near_release_and_backs_off_when_dormant():
+    policy = WatchPolicy(base_interval=3600, release_interval=300, release_window=7200, dormant_after=21 * 86400)
+    release = datetime(2026, 10, 3, 15, 0, tzinfo=timezone.utc)
+    entry = {
+        "finished": False,
+        "created_at": release.isoformat(),
+        "last_new_episode_at": release.isoformat(),
+        "idle_polls": 3,
+        "release_history": [release.isoformat()],
+    }
+    assert next_poll_delay(entry, release + timedelta(days=7, hours=-1), policy) == 300
+    assert next_poll_delay(entry, release + timedelta(days=3), policy) == 3600
+    assert next_poll_delay(entry, release + timedelta(days=30), policy) == 8 * 3600
+    assert next_poll_delay({**entry, "finished": True}, release, policy) == policy.max_interval
+
+
+def test_failing_watch_backs_off_without_sinking_the_tick(tmp_path):
+    watcher, watchlist, jobs_store, source = _build(tmp_path, ["1", "2", "SP1"])
+    good = watchlist.add(NewWatch(show_id="s1", show_title="Frieren", mode="sub", quality="best"))
+    bad = watchlist.add(NewWatch(show_id="s2", show_title="Broken", mode="sub", quality="best"))
+    list_episodes = source.list_episodes
+
+    def flaky(show_id, mode):
+        if show_id == "s2":
+            raise OSError("database is locked")
+        return list_episodes(show_id, mode)
+
+    source.list_episodes = flaky
+    now = datetime.now(timezone.utc)
+    assert watcher.run_once(now) == {good["id"]: [], bad["id"]: []}
+    assert watchlist.get(good["id"])["baseline_episode"] == 2.0
+
+    failed = watchlist.get(bad["id"])
+    assert failed["last_error"] == "OSError: database is locked"
+    assert failed["next_check_at"] == (now + timedelta(seconds=watcher.policy.release_interval)).isoformat()
+    assert watcher.run_once(now + timedelta(seconds=1)) == {}
+
+    retry = now + timedelta(seconds=watcher.policy.release_interval)
+    watcher.run_once(retry)
+    assert watchlist.get(bad["id"])["next_check_at"] == (
+        retry + timedelta(seconds=2 * watcher.policy.release_interval)
+    ).isoformat()
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+from app.services.downloads import DownloadService
+from app.storage.jobs import JobsStore, NewJob
+
+
+def _job(tmp_path: Path, episode: str) -> NewJob:
+    return NewJob(
+        show_id="show-1",
+        show_title="Show",
+        episode=episode,
+        mode="sub",
+        quality="best",
+        output_path=str(tmp_path / f"episode-{episode}.mp4"),
+    )
+
+
+def test_claim_next_queued_hands_out_each_job_once(tmp_path: Path) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    first, second = store.create_jobs([_job(tmp_path, "1"), _job(tmp_path, "2")])
+    other = JobsStore(tmp_path / "jobs.sqlite3")
+
+    assert store.claim_next_queued() == first
+    assert other.claim_next_queued() == second
+    assert store.claim_next_queued() is None
+    assert store.get_status(first) == "running"
+
+
+def test_restart_keeps_queued_jobs_and_requeue_resets_running(tmp_path: Path) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    running, queued = store.create_jobs([_job(tmp_path, "1"), _job(tmp_path, "2")])
+    store.claim_next_queued()
+
+    store.mark_running_jobs_recoverable()
+    assert store.get_status(running) == "failed_recoverable"
+    assert store.get_status(queued) == "queued"
+
+    assert store.claim_next_queued() == queued
+    store.requeue_job(queued, "Interrupted by shutdown")
+    assert store.get_status(queued) == "queued"
+    assert store.tail_events(queued, 1)[0]["message"] == "Interrupted by shutdown"
+
+
+def test_worker_sees_cancellation_written_by_another_process(tmp_path: Path) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    (job_id,) = store.create_jobs([_job(tmp_path, "1")])
+    worker = DownloadService(store, tmp_path, tmp_path / "ani-cli")
+    web = DownloadService(JobsStore(tmp_path / "jobs.sqlite3"), tmp_path, tmp_path / "ani-cli")
+
+    assert not worker._is_cancelled(job_id)
+    assert web.cancel(job_id)
+    worker._cancel_checked.clear()
+    assert worker._is_cancelled(job_id)
+
+
+def test_shutdown_without_start_returns_immediately(tmp_path: Path) -> None:
+    store = JobsStore(tmp_path / "jobs.sqlite3")
+    service = DownloadService(store, tmp_path, tmp_path / "ani-cli")
+    assert service.shutdown(timeout=0.1)
+
+
+def test_progress_bytes_only_count_the_jobs_own_files(tmp_path: Path) -> None:
+    show_dir = tmp_path / "Show"
+    show_dir.mkdir()
+    (show_dir / "episode-1.mp4.part").write_bytes(b"\0" * 100)
+    (show_dir / "episode-2.mp4").write_bytes(b"\0" * 1000)
+    (show_dir / "Show Episode 3.mp4").write_bytes(b"\0" * 30)
+    direct = {"source_url": "https://cdn.test/1.mp4", "output_path": str(show_dir / "episode-1.mp4"), "episode": "1"}
+    ani_cli = {"source_url": "", "output_path": str(show_dir / "episode-3.mp4"), "episode": "3"}
+
+    assert DownloadService._job_bytes(direct, show_dir) == 100
+    assert DownloadService._job_bytes(ani_cli, show_dir) == 30